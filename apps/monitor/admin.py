@@ -1,19 +1,61 @@
 # Django Imports
 from django.contrib import admin
+from django.db.models import BooleanField, ExpressionWrapper, Q
 
 # Own Imports
 from apps.monitor.models import (
     Websites,
     AuthenticationScheme,
     HistoricalStats,
+    ProbeResult,
+    HourlyProbeRollup,
+    DailyProbeRollup,
+    WebsiteSLA,
     People,
     NotifyGroup,
+    PendingNotification,
+    HostCircuit,
+    MonitorCycle,
 )
+from apps.monitor.selectors import get_live_statuses
 
 
 @admin.register(Websites)
 class WebsitesAdmin(admin.ModelAdmin):
-    list_display = ["site", "status", "has_authentication", "date_created"]
+    list_display = [
+        "site",
+        "live_status",
+        "last_checked_at",
+        "last_latency_ms",
+        "has_authentication",
+        "date_created",
+    ]
+
+    def get_changelist_instance(self, request):
+        # read the live status of the whole page in one round trip
+        changelist = super().get_changelist_instance(request)
+        live_statuses = get_live_statuses(
+            website.site for website in changelist.result_list
+        )
+        for website in changelist.result_list:
+            website.live = live_statuses.get(website.site)
+        return changelist
+
+    def get_live(self, obj: Websites, name: str, default=None):
+        live = getattr(obj, "live", None)
+        return live[name] if live is not None else default
+
+    @admin.display(description="Status")
+    def live_status(self, obj: Websites):
+        return self.get_live(obj, "status", obj.status)
+
+    @admin.display(description="Last checked at")
+    def last_checked_at(self, obj: Websites):
+        return self.get_live(obj, "checked_at")
+
+    @admin.display(description="Last latency (ms)")
+    def last_latency_ms(self, obj: Websites):
+        return self.get_live(obj, "latency_ms")
 
 
 @admin.register(AuthenticationScheme)
@@ -24,8 +66,12 @@ class AuthenticationSchemeAdmin(admin.ModelAdmin):
         "session_auth",
         "token_auth",
         "bearer_auth",
+        "auth_type",
+        "expires_at",
         "date_created",
     ]
+    # passwords are never shown, even encrypted
+    exclude = ["password"]
 
 
 @admin.register(HistoricalStats)
@@ -38,11 +84,92 @@ class HistoricalStatsAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(ProbeResult)
+class ProbeResultAdmin(admin.ModelAdmin):
+    list_display = [
+        "site",
+        "checked_at",
+        "status_code",
+        "latency_ms",
+        "error",
+    ]
+    list_select_related = ["site"]
+
+
+@admin.register(HourlyProbeRollup, DailyProbeRollup)
+class ProbeRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        "site",
+        "bucket",
+        "probe_count",
+        "uptime_ratio",
+        "latency_avg_ms",
+        "latency_p95_ms",
+    ]
+    list_select_related = ["site"]
+
+
+@admin.register(WebsiteSLA)
+class WebsiteSLAAdmin(admin.ModelAdmin):
+    list_display = ["site", "date_modified"]
+    list_select_related = ["site"]
+
+
 @admin.register(People)
 class PeopleAdmin(admin.ModelAdmin):
-    list_display = ["email_address", "date_created"]
+    list_display = ["email_address", "digest", "date_created"]
 
 
 @admin.register(NotifyGroup)
 class NotifyGroupAdmin(admin.ModelAdmin):
     list_display = ["name", "notify", "date_created"]
+
+
+@admin.register(PendingNotification)
+class PendingNotificationAdmin(admin.ModelAdmin):
+    list_display = ["site", "kind", "date_created"]
+
+
+@admin.register(HostCircuit)
+class HostCircuitAdmin(admin.ModelAdmin):
+    list_display = ["host", "failures", "opened_at", "date_modified"]
+    search_fields = ["host"]
+
+
+@admin.register(MonitorCycle)
+class MonitorCycleAdmin(admin.ModelAdmin):
+    list_display = [
+        "started_at",
+        "duration",
+        "sites",
+        "skipped",
+        "failed_chunks",
+        "fetch_time",
+        "probe_time",
+        "persist_time",
+        "notify_time",
+        "queries",
+        "has_profile",
+    ]
+    ordering = ["-date_created"]
+
+    def get_queryset(self, request):
+        # flag the profiled cycles, without reading every profile
+        return (
+            super()
+            .get_queryset(request)
+            .defer("profile")
+            .annotate(
+                profiled=ExpressionWrapper(
+                    Q(profile__isnull=False), output_field=BooleanField()
+                )
+            )
+        )
+
+    def get_readonly_fields(self, request, obj=None):
+        # cycles are records of what happened, not to be edited
+        return [field.name for field in self.model._meta.fields]
+
+    @admin.display(boolean=True, description="Profiled")
+    def has_profile(self, obj: MonitorCycle) -> bool:
+        return obj.profiled
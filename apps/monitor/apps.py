@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MonitorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.monitor"
+
+    def ready(self) -> None:
+        # connect the signal receivers
+        from apps.monitor import signals  # noqa: F401
@@ -0,0 +1,245 @@
+# Stdlib Imports
+import json
+import math
+import random
+import asyncio
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+# the token every authenticated site of the fleet hands out on login
+FLEET_TOKEN = "benchmark-token"
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+REASONS = {200: "OK", 401: "Unauthorized", 503: "Service Unavailable"}
+
+
+@dataclass
+class FleetProfile:
+    """
+    How the virtual sites of a synthetic fleet behave.
+
+    Fields:
+        - sites (int): the number of virtual sites
+        - hosts (int): the number of loopback addresses the sites spread over
+        - latency (str): the distribution response latencies are drawn from
+        - latency_ms (float): the mean response latency in milliseconds
+        - error_rate (float): the share of requests answered with a 503
+        - hang_rate (float): the share of requests that never get an answer
+        - auth_rate (float): the share of sites that need token authentication
+        - seed (int): the seed of the random choices, for repeatable runs
+    """
+
+    sites: int = 1000
+    hosts: int = 50
+    latency: str = "lognormal"
+    latency_ms: float = 50.0
+    error_rate: float = 0.0
+    hang_rate: float = 0.0
+    auth_rate: float = 0.0
+    seed: int = 0
+    authenticated: FrozenSet[int] = field(default=frozenset(), init=False)
+
+    def __post_init__(self) -> None:
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+
+        rng = random.Random(self.seed)
+        self.authenticated = frozenset(
+            number
+            for number in range(self.sites)
+            if rng.random() < self.auth_rate
+        )
+
+    @property
+    def addresses(self) -> List[str]:
+        # linux routes the whole of 127.0.0.0/8 to the loopback interface,
+        # so every address is a distinct host without any network setup
+        return [
+            f"127.1.{index // 250}.{index % 250 + 1}"
+            for index in range(max(self.hosts, 1))
+        ]
+
+    def get_sites(self, port: int) -> List[Tuple[int, str]]:
+        addresses = self.addresses
+        return [
+            (
+                number,
+                f"http://{addresses[number % len(addresses)]}:{port}/{number}",
+            )
+            for number in range(self.sites)
+        ]
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """
+        This method draws the latency of a response, in seconds.
+
+        :param rng: The random number generator to draw with
+        :type rng: random.Random
+
+        :return: The latency in seconds.
+        """
+
+        mean = self.latency_ms / 1000
+        if mean <= 0 or self.latency == "fixed":
+            return max(mean, 0)
+        if self.latency == "uniform":
+            return rng.uniform(0, 2 * mean)
+        if self.latency == "exponential":
+            return rng.expovariate(1 / mean)
+
+        # a long tail, with the mean of the profile
+        sigma = 1.0
+        return rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+
+
+class SyntheticFleet:
+    """
+    This class serves the virtual sites of a fleet over plain http/1.1 with
+    keep-alive, on one port of many loopback addresses, so probes see one
+    host per address just as they would across the internet.
+
+    Every path is a site. Sites that need authentication hand out a token
+    on a POST, as the token login of the authentication service expects,
+    and answer GETs without it with a 401.
+    """
+
+    def __init__(self, profile: FleetProfile) -> None:
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self.servers: List[asyncio.AbstractServer] = []
+
+    async def start(self) -> int:
+        """
+        This method starts listening on every address of the fleet.
+
+        :return: The port the fleet listens on.
+        """
+
+        first, *rest = self.profile.addresses
+        server = await asyncio.start_server(self.handle, first, 0)
+        port = server.sockets[0].getsockname()[1]
+        self.servers = [server]
+        if rest:
+            self.servers.append(
+                await asyncio.start_server(self.handle, rest, port)
+            )
+        return port
+
+    async def respond(
+        self, method: str, path: str, headers: Dict[str, str]
+    ) -> Optional[Tuple[int, bytes]]:
+        """
+        This method works out the response to a request, after its latency.
+
+        :param method: The method of the request
+        :type method: str
+        :param path: The path of the request, which names the site
+        :type path: str
+        :param headers: The headers of the request, with lowercase names
+        :type headers: Dict[str, str]
+
+        :return: The status and body of the response, or None for a hang.
+        """
+
+        if self.rng.random() < self.profile.hang_rate:
+            return None
+        await asyncio.sleep(self.profile.sample_latency(self.rng))
+
+        try:
+            number = int(path.strip("/").split("/")[0])
+        except ValueError:
+            number = None
+
+        if number in self.profile.authenticated:
+            if method == "POST":
+                return 200, json.dumps({"token": FLEET_TOKEN}).encode()
+            if headers.get("authorization") != f"Token {FLEET_TOKEN}":
+                return 401, b"Not authenticated."
+
+        if self.rng.random() < self.profile.error_rate:
+            return 503, b"Unavailable."
+        return 200, b"OK"
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get("content-length"):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                response = await self.respond(method, path, headers)
+                if response is None:
+                    # hold the connection until the client gives up on it
+                    await reader.read()
+                    break
+
+                status, body = response
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Content-Type: text/plain\r\n\r\n".encode()
+                )
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def serve_fleet(profile: FleetProfile, connection) -> None:
+    # runs in a process of its own, so the fleet doesn't share the cpu
+    # time or memory of the monitor being measured
+    async def serve() -> None:
+        fleet = SyntheticFleet(profile)
+        connection.send(await fleet.start())
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def start_fleet(
+    profile: FleetProfile,
+) -> Tuple[multiprocessing.Process, List[Tuple[int, str]]]:
+    """
+    This function starts a synthetic fleet in a process of its own.
+
+    :param profile: How the virtual sites behave
+    :type profile: FleetProfile
+
+    :return: The fleet process, and the number and url of every site.
+    """
+
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=serve_fleet, args=(profile, sender), daemon=True
+    )
+    process.start()
+    sender.close()
+    port = receiver.recv()
+    return process, profile.get_sites(port)
+
+
+def percentile(values: List[float], quantile: float) -> float:
+    # nearest rank, so small samples report a value that was measured
+    ordered = sorted(values)
+    rank = max(math.ceil(quantile * len(ordered)), 1)
+    return ordered[rank - 1]
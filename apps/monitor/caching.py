@@ -0,0 +1,112 @@
+# Stdlib Imports
+import time
+import hashlib
+from typing import Callable, Iterable
+
+# Django Imports
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import parse_etags
+
+# Rest Framework Imports
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+FLEET_VERSION_KEY = "monitor:version:fleet"
+SITE_VERSION_KEY = "monitor:version:site:{site}"
+RESPONSE_KEY = "monitor:response:{etag}"
+
+
+def get_site_version_key(site: str) -> str:
+    return SITE_VERSION_KEY.format(site=site)
+
+
+def bump_versions(sites: Iterable[str]) -> None:
+    """
+    This function marks the data of the given sites, and of the fleet as a
+    whole, as changed, so that cached responses built from it go stale.
+
+    :param sites: The urls of the websites whose data changed
+    :type sites: Iterable[str]
+    """
+
+    version = time.time()
+    versions = {get_site_version_key(site): version for site in sites}
+    versions[FLEET_VERSION_KEY] = version
+    cache.set_many(versions, settings.MONITOR_VERSION_TTL)
+
+
+def get_version(version_key: str) -> float:
+    """
+    This function gets the version of some data, starting it now if the
+    data has not been versioned yet, or its version expired.
+
+    Versions expire, as they are started for any site requested, whether
+    or not it exists. An expired version starts again later than it was,
+    so responses cached under it only go stale.
+
+    :param version_key: The cache key of the version
+    :type version_key: str
+
+    :return: The version, as the unix timestamp the data last changed at.
+    """
+
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, time.time(), settings.MONITOR_VERSION_TTL)
+        version = cache.get(version_key, time.time())
+    return version
+
+
+class ConditionalCacheMixin:
+    """
+    This mixin serves read-only responses from a cache versioned by the
+    probe write path, with an ETag validator.
+
+    A poll whose validators match the current version gets a 304 without
+    touching the database, and any other poll of an unchanged version is
+    served the cached response body.
+
+    There is no Last-Modified validator, as its one second resolution would
+    answer a poll with a 304 when the data changed twice within a second.
+    """
+
+    def get_cached_response(
+        self, request: Request, version_key: str, build: Callable[[], dict]
+    ) -> Response:
+        """
+        This method answers a request from the response cache, building
+        and caching the response body when it is missing.
+
+        :param request: The request to answer
+        :type request: Request
+        :param version_key: The cache key of the version of the data
+        :type version_key: str
+        :param build: A function that builds the response body
+        :type build: Callable[[], dict]
+
+        :return: A 304 or 200 response.
+        """
+
+        version = get_version(version_key)
+        digest = hashlib.md5(
+            f"{request.build_absolute_uri()}|{version}".encode()
+        ).hexdigest()
+        etag = f'"{digest}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None and etag in parse_etags(if_none_match):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+
+        response_key = RESPONSE_KEY.format(etag=digest)
+        data = cache.get(response_key)
+        if data is None:
+            data = build()
+            cache.set(response_key, data, settings.MONITOR_RESPONSE_CACHE_TTL)
+
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
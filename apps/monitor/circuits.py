@@ -0,0 +1,240 @@
+# Stdlib Imports
+import time
+import logging
+import threading
+from datetime import datetime, timezone as dt_timezone
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+# Django Imports
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+# Own Imports
+from apps.monitor.models import HostCircuit
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+@dataclass
+class CircuitState:
+    """
+    The circuit breaker state of a single host, as kept in process.
+
+    Fields:
+        - failures (int): the number of failed probes in a row
+        - opened_at (float): the unix timestamp the circuit was opened at
+        - trial (bool): whether a half-open trial probe is in flight
+    """
+
+    failures: int = 0
+    opened_at: Optional[float] = None
+    trial: bool = False
+
+
+class CircuitBreaker:
+    """
+    This class stops probing hosts that keep failing, so that dead hosts
+    don't hold connection slots and probe time every cycle:
+
+    - closed, every site of the host is probed
+    - open, once the host failed a number of probes in a row, none of its
+      sites are probed until the cooldown is over
+    - half-open, after the cooldown, a single trial probe is let through,
+      closing the circuit if it succeeds and opening it again if it fails
+
+    State is kept in process, loaded from the database on first use, and
+    persisted at most once per persist interval.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        persist_interval: Optional[float] = None,
+    ) -> None:
+        self.threshold = max(
+            threshold or settings.MONITOR_CIRCUIT_FAILURE_THRESHOLD, 1
+        )
+        self.cooldown = (
+            cooldown
+            if cooldown is not None
+            else settings.MONITOR_CIRCUIT_COOLDOWN
+        )
+        self.persist_interval = (
+            persist_interval
+            if persist_interval is not None
+            else settings.MONITOR_CIRCUIT_PERSIST_INTERVAL
+        )
+        self.states: Dict[str, CircuitState] = {}
+        self.changed: Set[str] = set()
+        self.loaded = False
+        self.persisted_at = time.time()
+        self.lock = threading.Lock()
+
+    def get_state(self, host: str, now: Optional[float] = None) -> str:
+        state = self.states.get(host)
+        if state is None or state.opened_at is None:
+            return CLOSED
+        if (now or time.time()) - state.opened_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self, host: str, now: Optional[float] = None) -> bool:
+        """
+        This method decides whether a site of the host may be probed,
+        letting a single trial probe through once the cooldown is over.
+
+        :param host: The host name of the site
+        :type host: str
+        :param now: The unix timestamp to check against, defaults to now
+        :type now: float
+
+        :return: True if the site may be probed.
+        """
+
+        with self.lock:
+            state = self.get_state(host, now)
+            if state == CLOSED:
+                return True
+            if state == OPEN or self.states[host].trial:
+                return False
+            self.states[host].trial = True
+            return True
+
+    def record(
+        self, host: str, success: bool, now: Optional[float] = None
+    ) -> None:
+        """
+        This method moves the circuit of a host on by one probe.
+
+        :param host: The host name of the probed site
+        :type host: str
+        :param success: Whether the probe found the site reachable
+        :type success: bool
+        :param now: The unix timestamp of the probe, defaults to now
+        :type now: float
+        """
+
+        with self.lock:
+            state = self.states.get(host)
+            if success:
+                if state is not None:
+                    del self.states[host]
+                    self.changed.add(host)
+                return
+
+            if state is None:
+                state = self.states[host] = CircuitState()
+            state.failures += 1
+            if state.trial or (
+                state.opened_at is None and state.failures >= self.threshold
+            ):
+                state.opened_at = now or time.time()
+            state.trial = False
+            self.changed.add(host)
+
+    def release(self, host: str) -> None:
+        """
+        This method gives back a half-open trial that was let through but
+        never probed, so another probe can try the host.
+
+        :param host: The host name of the site
+        :type host: str
+        """
+
+        with self.lock:
+            if host in self.states:
+                self.states[host].trial = False
+
+    def load(self) -> None:
+        """
+        This method loads the circuits persisted by any worker, keeping the
+        state of hosts this process already knows about.
+        """
+
+        with self.lock:
+            for circuit in HostCircuit.objects.all():
+                self.states.setdefault(
+                    circuit.host,
+                    CircuitState(
+                        failures=circuit.failures,
+                        opened_at=(
+                            circuit.opened_at.timestamp()
+                            if circuit.opened_at is not None
+                            else None
+                        ),
+                    ),
+                )
+            self.loaded = True
+
+    def ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    def persist(self, force: bool = False) -> int:
+        """
+        This method writes the circuits that changed since they were last
+        persisted, once the persist interval is over. Closed circuits are
+        removed, so the table only holds hosts that are failing.
+
+        Every worker persists the hosts it probed, so each circuit is
+        upserted under a row lock, in host order so workers never deadlock.
+        A failed write is logged and retried on the next persist, as it
+        must never fail the monitoring cycle.
+
+        :param force: Whether to persist before the interval is over
+        :type force: bool
+
+        :return: The number of circuits written.
+        """
+
+        with self.lock:
+            now = time.time()
+            if not self.changed or (
+                not force and now - self.persisted_at < self.persist_interval
+            ):
+                return 0
+
+            changed, self.changed = self.changed, set()
+            circuits = {
+                host: (
+                    {
+                        "failures": self.states[host].failures,
+                        "opened_at": (
+                            datetime.fromtimestamp(
+                                self.states[host].opened_at,
+                                tz=dt_timezone.utc,
+                            )
+                            if self.states[host].opened_at is not None
+                            else None
+                        ),
+                    }
+                    if host in self.states
+                    else None
+                )
+                for host in changed
+            }
+            self.persisted_at = now
+
+        try:
+            with transaction.atomic():
+                for host in sorted(circuits):
+                    if circuits[host] is None:
+                        HostCircuit.objects.filter(host=host).delete()
+                    else:
+                        HostCircuit.objects.update_or_create(
+                            host=host, defaults=circuits[host]
+                        )
+        except DatabaseError as error:
+            logger.warning("Host circuits were not persisted: %r", error)
+            with self.lock:
+                self.changed |= changed
+            return 0
+        return len(changed)
+
+
+circuit_breaker = CircuitBreaker()
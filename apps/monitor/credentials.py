@@ -0,0 +1,210 @@
+# Stdlib Imports
+import time
+import threading
+from datetime import datetime, timedelta
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# Own Imports
+from apps.monitor.models import AuthenticationScheme, AuthTypes
+from apps.monitor.probes import get_authentication_headers
+from apps.monitor.metrics import AUTH_REFRESHES
+from apps.monitor.services import fetch_credentials
+
+# Third Party Imports
+import httpx
+
+
+# the field each authentication scheme keeps its credential in
+CREDENTIAL_FIELDS = {
+    AuthTypes.SESSION_AUTH.value: "session_auth",
+    AuthTypes.TOKEN_AUTH.value: "token_auth",
+    AuthTypes.JWT_AUTH.value: "bearer_auth",
+}
+
+
+@dataclass
+class CachedCredential:
+    """
+    The request headers of an authenticated website, as cached in process.
+
+    Fields:
+        - headers (dict): the headers to probe the website with
+        - expires_at (datetime): when the credential expires, if known
+        - cached_at (float): the monotonic time the entry was cached at
+    """
+
+    headers: Dict[str, str]
+    expires_at: Optional[datetime]
+    cached_at: float
+
+
+class CredentialCache:
+    """
+    This class caches the authentication headers of websites in process,
+    keyed by site, so that probing them doesn't query their authentication
+    scheme every cycle.
+
+    Entries are dropped after a time to live, or shortly before the
+    credential itself expires, in which case it is refreshed before the
+    website is probed again.
+
+    Refreshing is single-flight within the process, as a lock per site
+    serialises refreshes, so a refresh that finds the credential already
+    replaced by another thread or worker reuses it instead of logging in
+    again. Logins run without holding any database lock, and the new
+    credential is only saved if the stored one is still the stale one, as
+    a compare-and-set under a short row lock.
+    """
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        self.ttl = (
+            ttl if ttl is not None else settings.MONITOR_CREDENTIAL_CACHE_TTL
+        )
+        self.expiry_margin = timedelta(
+            seconds=settings.MONITOR_CREDENTIAL_EXPIRY_MARGIN
+        )
+        self.entries: Dict[str, CachedCredential] = {}
+        self.locks = defaultdict(threading.Lock)
+
+    def is_fresh(self, entry: CachedCredential, now: datetime) -> bool:
+        if time.monotonic() - entry.cached_at >= self.ttl:
+            return False
+        return not self.is_expiring(entry.expires_at, now)
+
+    def is_expiring(
+        self, expires_at: Optional[datetime], now: datetime
+    ) -> bool:
+        return (
+            expires_at is not None and expires_at <= now + self.expiry_margin
+        )
+
+    def store(self, authentication_scheme: AuthenticationScheme) -> dict:
+        entry = CachedCredential(
+            headers=get_authentication_headers(authentication_scheme),
+            expires_at=authentication_scheme.expires_at,
+            cached_at=time.monotonic(),
+        )
+        self.entries[authentication_scheme.site] = entry
+        return entry.headers
+
+    def invalidate(self, site: Optional[str] = None) -> None:
+        if site is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(site, None)
+
+    def get_headers(self, sites: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """
+        This method gets the authentication headers of the given sites,
+        loading the ones missing from the cache in a single query and
+        refreshing the credentials that are about to expire.
+
+        :param sites: The sites to get the authentication headers of
+        :type sites: Iterable[str]
+
+        :return: A dictionary of headers, keyed by site.
+        """
+
+        now = timezone.now()
+        headers, missing = {}, []
+
+        for site in sites:
+            entry = self.entries.get(site)
+            if entry is not None and self.is_fresh(entry, now):
+                headers[site] = entry.headers
+            else:
+                missing.append(site)
+
+        if not missing:
+            return headers
+
+        expiring = {}
+        for scheme in AuthenticationScheme.objects.filter(site__in=missing):
+            headers[scheme.site] = self.store(scheme)
+            if self.is_expiring(scheme.expires_at, now):
+                expiring[scheme.site] = headers[scheme.site]
+
+        headers.update(self.refresh(expiring))
+        return headers
+
+    def refresh(
+        self, stale_headers: Dict[str, Dict[str, str]]
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        This method authenticates again with websites whose credential was
+        rejected or has expired, at most once per stale credential.
+
+        :param stale_headers: The headers that stopped working, keyed by site
+        :type stale_headers: Dict[str, Dict[str, str]]
+
+        :return: The headers of the refreshed sites, keyed by site.
+        """
+
+        refreshed = {}
+
+        for site, stale in stale_headers.items():
+            with self.locks[site]:
+                try:
+                    scheme = self.reauthenticate(site, stale)
+                except (
+                    AuthenticationScheme.DoesNotExist,
+                    httpx.HTTPError,
+                    KeyError,
+                    ValueError,
+                ):
+                    AUTH_REFRESHES.labels("failure").inc()
+                    continue
+                if scheme is not None:
+                    refreshed[site] = self.store(scheme)
+
+        return refreshed
+
+    def reauthenticate(
+        self, site: str, stale: Dict[str, str]
+    ) -> Optional[AuthenticationScheme]:
+        """
+        This method logs in to a website again, unless its credential was
+        replaced since it was found to be stale, and saves the credential
+        it got if the stored one is still the stale one.
+
+        :param site: The site to log in to
+        :type site: str
+        :param stale: The headers that stopped working
+        :type stale: Dict[str, str]
+
+        :return: The authentication scheme with the current credential, or
+            None if it has none to log in with or the login got none.
+        """
+
+        scheme = AuthenticationScheme.objects.get(site=site)
+        if get_authentication_headers(scheme) != stale:
+            return scheme
+        if scheme.username is None:
+            return None
+
+        fetch_credentials(scheme)
+        field = CREDENTIAL_FIELDS.get(scheme.auth_type)
+        if field is None or not getattr(scheme, field):
+            AUTH_REFRESHES.labels("failure").inc()
+            return None
+        AUTH_REFRESHES.labels("success").inc()
+
+        with transaction.atomic():
+            current = AuthenticationScheme.objects.select_for_update().get(
+                site=site
+            )
+            # another worker logged in meanwhile, and its credential wins
+            if get_authentication_headers(current) != stale:
+                return current
+            scheme.save(update_fields=[field, "expires_at", "date_modified"])
+        return scheme
+
+
+credential_cache = CredentialCache()
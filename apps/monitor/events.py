@@ -0,0 +1,263 @@
+# Stdlib Imports
+import json
+import asyncio
+import logging
+from http.cookies import SimpleCookie
+from importlib import import_module
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs
+
+# Django Imports
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest
+
+# Own Imports
+from apps.monitor.snapshot import get_redis_client
+
+# Third Party Imports
+from asgiref.sync import sync_to_async
+import redis
+import redis.asyncio
+
+
+logger = logging.getLogger(__name__)
+
+STATUS_CHANNEL = "monitor:status"
+
+
+def format_status_events(changes: List[dict]) -> bytes:
+    """
+    This function encodes status changes as server-sent events, once for
+    every subscriber they are sent to.
+
+    :param changes: The status changes, as dictionaries of site and status
+    :type changes: List[dict]
+
+    :return: The encoded events.
+    """
+
+    return "".join(
+        f"event: status\ndata: {json.dumps(change, cls=DjangoJSONEncoder)}\n\n"
+        for change in changes
+    ).encode()
+
+
+class EventBroker:
+    """
+    This class fans status changes out to every subscriber of the process,
+    each with a bounded queue of its own.
+
+    Changes are encoded once and the same bytes are handed to every
+    subscriber, so a change reaches any number of them without extra work
+    per subscriber beyond a queue put. A subscriber that falls behind by a
+    full queue is dropped rather than slowing the others down.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None) -> None:
+        self.queue_size = queue_size or settings.MONITOR_EVENTS_QUEUE_SIZE
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.relay: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        self.loop = asyncio.get_running_loop()
+        if settings.MONITOR_EVENTS_REDIS_URL and (
+            self.relay is None or self.relay.done()
+        ):
+            self.relay = self.loop.create_task(self.relay_from_redis())
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def publish(self, changes: List[dict]) -> None:
+        """
+        This method sends status changes to every subscriber, from the
+        event loop of the subscribers.
+
+        :param changes: The status changes to send
+        :type changes: List[dict]
+        """
+
+        events = format_status_events(changes)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait((changes, events))
+            except asyncio.QueueFull:
+                # drop the backlog of a slow subscriber, and tell it to
+                # close so its client reconnects and starts afresh
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def publish_threadsafe(self, changes: List[dict]) -> None:
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.publish, changes)
+
+    async def relay_from_redis(self) -> None:
+        """
+        This method forwards the status changes published to redis by any
+        process to the subscribers of this process, over one connection,
+        reconnecting if it is lost. Messages that aren't valid json are
+        logged and skipped. The subscription of a lost connection is closed
+        before reconnecting, so its connection is released.
+        """
+
+        client = redis.asyncio.from_url(settings.MONITOR_EVENTS_REDIS_URL)
+        while True:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(STATUS_CHANNEL)
+                async for message in pubsub.listen():
+                    try:
+                        changes = json.loads(message["data"])
+                    except ValueError as error:
+                        logger.warning(
+                            "Status events relay dropped a message: %r", error
+                        )
+                        continue
+                    self.publish(changes)
+            except (redis.RedisError, OSError) as error:
+                logger.warning("Status events relay lost redis: %r", error)
+            finally:
+                await pubsub.close()
+            await asyncio.sleep(settings.MONITOR_EVENTS_HEARTBEAT)
+
+
+event_broker = EventBroker()
+
+
+def publish_status_changes(changes: List[dict]) -> None:
+    """
+    This function publishes the status changes of a batch of probes, to
+    redis when it is configured, so every process serving the stream gets
+    them, or to the subscribers of this process otherwise.
+
+    :param changes: The status changes, as dictionaries of site and status
+    :type changes: List[dict]
+    """
+
+    if not changes:
+        return
+
+    if settings.MONITOR_EVENTS_REDIS_URL:
+        try:
+            get_redis_client(settings.MONITOR_EVENTS_REDIS_URL).publish(
+                STATUS_CHANNEL, json.dumps(changes, cls=DjangoJSONEncoder)
+            )
+        except redis.RedisError as error:
+            logger.warning("Status changes were not published: %r", error)
+    else:
+        event_broker.publish_threadsafe(changes)
+
+
+@sync_to_async
+def is_authenticated(headers: Dict[bytes, bytes]) -> bool:
+    """
+    This function tells if a request comes from a signed in user, loading
+    the user of its session cookie as django's own middleware does, so
+    sessions of inactive users or from before a password change are not.
+
+    :param headers: The headers of the request
+    :type headers: Dict[bytes, bytes]
+
+    :return: Whether the user is signed in.
+    """
+
+    cookies = SimpleCookie(headers.get(b"cookie", b"").decode("latin-1"))
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return False
+
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(
+        morsel.value
+    )
+    user = get_user(request)
+    return user.is_authenticated and user.is_active
+
+
+class StatusEventsApp:
+    """
+    This asgi application streams the status changes of websites as
+    server-sent events, to dashboards that would otherwise poll the api.
+
+    Only signed in users are served. The stream can be narrowed down to
+    some websites with one or more ?site= query parameters. Subscribing
+    takes a session and a user lookup, and no query is made per change.
+    """
+
+    def __init__(self, broker: EventBroker = event_broker) -> None:
+        self.broker = broker
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        headers = dict(scope["headers"])
+        if scope["method"] != "GET":
+            return await self.respond(send, 405, b"Method not allowed.")
+        if not await is_authenticated(headers):
+            return await self.respond(send, 401, b"Not authenticated.")
+
+        sites = set(parse_qs(scope["query_string"].decode()).get("site", []))
+        queue = self.broker.subscribe()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect(receive))
+        try:
+            while not disconnected.done():
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), settings.MONITOR_EVENTS_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    body = b": keep-alive\n\n"
+                else:
+                    if message is None:
+                        break
+                    changes, body = message
+                    if sites:
+                        body = format_status_events(
+                            [c for c in changes if c["site"] in sites]
+                        )
+                if body:
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": body,
+                            "more_body": True,
+                        }
+                    )
+        finally:
+            self.broker.unsubscribe(queue)
+            disconnected.cancel()
+
+        await send({"type": "http.response.body", "body": b""})
+
+    async def wait_for_disconnect(self, receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def respond(self, send, status: int, body: bytes) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
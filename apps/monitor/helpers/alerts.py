@@ -0,0 +1,88 @@
+# Stdlib Imports
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Own Imports
+from apps.monitor.models import AlertKinds, StatusTypes
+
+
+@dataclass
+class AlertState:
+    """
+    The alerting state of a single website, carried from one check to the next.
+
+    Fields:
+        - consecutive_failures (int): the number of failed checks in a row
+        - alert_status (str): the status (up, down) people were last alerted of
+        - last_alerted_at (datetime): the date and time of the last alert
+    """
+
+    consecutive_failures: int = 0
+    alert_status: Optional[str] = None
+    last_alerted_at: Optional[datetime] = None
+
+
+class AlertDebouncer:
+    """
+    This class decides which checks should alert people, so that alerts
+    fire on transitions instead of on every failed check:
+
+    - down, once a website has failed a number of checks in a row
+    - up, on the first successful check after a down alert
+    - reminder, while a website stays down, at most once per interval
+
+    Failures that don't reach the threshold are treated as flapping, and
+    don't alert anyone.
+    """
+
+    def __init__(self, threshold: int, reminder_interval: timedelta) -> None:
+        self.threshold = max(threshold, 1)
+        self.reminder_interval = reminder_interval
+
+    def evaluate(
+        self, state: AlertState, up: bool, down: bool, checked_at: datetime
+    ) -> Optional[str]:
+        """
+        This method moves the state of a website on by one check, and
+        returns the kind of alert the check should send, if any.
+
+        :param state: The alerting state of the website, updated in place
+        :type state: AlertState
+        :param up: Whether the check found the website up
+        :type up: bool
+        :param down: Whether the check found the website down
+        :type down: bool
+        :param checked_at: The date and time of the check
+        :type checked_at: datetime
+
+        :return: The kind of alert to send, if any.
+        """
+
+        is_alerted_down = state.alert_status == StatusTypes.DOWN.value
+
+        if not down:
+            state.consecutive_failures = 0
+            if up and is_alerted_down:
+                state.alert_status = StatusTypes.UP.value
+                state.last_alerted_at = checked_at
+                return AlertKinds.UP.value
+            return None
+
+        state.consecutive_failures += 1
+
+        if not is_alerted_down:
+            if state.consecutive_failures >= self.threshold:
+                state.alert_status = StatusTypes.DOWN.value
+                state.last_alerted_at = checked_at
+                return AlertKinds.DOWN.value
+            return None
+
+        if (
+            self.reminder_interval
+            and state.last_alerted_at is not None
+            and checked_at - state.last_alerted_at >= self.reminder_interval
+        ):
+            state.last_alerted_at = checked_at
+            return AlertKinds.REMINDER.value
+        return None
@@ -0,0 +1,70 @@
+# Stdlib Imports
+import base64
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Django Imports
+from django.conf import settings
+from django.db import models
+
+# Third Party Imports
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def build_fernet(keys: Tuple[str, ...], secret_key: str) -> MultiFernet:
+    # without keys of its own, the key is derived from the secret key
+    if not keys:
+        digest = hashlib.sha256(secret_key.encode()).digest()
+        keys = (base64.urlsafe_b64encode(digest).decode(),)
+    return MultiFernet([Fernet(key) for key in keys])
+
+
+def get_fernet() -> MultiFernet:
+    """
+    This function gets the cipher credentials are encrypted with: the
+    first of MONITOR_CREDENTIALS_KEYS encrypts, and every one of them
+    decrypts, so keys can be rotated.
+
+    :return: The cipher.
+    """
+
+    return build_fernet(
+        tuple(settings.MONITOR_CREDENTIALS_KEYS), settings.SECRET_KEY
+    )
+
+
+def encrypt(value: str) -> str:
+    return get_fernet().encrypt(value.encode()).decode()
+
+
+def decrypt(value: str) -> str:
+    return get_fernet().decrypt(value.encode()).decode()
+
+
+class EncryptedTextField(models.TextField):
+    """
+    This field keeps a secret encrypted at rest, decrypting it when it is
+    read from the database. Secrets that can't be decrypted, such as
+    those encrypted with a key that was since removed, are read as None.
+    """
+
+    def from_db_value(self, value, expression, connection) -> Optional[str]:
+        if value is None:
+            return None
+        try:
+            return decrypt(value)
+        except InvalidToken:
+            logger.error("A %s can't be decrypted.", self)
+            return None
+
+    def get_prep_value(self, value) -> Optional[str]:
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return encrypt(value)
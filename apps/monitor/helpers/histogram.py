@@ -0,0 +1,103 @@
+# Stdlib Imports
+from bisect import bisect_left
+from typing import Iterable, List, Optional
+
+
+# upper bounds (inclusive) of the latency buckets in milliseconds,
+# latencies above the last bound fall into an overflow bucket
+LATENCY_BUCKET_BOUNDS = (
+    5,
+    10,
+    25,
+    50,
+    75,
+    100,
+    150,
+    200,
+    300,
+    500,
+    750,
+    1000,
+    1500,
+    2000,
+    3000,
+    5000,
+    10000,
+    30000,
+)
+
+
+class LatencyHistogram:
+    """
+    A fixed-bucket latency histogram.
+
+    Every histogram shares the same bucket bounds, so two histograms can be
+    merged by adding their counts, and percentiles can be computed from the
+    counts alone without keeping raw samples around.
+    """
+
+    def __init__(self, counts: Optional[Iterable[int]] = None) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKET_BOUNDS) + 1)
+        for index, count in enumerate(counts or []):
+            self.counts[index] = count
+
+    @staticmethod
+    def bucket_of(latency_ms: int) -> int:
+        return bisect_left(LATENCY_BUCKET_BOUNDS, latency_ms)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def add(self, latency_ms: int, count: int = 1) -> None:
+        """
+        This method records a latency in the bucket it falls into.
+
+        :param latency_ms: The latency in milliseconds
+        :type latency_ms: int
+        :param count: How many times the latency was observed
+        :type count: int
+        """
+
+        self.counts[self.bucket_of(latency_ms)] += count
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        This method adds the counts of another histogram to this one.
+
+        :param other: The histogram to merge in
+        :type other: LatencyHistogram
+
+        :return: This histogram.
+        """
+
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        return self
+
+    def percentile(self, quantile: float) -> Optional[int]:
+        """
+        This method estimates a latency percentile as the upper bound of
+        the bucket the percentile falls into.
+
+        :param quantile: The quantile to estimate, between 0 and 1
+        :type quantile: float
+
+        :return: The estimated latency in milliseconds, if any were recorded.
+        """
+
+        total = self.total
+        if not total:
+            return None
+
+        rank, cumulative = quantile * total, 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                return LATENCY_BUCKET_BOUNDS[
+                    min(index, len(LATENCY_BUCKET_BOUNDS) - 1)
+                ]
+        return LATENCY_BUCKET_BOUNDS[-1]
+
+    def to_list(self) -> List[int]:
+        return list(self.counts)
@@ -0,0 +1,92 @@
+# Stdlib Imports
+import io
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Django Imports
+from django.db import connection
+
+
+# the phases of a monitoring chunk, in the order they run
+CYCLE_PHASES = ("fetch", "probe", "persist", "notify")
+
+
+class PhaseTimer:
+    """
+    This class measures the phases of a monitoring chunk: how long each
+    took, and how many queries each ran on the connection of this thread.
+
+    Phases can be nested, such as notifications queued within the persist
+    transaction: the outer phase is paused while the inner one runs, so
+    no time or query is counted twice.
+
+    When profiling, every phase also runs under a single cProfile profiler,
+    whose stats can be formatted once the chunk is done.
+    """
+
+    def __init__(self, profile: bool = False) -> None:
+        self.timings: Dict[str, float] = dict.fromkeys(CYCLE_PHASES, 0.0)
+        self.queries: Dict[str, int] = dict.fromkeys(CYCLE_PHASES, 0)
+        self.profiler = cProfile.Profile() if profile else None
+        self.active: List[str] = []
+        self.started_at = 0.0
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries[self.active[-1]] += 1
+        return execute(sql, params, many, context)
+
+    def switch(self) -> None:
+        # adds the time since the last switch to the running phase
+        now = time.perf_counter()
+        if self.active:
+            self.timings[self.active[-1]] += now - self.started_at
+        self.started_at = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        outermost = not self.active
+        self.switch()
+        self.active.append(name)
+        try:
+            if not outermost:
+                yield
+                return
+
+            if self.profiler is not None:
+                self.profiler.enable()
+            try:
+                with connection.execute_wrapper(self.count_query):
+                    yield
+            finally:
+                if self.profiler is not None:
+                    self.profiler.disable()
+        finally:
+            self.switch()
+            self.active.pop()
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    def format_profile(self, lines: int) -> Optional[str]:
+        """
+        This method formats the stats of the profiler, sorted by
+        cumulative time.
+
+        :param lines: The number of functions to list
+        :type lines: int
+
+        :return: The formatted stats, or None if it wasn't profiling.
+        """
+
+        if self.profiler is None:
+            return None
+
+        output = io.StringIO()
+        pstats.Stats(self.profiler, stream=output).sort_stats(
+            pstats.SortKey.CUMULATIVE
+        ).print_stats(lines)
+        return output.getvalue()
@@ -0,0 +1,98 @@
+# Stdlib Imports
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Own Imports
+from apps.monitor.models import StatusTypes
+
+
+class AdaptiveInterval:
+    """
+    This class adapts how often a website is checked to how stable it is,
+    starting from the check interval it was configured with:
+
+    - down or failing, it is checked more often, so a recovery is seen soon
+    - flapping, its status changed within the last stable period, or it is
+      down for a large share of its checks, it is checked as often as when
+      down, so the next outage is seen soon too
+    - not checked yet, it keeps its check interval
+    - stable, its interval is stretched by one more check interval for every
+      stable period it stayed up, up to a maximum factor
+
+    Intervals never go below the minimum interval, and stretched intervals
+    never go above the maximum interval (or the check interval, if longer).
+    """
+
+    def __init__(
+        self,
+        minimum: timedelta,
+        maximum: timedelta,
+        down_factor: float,
+        max_factor: float,
+        stable_period: timedelta,
+        flapping_ratio: float,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.down_factor = down_factor
+        self.max_factor = max(max_factor, 1)
+        self.stable_period = stable_period
+        self.flapping_ratio = flapping_ratio
+
+    def is_flapping(
+        self,
+        stable_since: Optional[datetime],
+        uptime_counts: int,
+        downtime_counts: int,
+        now: datetime,
+    ) -> bool:
+        if stable_since is None or now - stable_since < self.stable_period:
+            return True
+        checks = uptime_counts + downtime_counts
+        return bool(checks) and downtime_counts / checks >= self.flapping_ratio
+
+    def get_interval(
+        self,
+        check_interval: timedelta,
+        status: Optional[str],
+        consecutive_failures: int,
+        stable_since: Optional[datetime],
+        uptime_counts: int,
+        downtime_counts: int,
+        now: datetime,
+    ) -> timedelta:
+        """
+        This method works out how long to wait before checking a website
+        again.
+
+        :param check_interval: The check interval the website was set up with
+        :type check_interval: timedelta
+        :param status: The current status (up, down) of the website
+        :type status: str
+        :param consecutive_failures: The number of failed checks in a row
+        :type consecutive_failures: int
+        :param stable_since: When the status of the website last changed
+        :type stable_since: datetime
+        :param uptime_counts: The number of checks that found it up
+        :type uptime_counts: int
+        :param downtime_counts: The number of checks that found it down
+        :type downtime_counts: int
+        :param now: The date and time of the check
+        :type now: datetime
+
+        :return: The interval until the next check.
+        """
+
+        if status == StatusTypes.DOWN.value or consecutive_failures:
+            return max(check_interval * self.down_factor, self.minimum)
+
+        if status != StatusTypes.UP.value:
+            return check_interval
+
+        if self.is_flapping(stable_since, uptime_counts, downtime_counts, now):
+            return max(check_interval * self.down_factor, self.minimum)
+
+        factor = min(
+            1 + (now - stable_since) // self.stable_period, self.max_factor
+        )
+        return max(min(check_interval * factor, self.maximum), check_interval)
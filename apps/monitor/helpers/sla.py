@@ -0,0 +1,183 @@
+# Stdlib Imports
+from copy import deepcopy
+from datetime import datetime
+from typing import Dict, Optional
+
+# Own Imports
+from apps.monitor.helpers.histogram import LatencyHistogram
+
+
+# ring buffers of time buckets, as (bucket length in seconds, bucket count)
+SLA_RINGS = {"hourly": (3600, 24), "daily": (86400, 90)}
+
+# rolling windows, as (name, ring buffer, number of buckets in the window)
+SLA_WINDOWS = (
+    ("24h", "hourly", 24),
+    ("7d", "daily", 7),
+    ("30d", "daily", 30),
+    ("90d", "daily", 90),
+)
+
+
+class SLAWindows:
+    """
+    Rolling uptime and latency windows of a single website.
+
+    Probes are added to the current bucket of each ring buffer, and to the
+    running totals of every window. When a ring moves on to a new bucket,
+    the bucket that falls out of each window is subtracted from that
+    window's totals, so recording a probe costs O(1) and reading a window
+    never has to add up its buckets.
+
+    The state is a plain dictionary, so it can be stored in a JSON field:
+
+    - heads: the index of the latest bucket of each ring
+    - slots: the buckets of each ring, as [index, totals]
+    - windows: the running totals of each window
+
+    Totals are kept as [up count, probe count, latency histogram counts],
+    with the histogram of a bucket stored sparsely to keep the state small.
+    """
+
+    def __init__(self, state: Optional[dict] = None) -> None:
+        state = state or {}
+        self.heads: Dict[str, int] = state.get("heads", {})
+        self.slots: Dict[str, list] = state.get(
+            "slots",
+            {ring: [None] * size for ring, (_, size) in SLA_RINGS.items()},
+        )
+        self.windows: Dict[str, list] = state.get(
+            "windows", {name: self.empty_totals() for name, *_ in SLA_WINDOWS}
+        )
+
+    @staticmethod
+    def empty_totals() -> list:
+        return [0, 0, LatencyHistogram().to_list()]
+
+    def to_state(self) -> dict:
+        return {
+            "heads": self.heads,
+            "slots": self.slots,
+            "windows": self.windows,
+        }
+
+    def advance(self, ring: str, index: int) -> None:
+        """
+        This method moves a ring on to a new bucket, expiring the buckets
+        that fall out of the windows kept on that ring.
+
+        :param ring: The name of the ring buffer
+        :type ring: str
+        :param index: The index of the new bucket
+        :type index: int
+        """
+
+        _, size = SLA_RINGS[ring]
+        head = self.heads.get(ring)
+
+        if head is not None and index <= head:
+            return
+
+        windows = [
+            (name, length) for name, r, length in SLA_WINDOWS if r == ring
+        ]
+
+        if head is None or index - head >= size:
+            # every bucket of the ring has expired
+            self.slots[ring] = [None] * size
+            for name, _ in windows:
+                self.windows[name] = self.empty_totals()
+
+        else:
+            for new_index in range(head + 1, index + 1):
+                for name, length in windows:
+                    slot = self.slots[ring][(new_index - length) % size]
+                    if slot is not None and slot[0] == new_index - length:
+                        self.subtract(self.windows[name], slot[1])
+                self.slots[ring][new_index % size] = None
+
+        self.heads[ring] = index
+
+    @staticmethod
+    def subtract(totals: list, expired: list) -> None:
+        totals[0] -= expired[0]
+        totals[1] -= expired[1]
+        for bucket, count in expired[2].items():
+            totals[2][int(bucket)] -= count
+
+    def record(
+        self, checked_at: datetime, up: bool, latency_ms: Optional[int]
+    ) -> None:
+        """
+        This method adds a probe to its bucket and to every window.
+
+        :param checked_at: The date and time of the probe
+        :type checked_at: datetime
+        :param up: Whether the probe found the website up
+        :type up: bool
+        :param latency_ms: The latency of the probe in milliseconds
+        :type latency_ms: int
+        """
+
+        timestamp = int(checked_at.timestamp())
+
+        for ring, (period, size) in SLA_RINGS.items():
+            index = timestamp // period
+            self.advance(ring, index)
+            head = self.heads[ring]
+
+            # the probe is older than anything the ring keeps
+            if index <= head - size:
+                continue
+
+            position = index % size
+            if self.slots[ring][position] is None:
+                self.slots[ring][position] = [index, [0, 0, {}]]
+
+            self.add(self.slots[ring][position][1], up, latency_ms)
+            for name, r, length in SLA_WINDOWS:
+                if r == ring and index > head - length:
+                    self.add(self.windows[name], up, latency_ms)
+
+    @staticmethod
+    def add(totals: list, up: bool, latency_ms: Optional[int]) -> None:
+        totals[0] += int(up)
+        totals[1] += 1
+
+        if latency_ms is not None:
+            bucket = LatencyHistogram.bucket_of(latency_ms)
+            if isinstance(totals[2], dict):
+                totals[2][str(bucket)] = totals[2].get(str(bucket), 0) + 1
+            else:
+                totals[2][bucket] += 1
+
+    def summary(self, now: datetime) -> dict:
+        """
+        This method reports the uptime percentage and latency percentiles
+        of every window, as of the given date and time.
+
+        :param now: The date and time to report the windows at
+        :type now: datetime
+
+        :return: A dictionary of window summaries.
+        """
+
+        windows = SLAWindows(deepcopy(self.to_state()))
+        timestamp = int(now.timestamp())
+        for ring, (period, _) in SLA_RINGS.items():
+            windows.advance(ring, timestamp // period)
+
+        summary = {}
+        for name, *_ in SLA_WINDOWS:
+            up, total, counts = windows.windows[name]
+            histogram = LatencyHistogram(counts)
+            summary[name] = {
+                "probe_count": total,
+                "uptime_percentage": round(up / total * 100, 3)
+                if total
+                else None,
+                "latency_p50_ms": histogram.percentile(0.50),
+                "latency_p95_ms": histogram.percentile(0.95),
+                "latency_p99_ms": histogram.percentile(0.99),
+            }
+        return summary
@@ -0,0 +1,195 @@
+# Stdlib Imports
+import time
+import resource
+from typing import List
+
+# Django Imports
+from django.conf import settings
+from django.db import connection
+from django.core.management.base import BaseCommand, CommandError
+
+# Own Imports
+from apps.monitor.models import (
+    AuthenticationScheme,
+    AuthTypes,
+    HostCircuit,
+    PendingNotification,
+    Websites,
+)
+from apps.monitor.benchmark import (
+    LATENCY_DISTRIBUTIONS,
+    FleetProfile,
+    percentile,
+    start_fleet,
+)
+from apps.monitor.services import authenticate_websites, import_websites
+from apps.monitor.snapshot import get_status_snapshot
+from apps.monitor.tasks import (
+    aggregate_monitoring_cycle,
+    monitor_websites_chunk,
+)
+from apps.monitor.utils import chunked
+
+
+class QueryCounter:
+    # counts every query run on the connection, without keeping them
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks monitoring cycles against a synthetic fleet of sites "
+        "served from loopback addresses, and reports sites per second, "
+        "cycle times, queries per site and peak memory. It runs offline, "
+        "but writes the sites it registers to the configured database, so "
+        "run it against a scratch database."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--sites", type=int, default=1000)
+        parser.add_argument("--hosts", type=int, default=50)
+        parser.add_argument("--cycles", type=int, default=5)
+        parser.add_argument(
+            "--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal"
+        )
+        parser.add_argument("--latency-ms", type=float, default=50.0)
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--hang-rate", type=float, default=0.0)
+        parser.add_argument("--auth-rate", type=float, default=0.0)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.MONITOR_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the registered sites once the benchmark is done.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        for name in ("sites", "hosts", "cycles", "chunk_size"):
+            if options[name] < 1:
+                raise CommandError(
+                    f"--{name.replace('_', '-')} must be at least 1."
+                )
+
+        try:
+            profile = FleetProfile(
+                sites=options["sites"],
+                hosts=options["hosts"],
+                latency=options["latency"],
+                latency_ms=options["latency_ms"],
+                error_rate=options["error_rate"],
+                hang_rate=options["hang_rate"],
+                auth_rate=options["auth_rate"],
+                seed=options["seed"],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        fleet, fleet_sites = start_fleet(profile)
+        sites = [site for _, site in fleet_sites]
+        website_ids, durations, queries = [], [], 0
+        try:
+            registered_in = self.register(profile, fleet_sites)
+            website_ids = list(
+                Websites.objects.filter(site__in=sites).values_list(
+                    "id", flat=True
+                )
+            )
+            for _ in range(options["cycles"]):
+                duration, cycle_queries = self.run_cycle(
+                    website_ids, options["chunk_size"]
+                )
+                durations.append(duration)
+                queries += cycle_queries
+        finally:
+            fleet.terminate()
+            fleet.join()
+            if not options["keep"]:
+                self.clean_up(profile, sites)
+
+        probed = len(website_ids) * len(durations)
+        if not probed:
+            raise CommandError("None of the sites were registered.")
+        # ru_maxrss is in kilobytes on linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(
+            f"Registered {len(website_ids)} sites in {registered_in:.3f}s\n"
+            f"Cycles: {len(durations)}\n"
+            f"Sites/sec: {probed / sum(durations):.1f}\n"
+            f"Cycle time p50: {percentile(durations, 0.5):.3f}s\n"
+            f"Cycle time p99: {percentile(durations, 0.99):.3f}s\n"
+            f"Queries per site: {queries / probed:.2f}\n"
+            f"Peak RSS: {peak_rss:.1f} MiB"
+        )
+
+    def register(self, profile: FleetProfile, fleet_sites: list) -> float:
+        rows = []
+        for number, site in fleet_sites:
+            data = {"site": site}
+            if number in profile.authenticated:
+                data.update(
+                    auth_scheme=AuthTypes.TOKEN_AUTH.value,
+                    username="benchmark",
+                    password="benchmark",
+                )
+            rows.append((number, data))
+
+        # logins are run here rather than queued, as the registered sites
+        # are probed right away
+        started_at = time.perf_counter()
+        summary = import_websites(rows)
+        authenticate_websites(
+            [data["site"] for _, data in rows if data.get("auth_scheme")]
+        )
+        if summary["errors"]:
+            self.stderr.write(
+                f"{len(summary['errors'])} sites were not registered, "
+                f"the first with: {summary['errors'][0]['errors']}"
+            )
+        return time.perf_counter() - started_at
+
+    def run_cycle(self, website_ids: List[int], chunk_size: int) -> tuple:
+        """
+        This method runs one monitoring cycle of the given websites, with
+        the chunks probed one after another in this process, as an eager
+        celery worker would.
+
+        :param website_ids: The ids of the websites to probe
+        :type website_ids: List[int]
+        :param chunk_size: The number of websites per chunk
+        :type chunk_size: int
+
+        :return: How long the cycle took, and the number of queries it ran.
+        """
+
+        counter = QueryCounter()
+        started_at = time.time()
+        deadline = started_at + settings.MONITOR_CYCLE_DEADLINE
+        # timed here, as the cycle duration is rounded to milliseconds
+        timer_started_at = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            summaries = [
+                monitor_websites_chunk(chunk, deadline)
+                for chunk in chunked(sorted(website_ids), chunk_size)
+            ]
+            aggregate_monitoring_cycle(summaries, started_at)
+        return time.perf_counter() - timer_started_at, counter.count
+
+    def clean_up(self, profile: FleetProfile, sites: List[str]) -> None:
+        for batch in chunked(sites, settings.MONITOR_IMPORT_BATCH_SIZE):
+            Websites.objects.filter(site__in=batch).delete()
+            AuthenticationScheme.objects.filter(site__in=batch).delete()
+            PendingNotification.objects.filter(site__in=batch).delete()
+
+        HostCircuit.objects.filter(host__in=profile.addresses).delete()
+
+        snapshot = get_status_snapshot()
+        if snapshot is not None:
+            snapshot.delete(sites)
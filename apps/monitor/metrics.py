@@ -0,0 +1,192 @@
+# Stdlib Imports
+import os
+import hmac
+import logging
+import ipaddress
+from typing import Iterable, Iterator
+
+# Django Imports
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+
+# Own Imports
+from apps.monitor.probes import ProbeOutcome
+
+# Third Party Imports
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+
+logger = logging.getLogger(__name__)
+
+PROBE_LATENCY = Histogram(
+    "monitor_probe_latency_seconds",
+    "How long probes took to get a response or fail.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+PROBE_OUTCOMES = Counter(
+    "monitor_probe_outcomes_total",
+    "Probes by outcome: up, down, other, or the kind of error raised.",
+    ["outcome"],
+)
+PROBES_SKIPPED = Counter(
+    "monitor_probes_skipped_total",
+    "Websites not probed, by reason.",
+    ["reason"],
+)
+CYCLE_DURATION = Histogram(
+    "monitor_cycle_duration_seconds",
+    "How long monitoring cycles took, from dispatch to aggregation.",
+    buckets=(1, 5, 15, 30, 60, 120, 240, 480, 900),
+)
+DB_WRITE_DURATION = Histogram(
+    "monitor_db_write_seconds",
+    "How long writes of the monitoring pipeline took, by operation.",
+    ["operation"],
+)
+NOTIFICATION_SEND_DURATION = Histogram(
+    "monitor_notification_send_seconds",
+    "How long sending a batch of notification emails took.",
+)
+AUTH_REFRESHES = Counter(
+    "monitor_auth_refreshes_total",
+    "Credentials refreshed after expiring or being rejected, by result.",
+    ["result"],
+)
+
+
+def observe_probe_outcomes(outcomes: Iterable[ProbeOutcome]) -> None:
+    """
+    This function records the latency and outcome of a batch of probes.
+
+    :param outcomes: The outcomes of the probes
+    :type outcomes: Iterable[ProbeOutcome]
+    """
+
+    for outcome in outcomes:
+        if outcome.skipped is not None:
+            PROBES_SKIPPED.labels(outcome.skipped).inc()
+            continue
+
+        if outcome.error is not None:
+            label = outcome.error
+        elif outcome.is_up:
+            label = "up"
+        elif outcome.is_down:
+            label = "down"
+        else:
+            label = "other"
+        PROBE_OUTCOMES.labels(label).inc()
+
+        if outcome.latency_ms is not None:
+            PROBE_LATENCY.observe(outcome.latency_ms / 1000)
+
+
+class QueueDepthCollector:
+    """
+    This collector reads how many tasks are waiting in the celery queues
+    when metrics are scraped, as the depth of a queue belongs to the
+    broker rather than to any one process.
+    """
+
+    def describe(self) -> Iterator[GaugeMetricFamily]:
+        # registering the collector must not connect to the broker
+        yield self.get_metric_family()
+
+    def get_metric_family(self) -> GaugeMetricFamily:
+        return GaugeMetricFamily(
+            "monitor_celery_queue_depth",
+            "Tasks waiting in each celery queue.",
+            labels=["queue"],
+        )
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        # imported here, as the celery app imports the django settings
+        from saas.task_queue import app
+
+        depth = self.get_metric_family()
+        try:
+            with app.connection_for_read() as connection:
+                channel = connection.default_channel
+                for queue in settings.MONITOR_METRICS_QUEUES:
+                    _, count, _ = channel.queue_declare(queue, passive=True)
+                    depth.add_metric([queue], count)
+        except Exception as error:
+            logger.warning("Celery queue depth is unavailable: %r", error)
+        yield depth
+
+
+queue_depth_collector = QueueDepthCollector()
+REGISTRY.register(queue_depth_collector)
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    """
+    This function gets the registry to export metrics from. When gunicorn
+    and celery processes share a PROMETHEUS_MULTIPROC_DIR, the metrics
+    every one of them wrote there are aggregated, rather than only those
+    of the process serving the request.
+
+    :return: A collector registry.
+    """
+
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(queue_depth_collector)
+    return registry
+
+
+def mark_process_dead(pid: int) -> None:
+    # the gauges of a process that exited are no longer live
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+def is_metrics_scraper(request: HttpRequest) -> bool:
+    """
+    This function checks that a request for the metrics comes from an
+    address in MONITOR_METRICS_ALLOWED_IPS, or carries the bearer token in
+    MONITOR_METRICS_TOKEN, when one is set.
+
+    :param request: The request for the metrics
+    :type request: HttpRequest
+
+    :return: True if the metrics may be served.
+    """
+
+    token = settings.MONITOR_METRICS_TOKEN
+    if token and hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode(),
+    ):
+        return True
+
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.MONITOR_METRICS_ALLOWED_IPS
+    )
+
+
+def export_metrics(request: HttpRequest) -> HttpResponse:
+    if not is_metrics_scraper(request):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        generate_latest(get_metrics_registry()),
+        content_type=CONTENT_TYPE_LATEST,
+    )
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:01
+
+import datetime
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def spread_next_check_at(apps, schema_editor):
+    # spread existing websites over their check interval, so they
+    # don't all become due in the same scheduler tick
+    Websites = apps.get_model("monitor", "Websites")
+    now = django.utils.timezone.now()
+
+    websites = list(Websites.objects.only("id", "check_interval"))
+    for website in websites:
+        offset = website.id % int(website.check_interval.total_seconds())
+        website.next_check_at = now + datetime.timedelta(seconds=offset)
+
+    Websites.objects.bulk_update(websites, ["next_check_at"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0010_alter_authenticationscheme_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="websites",
+            name="check_interval",
+            field=models.DurationField(default=datetime.timedelta(seconds=900)),
+        ),
+        migrations.AddField(
+            model_name="websites",
+            name="next_check_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+        migrations.RunPython(spread_next_check_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0011_websites_check_interval_websites_next_check_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProbeResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("checked_at", models.DateTimeField()),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("latency_ms", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "error",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("timeout", "Timeout"),
+                            ("connect", "Connect"),
+                            ("protocol", "Protocol"),
+                        ],
+                        max_length=8,
+                        null=True,
+                    ),
+                ),
+                (
+                    "site",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="probe_results",
+                        to="monitor.websites",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Probe Results",
+                "db_table": "probe_results",
+                "ordering": ["-checked_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="proberesult",
+            index=models.Index(
+                fields=["site", "-checked_at"], name="probe_results_site_time_idx"
+            ),
+        ),
+    ]
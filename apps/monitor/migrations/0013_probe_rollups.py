@@ -0,0 +1,121 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0012_proberesult"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=30, unique=True)),
+                ("last_id", models.PositiveBigIntegerField(default=0)),
+                ("date_modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Rollup Checkpoints",
+                "db_table": "rollup_checkpoints",
+            },
+        ),
+        migrations.CreateModel(
+            name="HourlyProbeRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("probe_count", models.PositiveIntegerField(default=0)),
+                ("up_count", models.PositiveIntegerField(default=0)),
+                ("down_count", models.PositiveIntegerField(default=0)),
+                ("latency_min_ms", models.PositiveIntegerField(blank=True, null=True)),
+                ("latency_max_ms", models.PositiveIntegerField(blank=True, null=True)),
+                ("latency_sum_ms", models.PositiveBigIntegerField(default=0)),
+                ("latency_count", models.PositiveIntegerField(default=0)),
+                ("latency_histogram", models.JSONField(default=list)),
+                (
+                    "site",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hourly_rollups",
+                        to="monitor.websites",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Hourly Probe Rollups",
+                "db_table": "hourly_probe_rollups",
+                "ordering": ["-bucket"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyProbeRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("probe_count", models.PositiveIntegerField(default=0)),
+                ("up_count", models.PositiveIntegerField(default=0)),
+                ("down_count", models.PositiveIntegerField(default=0)),
+                ("latency_min_ms", models.PositiveIntegerField(blank=True, null=True)),
+                ("latency_max_ms", models.PositiveIntegerField(blank=True, null=True)),
+                ("latency_sum_ms", models.PositiveBigIntegerField(default=0)),
+                ("latency_count", models.PositiveIntegerField(default=0)),
+                ("latency_histogram", models.JSONField(default=list)),
+                (
+                    "site",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="monitor.websites",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Daily Probe Rollups",
+                "db_table": "daily_probe_rollups",
+                "ordering": ["-bucket"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="hourlyproberollup",
+            constraint=models.UniqueConstraint(
+                fields=("site", "bucket"), name="hourly_rollups_site_bucket"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyproberollup",
+            constraint=models.UniqueConstraint(
+                fields=("site", "bucket"), name="daily_rollups_site_bucket"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0013_probe_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WebsiteSLA",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(primary_key=True, serialize=False, unique=True),
+                ),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                ("date_modified", models.DateTimeField(auto_now=True)),
+                ("windows", models.JSONField(default=dict)),
+                (
+                    "site",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sla",
+                        to="monitor.websites",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Website SLAs",
+                "db_table": "website_slas",
+                "ordering": ["-date_created"],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0014_websitesla"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailyproberollup",
+            name="connect_histogram",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="dailyproberollup",
+            name="tls_histogram",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="hourlyproberollup",
+            name="connect_histogram",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="hourlyproberollup",
+            name="tls_histogram",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="proberesult",
+            name="connect_ms",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="proberesult",
+            name="tls_ms",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0015_probe_connection_phases"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="authenticationscheme",
+            name="auth_type",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("session", "Session Auth"),
+                    ("token", "Token Auth"),
+                    ("bearer", "Jwt Auth"),
+                ],
+                max_length=7,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="authenticationscheme",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="authenticationscheme",
+            name="password",
+            field=models.CharField(blank=True, max_length=300, null=True),
+        ),
+        migrations.AddField(
+            model_name="authenticationscheme",
+            name="username",
+            field=models.CharField(blank=True, max_length=150, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0016_authenticationscheme_credentials"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="websites",
+            name="alert_status",
+            field=models.CharField(
+                blank=True,
+                choices=[("up", "Up"), ("down", "Down")],
+                max_length=4,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="websites",
+            name="consecutive_failures",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="websites",
+            name="last_alerted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
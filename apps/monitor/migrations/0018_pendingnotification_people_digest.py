@@ -0,0 +1,50 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0017_websites_alert_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("site", models.URLField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("down", "Down"),
+                            ("up", "Up"),
+                            ("reminder", "Reminder"),
+                        ],
+                        max_length=8,
+                    ),
+                ),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name_plural": "Pending Notifications",
+                "db_table": "pending_notifications",
+                "ordering": ["id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="people",
+            name="digest",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0018_pendingnotification_people_digest"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="historicalstats",
+            index=models.Index(
+                fields=["-date_created", "-id"],
+                name="historical_stats_keyset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0019_historical_stats_keyset_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="websites",
+            index=models.Index(
+                fields=["-date_created", "-id"], name="websites_keyset_idx"
+            ),
+        ),
+    ]
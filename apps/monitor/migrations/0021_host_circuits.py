@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0020_websites_keyset_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HostCircuit",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                ("date_modified", models.DateTimeField(auto_now=True)),
+                ("host", models.CharField(max_length=255, unique=True)),
+                ("failures", models.PositiveIntegerField(default=0)),
+                ("opened_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "Host Circuits",
+                "db_table": "host_circuits",
+                "ordering": ["host"],
+            },
+        ),
+    ]
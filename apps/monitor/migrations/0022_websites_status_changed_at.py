@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0021_host_circuits"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="websites",
+            name="status_changed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0022_websites_status_changed_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonitorCycle",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                ("date_modified", models.DateTimeField(auto_now=True)),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField()),
+                ("duration", models.FloatField()),
+                ("sites", models.PositiveIntegerField(default=0)),
+                ("chunks", models.PositiveIntegerField(default=0)),
+                ("up", models.PositiveIntegerField(default=0)),
+                ("down", models.PositiveIntegerField(default=0)),
+                ("skipped", models.PositiveIntegerField(default=0)),
+                ("fetch_time", models.FloatField(default=0)),
+                ("probe_time", models.FloatField(default=0)),
+                ("persist_time", models.FloatField(default=0)),
+                ("notify_time", models.FloatField(default=0)),
+                ("fetch_queries", models.PositiveIntegerField(default=0)),
+                ("probe_queries", models.PositiveIntegerField(default=0)),
+                ("persist_queries", models.PositiveIntegerField(default=0)),
+                ("notify_queries", models.PositiveIntegerField(default=0)),
+                ("profile", models.TextField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "Monitor Cycles",
+                "db_table": "monitor_cycles",
+                "ordering": ["-date_created"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="monitorcycle",
+            index=models.Index(
+                fields=["-date_created", "-id"],
+                name="monitor_cycles_keyset_idx",
+            ),
+        ),
+    ]
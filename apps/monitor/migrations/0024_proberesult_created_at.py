@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:49
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0023_monitor_cycles"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="proberesult",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0024_proberesult_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pendingnotification",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="pendingnotification",
+            name="claimed_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:56
+
+import apps.monitor.helpers.encryption
+from apps.monitor.helpers.encryption import decrypt, encrypt
+from django.db import migrations, models
+
+
+def encrypt_passwords(apps, schema_editor):
+    # passwords are still plain text fields at this point, so they are
+    # read as stored and written back encrypted
+    AuthenticationScheme = apps.get_model("monitor", "AuthenticationScheme")
+
+    schemes = list(
+        AuthenticationScheme.objects.filter(password__isnull=False).only(
+            "id", "password"
+        )
+    )
+    for scheme in schemes:
+        scheme.password = encrypt(scheme.password)
+
+    AuthenticationScheme.objects.bulk_update(
+        schemes, ["password"], batch_size=1000
+    )
+
+
+def decrypt_passwords(apps, schema_editor):
+    AuthenticationScheme = apps.get_model("monitor", "AuthenticationScheme")
+
+    schemes = list(
+        AuthenticationScheme.objects.filter(password__isnull=False).only(
+            "id", "password"
+        )
+    )
+    for scheme in schemes:
+        scheme.password = decrypt(scheme.password)
+
+    AuthenticationScheme.objects.bulk_update(
+        schemes, ["password"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0025_pendingnotification_claims"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="authenticationscheme",
+            name="password",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunPython(encrypt_passwords, decrypt_passwords),
+        migrations.AlterField(
+            model_name="authenticationscheme",
+            name="password",
+            field=apps.monitor.helpers.encryption.EncryptedTextField(
+                blank=True, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0026_encrypt_passwords"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitorcycle",
+            name="failed_chunks",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0027_monitorcycle_failed_chunks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pendingnotification",
+            name="delivered_to",
+            field=models.JSONField(default=list),
+        ),
+    ]
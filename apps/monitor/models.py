@@ -1,8 +1,15 @@
+# Stdlib Imports
+from datetime import timedelta
+from typing import Optional
+
 # Django Imports
 from django.db import models
+from django.utils import timezone
 
 # Own Imports
 from apps.monitor.helpers.object_tracker import ObjectTracker
+from apps.monitor.helpers.encryption import EncryptedTextField
+from apps.monitor.helpers.histogram import LatencyHistogram
 
 
 class AuthTypes(models.Choices):
@@ -16,6 +23,18 @@ class StatusTypes(models.Choices):
     DOWN = "down"
 
 
+class AlertKinds(models.Choices):
+    DOWN = "down"
+    UP = "up"
+    REMINDER = "reminder"
+
+
+class ErrorKinds(models.Choices):
+    TIMEOUT = "timeout"
+    CONNECT = "connect"
+    PROTOCOL = "protocol"
+
+
 class Websites(ObjectTracker):
     """
     Defines the schema for websites table in the database.
@@ -24,7 +43,13 @@ class Websites(ObjectTracker):
         - id (int): the object primary key
         - site (url): the url of the webite
         - status (str): the status (up, down) of the website
+        - status_changed_at (datetime): when the status last changed
         - has_authentication (bool): does the site require authentication?
+        - check_interval (duration): how often the website should be checked
+        - next_check_at (datetime): when the website is next due for a check
+        - consecutive_failures (int): the number of failed checks in a row
+        - alert_status (str): the status (up, down) people were last alerted of
+        - last_alerted_at (datetime): the date and time of the last alert
         - date_created (datetime): the date and time the object was created
         - date_modified (datetime): the date and time the object was modified
     """
@@ -33,7 +58,15 @@ class Websites(ObjectTracker):
     status = models.CharField(
         max_length=4, choices=StatusTypes.choices, null=True, blank=True
     )
+    status_changed_at = models.DateTimeField(null=True, blank=True)
     has_authentication = models.BooleanField(default=False)
+    check_interval = models.DurationField(default=timedelta(minutes=15))
+    next_check_at = models.DateTimeField(default=timezone.now, db_index=True)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    alert_status = models.CharField(
+        max_length=4, choices=StatusTypes.choices, null=True, blank=True
+    )
+    last_alerted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self) -> str:
         return str(self.site)
@@ -42,6 +75,11 @@ class Websites(ObjectTracker):
         db_table = "websites"
         ordering = ["-date_created"]
         verbose_name_plural = "Websites"
+        indexes = [
+            models.Index(
+                fields=["-date_created", "-id"], name="websites_keyset_idx"
+            ),
+        ]
 
 
 class AuthenticationScheme(ObjectTracker):
@@ -54,6 +92,11 @@ class AuthenticationScheme(ObjectTracker):
         - session_auth (str): session authentication (requires username and password)
         - token_auth (str): token authentication (x-api-key, token)
         - bearer_auth (str): jwt authentication (jwt, bearer)
+        - auth_type (str): the authentication scheme (session, token, bearer)
+        - username (str): the username to re-authenticate with
+        - password (str): the password to re-authenticate with, encrypted
+          at rest
+        - expires_at (datetime): when the credential expires, if known
         - date_created (datetime): the date and time the object was created
         - date_modified (datetime): the date and time the object was modified
     """
@@ -62,6 +105,12 @@ class AuthenticationScheme(ObjectTracker):
     session_auth = models.CharField(max_length=300, null=True, blank=True)
     token_auth = models.CharField(max_length=300, null=True, blank=True)
     bearer_auth = models.CharField(max_length=300, null=True, blank=True)
+    auth_type = models.CharField(
+        max_length=7, choices=AuthTypes.choices, null=True, blank=True
+    )
+    username = models.CharField(max_length=150, null=True, blank=True)
+    password = EncryptedTextField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self) -> str:
         return f"{self.site}'s authentication scheme"
@@ -96,6 +145,219 @@ class HistoricalStats(ObjectTracker):
         db_table = "historical_stats"
         ordering = ["-date_created"]
         verbose_name_plural = "Historial Stats"
+        indexes = [
+            models.Index(
+                fields=["-date_created", "-id"],
+                name="historical_stats_keyset_idx",
+            ),
+        ]
+
+
+class ProbeResult(models.Model):
+    """
+    Defines the schema for probe results table in the database.
+
+    This table is append-only and written in bulk by the probe pipeline,
+    so it keeps a compact schema without the object tracker timestamps,
+    and is indexed for time-range scans per site.
+
+    Fields:
+        - id (int): the object primary key
+        - site (fk): a foreign-key relationship to the websites table
+        - checked_at (datetime): the date and time the website was probed
+        - status_code (int): the response status code, if any
+        - latency_ms (int): how long the request took in milliseconds
+        - connect_ms (int): how long dns resolution and the tcp connect took
+        - tls_ms (int): how long the tls handshake took
+        - error (str): the kind of error raised while probing, if any
+        - created_at (datetime): when the result was written, which the
+          rollup lag is measured from, as results are probed well before
+          their batch is committed
+    """
+
+    site = models.ForeignKey(
+        Websites,
+        on_delete=models.CASCADE,
+        related_name="probe_results",
+        db_index=False,
+    )
+    checked_at = models.DateTimeField()
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    connect_ms = models.PositiveIntegerField(null=True, blank=True)
+    tls_ms = models.PositiveIntegerField(null=True, blank=True)
+    error = models.CharField(
+        max_length=8, choices=ErrorKinds.choices, null=True, blank=True
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.site_id} probed at {self.checked_at}"
+
+    class Meta:
+        db_table = "probe_results"
+        ordering = ["-checked_at"]
+        verbose_name_plural = "Probe Results"
+        indexes = [
+            models.Index(
+                fields=["site", "-checked_at"],
+                name="probe_results_site_time_idx",
+            ),
+        ]
+
+
+class ProbeRollup(models.Model):
+    """
+    Defines the schema shared by the probe rollup tables in the database.
+
+    Rollups are folded incrementally from the probe results table, one row
+    per site per time bucket, so that dashboards never scan raw results.
+
+    Fields:
+        - id (int): the object primary key
+        - site (fk): a foreign-key relationship to the websites table
+        - bucket (datetime): the start of the time bucket
+        - probe_count (int): the number of probes in the bucket
+        - up_count (int): the number of probes that found the site up
+        - down_count (int): the number of probes that found the site down
+        - latency_min_ms (int): the lowest latency in milliseconds
+        - latency_max_ms (int): the highest latency in milliseconds
+        - latency_sum_ms (int): the sum of all latencies in milliseconds
+        - latency_count (int): the number of probes with a latency
+        - latency_histogram (json): the counts of the latency histogram
+        - connect_histogram (json): the counts of the connect time histogram
+        - tls_histogram (json): the counts of the tls handshake histogram
+    """
+
+    bucket = models.DateTimeField()
+    probe_count = models.PositiveIntegerField(default=0)
+    up_count = models.PositiveIntegerField(default=0)
+    down_count = models.PositiveIntegerField(default=0)
+    latency_min_ms = models.PositiveIntegerField(null=True, blank=True)
+    latency_max_ms = models.PositiveIntegerField(null=True, blank=True)
+    latency_sum_ms = models.PositiveBigIntegerField(default=0)
+    latency_count = models.PositiveIntegerField(default=0)
+    latency_histogram = models.JSONField(default=list)
+    connect_histogram = models.JSONField(default=list)
+    tls_histogram = models.JSONField(default=list)
+
+    @property
+    def uptime_ratio(self) -> Optional[float]:
+        if not self.probe_count:
+            return None
+        return round(self.up_count / self.probe_count, 4)
+
+    @property
+    def latency_avg_ms(self) -> Optional[int]:
+        if not self.latency_count:
+            return None
+        return round(self.latency_sum_ms / self.latency_count)
+
+    @property
+    def latency_p50_ms(self) -> Optional[int]:
+        return LatencyHistogram(self.latency_histogram).percentile(0.50)
+
+    @property
+    def latency_p95_ms(self) -> Optional[int]:
+        return LatencyHistogram(self.latency_histogram).percentile(0.95)
+
+    @property
+    def latency_p99_ms(self) -> Optional[int]:
+        return LatencyHistogram(self.latency_histogram).percentile(0.99)
+
+    def __str__(self) -> str:
+        return f"{self.site}'s rollup for {self.bucket}"
+
+    class Meta:
+        abstract = True
+        ordering = ["-bucket"]
+
+
+class HourlyProbeRollup(ProbeRollup):
+    """
+    Defines the schema for hourly probe rollups table in the database.
+    """
+
+    site = models.ForeignKey(
+        Websites, on_delete=models.CASCADE, related_name="hourly_rollups"
+    )
+
+    class Meta(ProbeRollup.Meta):
+        db_table = "hourly_probe_rollups"
+        verbose_name_plural = "Hourly Probe Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["site", "bucket"], name="hourly_rollups_site_bucket"
+            ),
+        ]
+
+
+class DailyProbeRollup(ProbeRollup):
+    """
+    Defines the schema for daily probe rollups table in the database.
+    """
+
+    site = models.ForeignKey(
+        Websites, on_delete=models.CASCADE, related_name="daily_rollups"
+    )
+
+    class Meta(ProbeRollup.Meta):
+        db_table = "daily_probe_rollups"
+        verbose_name_plural = "Daily Probe Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["site", "bucket"], name="daily_rollups_site_bucket"
+            ),
+        ]
+
+
+class RollupCheckpoint(models.Model):
+    """
+    Defines the schema for rollup checkpoints table in the database.
+
+    Fields:
+        - id (int): the object primary key
+        - name (str): the name of the rollup pipeline
+        - last_id (int): the id of the last probe result folded in
+        - date_modified (datetime): the date and time the object was modified
+    """
+
+    name = models.CharField(max_length=30, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    date_modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} checkpoint at {self.last_id}"
+
+    class Meta:
+        db_table = "rollup_checkpoints"
+        verbose_name_plural = "Rollup Checkpoints"
+
+
+class WebsiteSLA(ObjectTracker):
+    """
+    Defines the schema for website sla table in the database.
+
+    Fields:
+        - id (int): the object primary key
+        - site (o2o): one-to-one key relationship to the websites table
+        - windows (json): the state of the rolling 24h/7d/30d/90d windows
+        - date_created (datetime): the date and time the object was created
+        - date_modified (datetime): the date and time the object was modified
+    """
+
+    site = models.OneToOneField(
+        Websites, on_delete=models.CASCADE, related_name="sla"
+    )
+    windows = models.JSONField(default=dict)
+
+    def __str__(self) -> str:
+        return f"{self.site}'s sla windows"
+
+    class Meta:
+        db_table = "website_slas"
+        ordering = ["-date_created"]
+        verbose_name_plural = "Website SLAs"
 
 
 class People(ObjectTracker):
@@ -105,11 +367,13 @@ class People(ObjectTracker):
     Fields:
         - id (int): the object primary key
         - email_address (str): email address of the user
+        - digest (bool): does the user want alerts bundled into one email?
         - date_created (datetime): the date and time the object was created
         - date_modified (datetime): the date and time the object was modified
     """
 
     email_address = models.EmailField(unique=True)
+    digest = models.BooleanField(default=False)
 
     def __str__(self) -> str:
         return self.email_address
@@ -144,3 +408,140 @@ class NotifyGroup(ObjectTracker):
         db_table = "notify_group"
         ordering = ["-date_created"]
         verbose_name_plural = "Notify Group"
+
+
+class PendingNotification(models.Model):
+    """
+    Defines the schema for pending notifications table in the database,
+    alerts waiting to be emailed with the next delivery.
+
+    Fields:
+        - id (int): the object primary key
+        - site (url): the url of the website the alert is about
+        - kind (str): the kind of alert (down, reminder, up)
+        - attempts (int): the number of deliveries that claimed the alert
+        - claimed_until (datetime): until when a delivery holds the alert,
+          after which a failed delivery is retried
+        - delivered_to (list): the email addresses the alert was already
+          sent to, which a retried delivery skips
+        - date_created (datetime): the date and time the alert was raised
+    """
+
+    site = models.URLField()
+    kind = models.CharField(max_length=8, choices=AlertKinds.choices)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    delivered_to = models.JSONField(default=list)
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.site} {self.kind} alert"
+
+    class Meta:
+        db_table = "pending_notifications"
+        ordering = ["id"]
+        verbose_name_plural = "Pending Notifications"
+
+
+class HostCircuit(ObjectTracker):
+    """
+    Defines the schema for host circuits table in the database, the
+    persisted state of the circuit breaker of hosts that are failing.
+
+    Fields:
+        - id (int): the object primary key
+        - host (str): the host name the circuit guards
+        - failures (int): the number of failed probes in a row
+        - opened_at (datetime): when the circuit was opened, if it is open
+        - date_created (datetime): the date and time the object was created
+        - date_modified (datetime): the date and time the object was modified
+    """
+
+    host = models.CharField(max_length=255, unique=True)
+    failures = models.PositiveIntegerField(default=0)
+    opened_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.host}'s circuit"
+
+    class Meta:
+        db_table = "host_circuits"
+        ordering = ["host"]
+        verbose_name_plural = "Host Circuits"
+
+
+class MonitorCycle(ObjectTracker):
+    """
+    Defines the schema for monitor cycles table in the database, a record
+    of every monitoring cycle and where its time went.
+
+    Phase times and query counts are summed over the chunks of the cycle,
+    so with chunks running in parallel they can add up to more than the
+    duration of the cycle.
+
+    Fields:
+        - id (int): the object primary key
+        - started_at (datetime): when the cycle was dispatched
+        - finished_at (datetime): when the last chunk of the cycle was done
+        - duration (float): how long the cycle took, in seconds
+        - sites (int): the number of websites probed
+        - chunks (int): the number of chunks the websites were split into
+        - failed_chunks (int): the number of chunks that failed, whose
+          websites were not probed
+        - up (int): the number of websites found up
+        - down (int): the number of websites found down
+        - skipped (int): the number of websites skipped
+        - fetch_time (float): seconds spent fetching the websites to probe
+        - probe_time (float): seconds spent probing the websites
+        - persist_time (float): seconds spent writing the probe outcomes
+        - notify_time (float): seconds spent queueing notifications
+        - fetch_queries (int): queries run fetching the websites to probe
+        - probe_queries (int): queries run probing, to refresh credentials
+        - persist_queries (int): queries run writing the probe outcomes
+        - notify_queries (int): queries run queueing notifications
+        - profile (str): the cProfile stats of the slowest chunk, if sampled
+        - date_created (datetime): the date and time the object was created
+        - date_modified (datetime): the date and time the object was modified
+    """
+
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration = models.FloatField()
+    sites = models.PositiveIntegerField(default=0)
+    chunks = models.PositiveIntegerField(default=0)
+    failed_chunks = models.PositiveIntegerField(default=0)
+    up = models.PositiveIntegerField(default=0)
+    down = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    fetch_time = models.FloatField(default=0)
+    probe_time = models.FloatField(default=0)
+    persist_time = models.FloatField(default=0)
+    notify_time = models.FloatField(default=0)
+    fetch_queries = models.PositiveIntegerField(default=0)
+    probe_queries = models.PositiveIntegerField(default=0)
+    persist_queries = models.PositiveIntegerField(default=0)
+    notify_queries = models.PositiveIntegerField(default=0)
+    profile = models.TextField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"Monitor cycle of {self.sites} websites at {self.started_at}"
+
+    @property
+    def queries(self) -> int:
+        return (
+            self.fetch_queries
+            + self.probe_queries
+            + self.persist_queries
+            + self.notify_queries
+        )
+
+    class Meta:
+        db_table = "monitor_cycles"
+        ordering = ["-date_created"]
+        verbose_name_plural = "Monitor Cycles"
+        indexes = [
+            models.Index(
+                fields=["-date_created", "-id"],
+                name="monitor_cycles_keyset_idx",
+            ),
+        ]
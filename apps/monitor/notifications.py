@@ -0,0 +1,319 @@
+# Stdlib Imports
+import logging
+import smtplib
+from datetime import timedelta
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+
+# Own Imports
+from apps.monitor.models import AlertKinds, NotifyGroup, PendingNotification
+from apps.monitor.metrics import NOTIFICATION_SEND_DURATION
+
+
+# the subject and message of each kind of alert
+ALERT_MESSAGES = {
+    AlertKinds.DOWN.value: (
+        "[NOTIFY]: Website downtime",
+        "{website} is currently facing a downtime.",
+    ),
+    AlertKinds.REMINDER.value: (
+        "[NOTIFY]: Website still down",
+        "{website} is still facing a downtime.",
+    ),
+    AlertKinds.UP.value: (
+        "[NOTIFY]: Website recovered",
+        "{website} is back up.",
+    ),
+}
+
+
+logger = logging.getLogger(__name__)
+
+RECIPIENTS_KEY = "monitor:recipients:{site}"
+
+
+def get_recipients_key(site: str) -> str:
+    return RECIPIENTS_KEY.format(site=site)
+
+
+def build_recipients(sites: List[str]) -> Dict[str, List[Tuple[str, bool]]]:
+    """
+    This function maps the given sites to the people to notify about them,
+    across every group watching them, in a single query.
+
+    :param sites: The sites to get the recipients of
+    :type sites: List[str]
+
+    :return: A dictionary of (email address, digest) pairs, keyed by site.
+    """
+
+    recipients = defaultdict(set)
+    for site, email_address, digest in NotifyGroup.objects.filter(
+        notify__site__in=sites, emails__isnull=False
+    ).values_list("notify__site", "emails__email_address", "emails__digest"):
+        recipients[site].add((email_address, digest))
+
+    return {site: sorted(recipients[site]) for site in sites}
+
+
+def invalidate_recipients(sites: Iterable[str]) -> None:
+    cache.delete_many([get_recipients_key(site) for site in set(sites)])
+
+
+def get_notification_recipients(
+    sites: Iterable[str],
+) -> Dict[str, List[Tuple[str, bool]]]:
+    """
+    This function gets the people to notify about each of the given sites,
+    cached under a key per site, in a single round trip to the cache. The
+    recipients of sites that were invalidated or have expired are built
+    in a single query, and cached again.
+
+    :param sites: The sites to get the recipients of
+    :type sites: Iterable[str]
+
+    :return: A dictionary of (email address, digest) pairs, keyed by site.
+    """
+
+    sites = list(sites)
+    keys = {get_recipients_key(site): site for site in sites}
+    recipients = {
+        keys[key]: people for key, people in cache.get_many(keys).items()
+    }
+
+    missing = [site for site in keys.values() if site not in recipients]
+    if missing:
+        built = build_recipients(missing)
+        cache.set_many(
+            {
+                get_recipients_key(site): people
+                for site, people in built.items()
+            },
+            settings.MONITOR_RECIPIENT_INDEX_TTL,
+        )
+        recipients.update(built)
+
+    return {site: recipients[site] for site in sites}
+
+
+def queue_notifications(transitions: List[List[str]]) -> int:
+    """
+    This function queues the alerts raised by a batch of probes, to be
+    emailed with the next delivery.
+
+    :param transitions: The alerts raised, as [site, alert kind] pairs
+    :type transitions: List[List[str]]
+
+    :return: The number of queued notifications.
+    """
+
+    PendingNotification.objects.bulk_create(
+        [
+            PendingNotification(site=site, kind=kind)
+            for site, kind in transitions
+        ]
+    )
+    return len(transitions)
+
+
+def build_notification_messages(
+    alerts: List[Tuple[int, str, str, List[str]]],
+    recipients: Dict[str, List[Tuple[str, bool]]],
+) -> List[Tuple[EmailMessage, List[int]]]:
+    """
+    This function builds the emails for a batch of alerts:
+
+    - one email per alert, to everyone watching the site without a digest
+    - one digest email per person who opted into it, listing their alerts
+
+    Recipients an alert was already sent to are left out, so a retried
+    delivery only emails the ones that were missed.
+
+    :param alerts: The alerts to email, as (id, site, alert kind, email
+    addresses already sent to) tuples
+    :type alerts: List[Tuple[int, str, str, List[str]]]
+    :param recipients: The (email address, digest) pairs of each site
+    :type recipients: Dict[str, List[Tuple[str, bool]]]
+
+    :return: A list of email messages, with the ids of the alerts each one
+    carries.
+    """
+
+    messages, digests = [], defaultdict(list)
+
+    for notification_id, site, kind, delivered_to in alerts:
+        emails = []
+        for email_address, digest in recipients.get(site, []):
+            if email_address in delivered_to:
+                continue
+            if digest:
+                digests[email_address].append((notification_id, site, kind))
+            else:
+                emails.append(email_address)
+
+        if emails:
+            subject, message = ALERT_MESSAGES[kind]
+            messages.append(
+                (
+                    EmailMessage(
+                        subject=subject,
+                        body="Hello, " + message.format(website=site),
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=emails,
+                    ),
+                    [notification_id],
+                )
+            )
+
+    for email_address, digest_alerts in digests.items():
+        lines = [
+            "- " + ALERT_MESSAGES[kind][1].format(website=site)
+            for _, site, kind in digest_alerts
+        ]
+        messages.append(
+            (
+                EmailMessage(
+                    subject=f"[NOTIFY]: {len(digest_alerts)} website alerts",
+                    body="Hello,\n\n" + "\n".join(lines),
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[email_address],
+                ),
+                [notification_id for notification_id, *_ in digest_alerts],
+            )
+        )
+
+    return messages
+
+
+def claim_pending_notifications(
+    limit: int,
+) -> List[Tuple[int, str, str, int, List[str]]]:
+    """
+    This function claims a batch of pending notifications for a delivery,
+    the ones never claimed and those whose claim ran out.
+
+    Notifications are claimed with skip locked and the claim is committed
+    before anything is sent, so concurrent deliveries never email the same
+    alert twice, and no lock is held while talking to the mail server.
+
+    :param limit: The maximum number of notifications to claim
+    :type limit: int
+
+    :return: A list of (id, site, alert kind, attempts, email addresses
+    already sent to) tuples.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        pending = list(
+            PendingNotification.objects.select_for_update(skip_locked=True)
+            .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now))
+            .order_by("id")
+            .values_list("id", "site", "kind", "attempts", "delivered_to")[
+                :limit
+            ]
+        )
+        PendingNotification.objects.filter(
+            id__in=[notification_id for notification_id, *_ in pending]
+        ).update(
+            attempts=F("attempts") + 1,
+            claimed_until=now
+            + timedelta(seconds=settings.MONITOR_NOTIFY_CLAIM_TIMEOUT),
+        )
+
+    return [
+        (notification_id, site, kind, attempts + 1, delivered_to)
+        for notification_id, site, kind, attempts, delivered_to in pending
+    ]
+
+
+def deliver_pending_notifications(limit: Optional[int] = None) -> int:
+    """
+    This function emails the pending notifications over a single SMTP
+    connection, and removes the ones delivered from the queue.
+
+    Notifications whose emails could not all be sent stay in the queue,
+    along with who they were already sent to, and are retried for the
+    other recipients once their claim runs out, until they have been tried
+    MONITOR_NOTIFY_MAX_ATTEMPTS times.
+
+    :param limit: The maximum number of notifications to deliver
+    :type limit: int
+
+    :return: The number of notifications delivered.
+    """
+
+    limit = limit or settings.MONITOR_NOTIFY_BATCH_SIZE
+    pending = claim_pending_notifications(limit)
+    if not pending:
+        return 0
+
+    messages = build_notification_messages(
+        [
+            (notification_id, site, kind, delivered_to)
+            for notification_id, site, kind, _, delivered_to in pending
+        ],
+        get_notification_recipients(site for _, site, *_ in pending),
+    )
+
+    failed, sent_to = set(), defaultdict(list)
+    if messages:
+        mail_connection = get_connection(
+            username=settings.EMAIL_HOST_USER,
+            password=settings.EMAIL_HOST_PASSWORD,
+        )
+        with NOTIFICATION_SEND_DURATION.time():
+            try:
+                mail_connection.open()
+            except (smtplib.SMTPException, OSError) as error:
+                logger.warning("Mail server is unavailable: %r", error)
+                failed.update(
+                    notification_id for notification_id, *_ in pending
+                )
+            else:
+                for message, notification_ids in messages:
+                    try:
+                        mail_connection.send_messages([message])
+                    except (smtplib.SMTPException, OSError) as error:
+                        logger.warning(
+                            "Notification to %s was not sent: %r",
+                            message.to,
+                            error,
+                        )
+                        failed.update(notification_ids)
+                    else:
+                        for notification_id in notification_ids:
+                            sent_to[notification_id].extend(message.to)
+                mail_connection.close()
+
+    delivered, dropped, retried = [], [], []
+    for notification_id, site, kind, attempts, delivered_to in pending:
+        if notification_id not in failed:
+            delivered.append(notification_id)
+        elif attempts >= settings.MONITOR_NOTIFY_MAX_ATTEMPTS:
+            logger.error(
+                "Dropping the %s alert of %s after %s attempts.",
+                kind,
+                site,
+                attempts,
+            )
+            dropped.append(notification_id)
+        elif notification_id in sent_to:
+            retried.append(
+                PendingNotification(
+                    id=notification_id,
+                    delivered_to=delivered_to + sent_to[notification_id],
+                )
+            )
+
+    PendingNotification.objects.filter(id__in=delivered + dropped).delete()
+    PendingNotification.objects.bulk_update(retried, ["delivered_to"])
+    return len(delivered)
@@ -0,0 +1,143 @@
+# Stdlib Imports
+import base64
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+# Django Imports
+from django.conf import settings
+from django.db.models import Model, Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+# Rest Framework Imports
+from rest_framework import exceptions, pagination
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+
+
+Position = Tuple[datetime, int]
+
+
+def filter_after(queryset: QuerySet, position: Optional[Position]) -> QuerySet:
+    """
+    This function orders a queryset by creation date and id, newest first,
+    and keeps the rows that come after the given position.
+
+    :param queryset: The queryset to filter
+    :type queryset: QuerySet
+    :param position: The (date created, id) of the last row already seen
+    :type position: Tuple[datetime, int]
+
+    :return: A queryset of the rows after the position.
+    """
+
+    queryset = queryset.order_by("-date_created", "-id")
+    if position is None:
+        return queryset
+
+    date_created, pk = position
+    return queryset.filter(
+        Q(date_created__lt=date_created)
+        | Q(date_created=date_created, id__lt=pk)
+    )
+
+
+def get_position(row: Model) -> Position:
+    return row.date_created, row.id
+
+
+def iterate_keyset(queryset: QuerySet, batch_size: int) -> Iterator[Model]:
+    """
+    This function iterates over every row of a queryset in keyset batches,
+    so only one batch (and its prefetched relations) is held in memory.
+
+    :param queryset: The queryset to iterate over
+    :type queryset: QuerySet
+    :param batch_size: The number of rows to fetch per query
+    :type batch_size: int
+
+    :return: An iterator of rows, newest first.
+    """
+
+    position = None
+    while True:
+        batch = list(filter_after(queryset, position)[:batch_size])
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        position = get_position(batch[-1])
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    This class paginates a queryset on (date created, id), newest first.
+
+    The cursor encodes the position of the last row of the page, so every
+    page is fetched with an index range scan instead of an offset, and
+    rows created while paging don't shift the pages that follow.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> List[Model]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        rows = list(
+            filter_after(queryset, self.decode_cursor(request))[
+                : self.page_size + 1
+            ]
+        )
+        page = rows[: self.page_size]
+        self.next_position = (
+            get_position(page[-1]) if len(rows) > self.page_size else None
+        )
+        return page
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(
+                request.query_params.get(
+                    self.page_size_query_param, settings.MONITOR_PAGE_SIZE
+                )
+            )
+        except ValueError:
+            page_size = settings.MONITOR_PAGE_SIZE
+        return min(max(page_size, 1), settings.MONITOR_MAX_PAGE_SIZE)
+
+    def decode_cursor(self, request: Request) -> Optional[Position]:
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            date_created, pk = (
+                base64.urlsafe_b64decode(cursor.encode())
+                .decode()
+                .rsplit("|", 1)
+            )
+            date_created = parse_datetime(date_created)
+            if date_created is None:
+                raise ValueError
+            return date_created, int(pk)
+        except (TypeError, ValueError):
+            raise exceptions.ValidationError(
+                {"message": "Cursor is not valid."}
+            )
+
+    def encode_cursor(self, position: Position) -> str:
+        date_created, pk = position
+        return base64.urlsafe_b64encode(
+            f"{date_created.isoformat()}|{pk}".encode()
+        ).decode()
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
@@ -0,0 +1,83 @@
+# Stdlib Imports
+import csv
+import json
+from typing import IO, Iterator, Union
+
+# Rest Framework Imports
+from rest_framework.parsers import BaseParser
+
+
+class CSVRowsParser(BaseParser):
+    """
+    This parser reads a csv upload lazily, as an iterator of rows keyed by
+    the header, so a large import is never held in memory at once. Rows
+    that can't be decoded are passed on as text, so they can be reported
+    as invalid rows.
+    """
+
+    media_type = "text/csv"
+
+    def parse(
+        self, stream: IO[bytes], media_type=None, parser_context=None
+    ) -> Iterator[Union[dict, str]]:
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if stream is None:
+            return iter(())
+        return self.read_rows(stream, encoding)
+
+    @staticmethod
+    def read_rows(
+        stream: IO[bytes], encoding: str
+    ) -> Iterator[Union[dict, str]]:
+        undecodable = []
+
+        def read_lines() -> Iterator[str]:
+            for line in stream:
+                try:
+                    yield line.decode(encoding)
+                except UnicodeDecodeError:
+                    line = line.decode(encoding, errors="replace")
+                    undecodable.append(line)
+                    yield line
+
+        for row in csv.DictReader(read_lines()):
+            if undecodable:
+                yield "".join(undecodable).strip()
+                undecodable.clear()
+            else:
+                yield row
+
+
+class NDJSONRowsParser(BaseParser):
+    """
+    This parser reads a newline delimited json upload lazily, as an
+    iterator of rows. Lines that can't be decoded or are not valid json
+    are passed on as text, so they can be reported as invalid rows.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(
+        self, stream: IO[bytes], media_type=None, parser_context=None
+    ) -> Iterator[Union[dict, str]]:
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if stream is None:
+            return iter(())
+        return self.read_rows(stream, encoding)
+
+    @staticmethod
+    def read_rows(
+        stream: IO[bytes], encoding: str
+    ) -> Iterator[Union[dict, str]]:
+        for line in stream:
+            try:
+                line = line.decode(encoding).strip()
+            except UnicodeDecodeError:
+                yield line.decode(encoding, errors="replace").strip()
+                continue
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line
@@ -0,0 +1,402 @@
+# Stdlib Imports
+import time
+import asyncio
+import threading
+from datetime import datetime
+from collections import defaultdict
+from urllib.parse import urlsplit
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Dict, Iterable, List, Optional
+
+# Django Imports
+from django.conf import settings
+from django.utils import timezone
+
+# Own Imports
+from apps.monitor.models import ErrorKinds
+
+# Third Party Imports
+import httpx
+
+
+DOWN_STATUS_CODES = (500, 502, 503, 504)
+
+# responses that mean the credential of an authenticated website is stale
+REJECTED_STATUS_CODES = (401, 403)
+
+# why a website was not probed: its host's circuit is open, or the cycle
+# ran out of time before its turn
+SKIPPED_CIRCUIT_OPEN = "circuit_open"
+SKIPPED_DEADLINE = "deadline"
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    """
+    A website to probe, along with the headers needed to reach it.
+
+    Fields:
+        - website_id (int): the primary key of the website
+        - site (str): the url of the website
+        - headers (dict): extra request headers (e.g. authorization)
+    """
+
+    website_id: int
+    site: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ProbeOutcome:
+    """
+    The result of probing a single website.
+
+    Fields:
+        - website_id (int): the primary key of the website
+        - site (str): the url of the website
+        - checked_at (datetime): the date and time the website was probed
+        - status_code (int): the response status code, if any
+        - latency_ms (int): how long the request took in milliseconds
+        - connect_ms (int): how long dns resolution and the tcp connect took
+        - tls_ms (int): how long the tls handshake took
+        - error (str): the kind of error raised while probing, if any
+        - skipped (str): why the website was not probed, if it wasn't
+
+    Connect and tls timings are only set when the request opened a new
+    connection, as httpx does not expose dns resolution on its own.
+    """
+
+    website_id: int
+    site: str
+    checked_at: Optional[datetime] = None
+    status_code: Optional[int] = None
+    latency_ms: Optional[int] = None
+    connect_ms: Optional[int] = None
+    tls_ms: Optional[int] = None
+    error: Optional[str] = None
+    skipped: Optional[str] = None
+
+    @property
+    def is_up(self) -> bool:
+        return is_up(self.status_code)
+
+    @property
+    def is_down(self) -> bool:
+        return is_down(self.status_code, self.error)
+
+    @property
+    def reused_connection(self) -> bool:
+        return self.status_code is not None and self.connect_ms is None
+
+
+def is_up(status_code: Optional[int]) -> bool:
+    return status_code == 200
+
+
+def is_down(status_code: Optional[int], error: Optional[str]) -> bool:
+    return error is not None or status_code in DOWN_STATUS_CODES
+
+
+class ProbeTrace:
+    """
+    This class collects the duration of the connection phases of a request,
+    from the trace events emitted by httpcore.
+    """
+
+    PHASES = {
+        "connection.connect_tcp": "connect",
+        "connection.start_tls": "tls",
+    }
+
+    def __init__(self) -> None:
+        self.started: Dict[str, float] = {}
+        self.durations: Dict[str, int] = {}
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        name, _, state = event_name.rpartition(".")
+        if name not in self.PHASES:
+            return
+
+        if state == "started":
+            self.started[name] = time.perf_counter()
+        elif state == "complete" and name in self.started:
+            self.durations[self.PHASES[name]] = int(
+                (time.perf_counter() - self.started[name]) * 1000
+            )
+
+
+def get_authentication_headers(authentication_scheme) -> Dict[str, str]:
+    """
+    This function builds the request headers needed to probe a website
+    protected by the given authentication scheme.
+
+    :param authentication_scheme: The authentication scheme of the website
+    :type authentication_scheme: AuthenticationScheme
+
+    :return: A dictionary of headers.
+    """
+
+    if authentication_scheme is None:
+        return {}
+
+    if authentication_scheme.session_auth is not None:
+        return {"Cookie": authentication_scheme.session_auth}
+    elif authentication_scheme.token_auth is not None:
+        return {"Authorization": f"Token {authentication_scheme.token_auth}"}
+    elif authentication_scheme.bearer_auth is not None:
+        return {"Authorization": f"Bearer {authentication_scheme.bearer_auth}"}
+    return {}
+
+
+def build_probe_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """
+    This function builds an asyncio http client with keep-alive connection
+    pooling, configured from the monitor settings.
+
+    :param transport: The transport to send requests with, if not the default
+    :type transport: httpx.AsyncBaseTransport
+
+    :return: An asyncio http client.
+    """
+
+    return httpx.AsyncClient(
+        timeout=settings.MONITOR_PROBE_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.MONITOR_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MONITOR_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.MONITOR_POOL_KEEPALIVE_EXPIRY,
+        ),
+        http2=settings.MONITOR_PROBE_HTTP2,
+        transport=transport,
+    )
+
+
+class ProbeClientPool:
+    """
+    This class keeps an event loop and an http client alive for the lifetime
+    of a worker, so that probe tasks reuse keep-alive connections (and the
+    tcp and tls handshakes behind them) across monitoring cycles.
+
+    Connections are bound to the event loop that opened them, which is why
+    the pool owns its loop instead of starting a new one per cycle.
+    """
+
+    def __init__(
+        self, transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.client = build_probe_client(transport)
+
+    def run(self, coroutine: Awaitable) -> Any:
+        return self.loop.run_until_complete(coroutine)
+
+    def close(self) -> None:
+        self.run(self.client.aclose())
+        self.loop.close()
+
+
+# one pool per worker thread, as an event loop can't be shared across threads
+_local = threading.local()
+
+
+def get_probe_pool() -> ProbeClientPool:
+    """
+    This function gets the probe client pool of the current worker thread,
+    opening one if there isn't any yet.
+
+    :return: The probe client pool.
+    """
+
+    if getattr(_local, "pool", None) is None:
+        _local.pool = ProbeClientPool()
+    return _local.pool
+
+
+def close_probe_pool() -> None:
+    """
+    This function closes the probe client pool of the current worker thread.
+    """
+
+    if getattr(_local, "pool", None) is not None:
+        _local.pool.close()
+        _local.pool = None
+
+
+class ProbeEngine:
+    """
+    This class probes many websites concurrently with an asyncio client.
+
+    The number of requests in flight at any time is bounded by the
+    concurrency limit, and per host by the per-host limit, so a cycle
+    takes roughly (number of sites / concurrency) x average latency.
+
+    When given a client pool, the engine probes through the pool's client
+    and loop; otherwise it opens a client of its own for a single run.
+
+    When given a credential cache, authenticated websites that reject their
+    credential are probed once more after the credential is refreshed.
+
+    When given a circuit breaker, websites of hosts whose circuit is open
+    are skipped. When given a deadline, websites whose turn comes after it
+    are skipped, and no probe runs past it.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        pool: Optional[ProbeClientPool] = None,
+        credentials=None,
+        breaker=None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        self.concurrency = concurrency or settings.MONITOR_PROBE_CONCURRENCY
+        self.timeout = timeout or settings.MONITOR_PROBE_TIMEOUT
+        self.per_host_limit = settings.MONITOR_POOL_PER_HOST_LIMIT
+        self.transport = transport
+        self.pool = pool
+        self.credentials = credentials
+        self.breaker = breaker
+        self.deadline = deadline
+
+    def run(self, targets: Iterable[ProbeTarget]) -> List[ProbeOutcome]:
+        """
+        This method probes the targets and blocks until all of them are done.
+
+        :param targets: The websites to probe
+        :type targets: Iterable[ProbeTarget]
+
+        :return: A list of probe outcomes, in the same order as the targets.
+        """
+
+        targets = list(targets)
+        outcomes = self.execute(targets)
+        if self.credentials is None:
+            return outcomes
+
+        rejected = {
+            index: target
+            for index, (target, outcome) in enumerate(zip(targets, outcomes))
+            if target.headers and outcome.status_code in REJECTED_STATUS_CODES
+        }
+        if not rejected:
+            return outcomes
+
+        refreshed = self.credentials.refresh(
+            {target.site: target.headers for target in rejected.values()}
+        )
+        retries = {
+            index: replace(target, headers=refreshed[target.site])
+            for index, target in rejected.items()
+            if refreshed.get(target.site, target.headers) != target.headers
+        }
+        for index, outcome in zip(
+            retries, self.execute(list(retries.values()))
+        ):
+            outcomes[index] = outcome
+
+        return outcomes
+
+    def execute(self, targets: List[ProbeTarget]) -> List[ProbeOutcome]:
+        if not targets:
+            return []
+        if self.pool is not None:
+            return self.pool.run(self.probe_with(self.pool.client, targets))
+        return asyncio.run(self.probe_all(targets))
+
+    async def probe_all(
+        self, targets: List[ProbeTarget]
+    ) -> List[ProbeOutcome]:
+        async with build_probe_client(self.transport) as client:
+            return await self.probe_with(client, targets)
+
+    async def probe_with(
+        self, client: httpx.AsyncClient, targets: List[ProbeTarget]
+    ) -> List[ProbeOutcome]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        host_semaphores = defaultdict(
+            lambda: asyncio.Semaphore(self.per_host_limit)
+        )
+
+        return await asyncio.gather(
+            *(
+                self.probe(
+                    client,
+                    semaphore,
+                    host_semaphores[urlsplit(target.site).hostname],
+                    target,
+                )
+                for target in targets
+            )
+        )
+
+    def get_budget(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.time()
+
+    async def probe(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        host_semaphore: asyncio.Semaphore,
+        target: ProbeTarget,
+    ) -> ProbeOutcome:
+        outcome = ProbeOutcome(website_id=target.website_id, site=target.site)
+        host = urlsplit(target.site).hostname
+
+        if self.breaker is not None and not self.breaker.allow(host):
+            outcome.skipped = SKIPPED_CIRCUIT_OPEN
+            return outcome
+
+        async with host_semaphore, semaphore:
+            budget = self.get_budget()
+            if budget is not None and budget <= 0:
+                outcome.skipped = SKIPPED_DEADLINE
+                if self.breaker is not None:
+                    self.breaker.release(host)
+                return outcome
+
+            # a probe never runs past the deadline, and one cut short by
+            # it is skipped rather than counted as a timeout
+            timeout = (
+                self.timeout if budget is None else min(self.timeout, budget)
+            )
+            outcome.checked_at = timezone.now()
+            trace = ProbeTrace()
+            started = time.perf_counter()
+
+            try:
+                response = await asyncio.wait_for(
+                    client.get(
+                        target.site,
+                        headers=target.headers,
+                        timeout=timeout,
+                        extensions={"trace": trace},
+                    ),
+                    timeout=timeout,
+                )
+                outcome.status_code = response.status_code
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                if timeout < self.timeout:
+                    outcome.skipped = SKIPPED_DEADLINE
+                else:
+                    outcome.error = ErrorKinds.TIMEOUT.value
+            except httpx.NetworkError:
+                outcome.error = ErrorKinds.CONNECT.value
+            except (httpx.HTTPError, httpx.InvalidURL):
+                outcome.error = ErrorKinds.PROTOCOL.value
+
+            outcome.latency_ms = int((time.perf_counter() - started) * 1000)
+            outcome.connect_ms = trace.durations.get("connect")
+            outcome.tls_ms = trace.durations.get("tls")
+
+        if self.breaker is not None:
+            if outcome.skipped is not None:
+                self.breaker.release(host)
+            else:
+                self.breaker.record(host, outcome.error is None)
+        return outcome
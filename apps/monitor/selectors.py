@@ -1,8 +1,34 @@
+# Stdlib Imports
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+# Django Imports
+from django.utils import timezone
+from django.db.models import Prefetch, QuerySet
+
 # Rest Framework Imports
 from rest_framework import exceptions
 
 # Own Imports
-from apps.monitor.models import Websites, HistoricalStats
+from apps.monitor.models import (
+    Websites,
+    HistoricalStats,
+    ProbeResult,
+    HourlyProbeRollup,
+    DailyProbeRollup,
+    MonitorCycle,
+)
+from apps.monitor.probes import ProbeTarget
+from apps.monitor.credentials import credential_cache
+from apps.monitor.snapshot import get_status_snapshot
+from apps.monitor.helpers.histogram import LatencyHistogram
+
+# Third Party Imports
+import redis
+
+
+logger = logging.getLogger(__name__)
 
 
 def get_website(site: str) -> Websites:
@@ -45,3 +71,224 @@ def get_historical_stats(website: str) -> HistoricalStats:
         historial_stats.save(update_fields=["track"])
 
     return historial_stats
+
+
+def get_probe_targets(
+    website_ids: Optional[List[int]] = None,
+) -> List[ProbeTarget]:
+    """
+    This function gets the websites to monitor, along with the
+    headers needed to reach websites that require authentication,
+    which are served from the in-process credential cache.
+
+    :param website_ids: The ids of the websites to probe, defaults to all
+    :type website_ids: List[int]
+
+    :return: A list of probe targets
+    """
+
+    websites = Websites.objects.all()
+    if website_ids is not None:
+        websites = websites.filter(id__in=website_ids)
+
+    websites = list(websites.values_list("id", "site", "has_authentication"))
+    headers = credential_cache.get_headers(
+        site for _, site, has_auth in websites if has_auth
+    )
+
+    return [
+        ProbeTarget(
+            website_id=website_id,
+            site=site,
+            headers=headers.get(site, {}) if has_auth else {},
+        )
+        for website_id, site, has_auth in websites
+    ]
+
+
+def get_probe_results(
+    website: Websites, start: datetime, end: datetime
+) -> QuerySet:
+    """
+    This function gets the probe results of a website within a time range,
+    most recent first.
+
+    :param website: The website to get the probe results of
+    :type website: Websites
+    :param start: The start of the time range (inclusive)
+    :type start: datetime
+    :param end: The end of the time range (inclusive)
+    :type end: datetime
+
+    :return: A queryset of probe results
+    """
+
+    return ProbeResult.objects.filter(
+        site=website, checked_at__gte=start, checked_at__lte=end
+    ).order_by("-checked_at")
+
+
+def get_recent_rollups(website: Websites) -> dict:
+    """
+    This function gets the hourly rollups of a website for the last day,
+    and its daily rollups for the last thirty days.
+
+    :param website: The website to get the rollups of
+    :type website: Websites
+
+    :return: A dictionary of hourly and daily rollups
+    """
+
+    now = timezone.now()
+    return {
+        "hourly": HourlyProbeRollup.objects.filter(
+            site=website, bucket__gte=now - timedelta(days=1)
+        ),
+        "daily": DailyProbeRollup.objects.filter(
+            site=website, bucket__gte=now - timedelta(days=30)
+        ),
+    }
+
+
+def get_websites_with_stats() -> QuerySet:
+    """
+    This function gets the websites along with everything the read-only
+    website serializer shows, in a constant number of queries:
+
+    - historical stats and sla windows are joined in
+    - hourly rollups for the last day are prefetched as
+      last_day_hourly_rollups
+    - daily rollups for the last thirty days are prefetched as
+      last_month_daily_rollups
+
+    :return: A queryset of websites
+    """
+
+    now = timezone.now()
+    return Websites.objects.select_related(
+        "historicalstats", "sla"
+    ).prefetch_related(
+        Prefetch(
+            "hourly_rollups",
+            queryset=HourlyProbeRollup.objects.filter(
+                bucket__gte=now - timedelta(days=1)
+            ),
+            to_attr="last_day_hourly_rollups",
+        ),
+        Prefetch(
+            "daily_rollups",
+            queryset=DailyProbeRollup.objects.filter(
+                bucket__gte=now - timedelta(days=30)
+            ),
+            to_attr="last_month_daily_rollups",
+        ),
+    )
+
+
+def get_website_with_stats(site: str) -> Websites:
+    """
+    This function gets a website along with its stats, rollups and sla.
+
+    :param site: The url of the website
+    :type site: str
+
+    :return: The website
+    """
+
+    try:
+        return get_websites_with_stats().get(site=site)
+    except (Websites.DoesNotExist):
+        raise exceptions.NotFound({"message": "Website does not exist!"})
+
+
+def get_live_statuses(sites: Iterable[str]) -> Dict[str, dict]:
+    """
+    This function gets the live status of the given websites from the
+    status snapshot, in a single round trip.
+
+    :param sites: The urls of the websites
+    :type sites: Iterable[str]
+
+    :return: The snapshot entries of the websites, keyed by site, or an
+        empty dictionary if the snapshot is disabled or unavailable.
+    """
+
+    snapshot = get_status_snapshot()
+    if snapshot is None:
+        return {}
+
+    try:
+        return snapshot.read(sites)
+    except redis.RedisError as error:
+        # the statuses stored in the database are served instead
+        logger.warning("Status snapshot is unavailable: %r", error)
+        return {}
+
+
+def get_historical_stats_logs() -> QuerySet:
+    """
+    This function gets the historical stats of every website, along with
+    the daily rollups of each website for the last seven days.
+
+    :return: A queryset of historical stats
+    """
+
+    return HistoricalStats.objects.select_related("track").prefetch_related(
+        Prefetch(
+            "track__daily_rollups",
+            queryset=DailyProbeRollup.objects.filter(
+                bucket__gte=timezone.now() - timedelta(days=7)
+            ),
+            to_attr="recent_daily_rollups",
+        )
+    )
+
+
+# the rollups a latency window is computed from, and the span it covers
+LATENCY_WINDOWS = {
+    "24h": (HourlyProbeRollup, timedelta(hours=24)),
+    "7d": (DailyProbeRollup, timedelta(days=7)),
+    "30d": (DailyProbeRollup, timedelta(days=30)),
+    "90d": (DailyProbeRollup, timedelta(days=90)),
+}
+
+
+def get_latency_histograms(website: Websites, window: str) -> dict:
+    """
+    This function merges the latency histograms of the rollups of a
+    website within a window, for the total latency and each phase.
+
+    :param website: The website to get the latency histograms of
+    :type website: Websites
+    :param window: The window to merge, one of LATENCY_WINDOWS
+    :type window: str
+
+    :return: A dictionary of merged histograms, keyed by phase
+    """
+
+    model, span = LATENCY_WINDOWS[window]
+    phases = {
+        "total": "latency_histogram",
+        "connect": "connect_histogram",
+        "tls": "tls_histogram",
+    }
+
+    histograms = {phase: LatencyHistogram() for phase in phases}
+    for rollup in model.objects.filter(
+        site=website, bucket__gte=timezone.now() - span
+    ).values(*phases.values()):
+        for phase, field in phases.items():
+            histograms[phase].merge(LatencyHistogram(rollup[field]))
+
+    return histograms
+
+
+def get_monitor_cycles() -> QuerySet:
+    """
+    This function gets the recorded monitor cycles, without the profile
+    stats, which are only read one cycle at a time.
+
+    :return: A queryset of monitor cycles
+    """
+
+    return MonitorCycle.objects.defer("profile")
@@ -1,8 +1,11 @@
 # Stdlib Imports
-from typing import OrderedDict, List
+from datetime import timedelta
+from functools import partial
+from typing import OrderedDict, List, Optional
 
 # Django Imports
-from django.db.transaction import atomic
+from django.utils import timezone
+from django.db.transaction import atomic, on_commit
 from django.contrib.auth.models import User
 
 # Rest Framework Imports
@@ -16,9 +19,14 @@ from apps.monitor.models import (
     AuthenticationScheme,
     People,
     NotifyGroup,
+    ProbeResult,
+    WebsiteSLA,
+    MonitorCycle,
 )
-from apps.monitor.selectors import get_website
-from apps.monitor.services import Authentication
+from apps.monitor.selectors import get_website, get_recent_rollups
+from apps.monitor.tasks import authenticate_websites_in_background
+from apps.monitor.helpers.sla import SLAWindows
+from apps.monitor.utils import validate_check_interval
 
 
 class AuthenticationSchemeSerializer(serializers.ModelSerializer):
@@ -37,6 +45,10 @@ class NotifyPeopleGroupSerializer(serializers.ModelSerializer):
         email = serializers.EmailField(
             help_text="The email address of whom you want to add to group."
         )
+        digest = serializers.BooleanField(
+            required=False,
+            help_text="Bundle every alert into one email per delivery.",
+        )
 
     notify = serializers.URLField(
         help_text="Website to notify group of downtime."
@@ -61,7 +73,8 @@ class NotifyPeopleGroupSerializer(serializers.ModelSerializer):
             people, _ = People.objects.get_or_create(
                 email_address=email_data["email"]
             )
-            people.save(update_fields=["email_address"])
+            people.digest = email_data.get("digest", people.digest)
+            people.save(update_fields=["email_address", "digest"])
 
             # append people to list
             people_emails.append(people)
@@ -78,9 +91,27 @@ class NotifyPeopleGroupSerializer(serializers.ModelSerializer):
         return notify_group
 
 
+class ProbeRollupSerializer(serializers.Serializer):
+
+    bucket = serializers.DateTimeField()
+    probe_count = serializers.IntegerField()
+    up_count = serializers.IntegerField()
+    down_count = serializers.IntegerField()
+    uptime_ratio = serializers.FloatField()
+    latency_min_ms = serializers.IntegerField()
+    latency_avg_ms = serializers.IntegerField()
+    latency_max_ms = serializers.IntegerField()
+    latency_p50_ms = serializers.IntegerField()
+    latency_p95_ms = serializers.IntegerField()
+    latency_p99_ms = serializers.IntegerField()
+
+
 class HistoricalStatsSerializer(serializers.ModelSerializer):
 
     track = serializers.CharField(source="track.site")
+    daily_rollups = ProbeRollupSerializer(
+        source="track.recent_daily_rollups", many=True, read_only=True
+    )
 
     class Meta:
         model = HistoricalStats
@@ -89,15 +120,64 @@ class HistoricalStatsSerializer(serializers.ModelSerializer):
             "track",
             "uptime_counts",
             "downtime_counts",
+            "daily_rollups",
             "date_created",
             "date_modified",
         ]
         read_only_fields = fields
 
 
+class ProbeResultSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProbeResult
+        fields = [
+            "checked_at",
+            "status_code",
+            "latency_ms",
+            "connect_ms",
+            "tls_ms",
+            "error",
+        ]
+        read_only_fields = fields
+
+
+class MonitorCycleSerializer(serializers.ModelSerializer):
+
+    queries = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = MonitorCycle
+        fields = [
+            "id",
+            "started_at",
+            "finished_at",
+            "duration",
+            "sites",
+            "chunks",
+            "failed_chunks",
+            "up",
+            "down",
+            "skipped",
+            "fetch_time",
+            "probe_time",
+            "persist_time",
+            "notify_time",
+            "fetch_queries",
+            "probe_queries",
+            "persist_queries",
+            "notify_queries",
+            "queries",
+        ]
+        read_only_fields = fields
+
+
 class ReadOnlyWebsiteSerializer(serializers.ModelSerializer):
 
+    status = serializers.SerializerMethodField()
+    live = serializers.SerializerMethodField()
     historical_data = serializers.SerializerMethodField()
+    rollups = serializers.SerializerMethodField()
+    sla = serializers.SerializerMethodField()
 
     class OwnHistoricalStatsSerializer(serializers.ModelSerializer):
         class Meta:
@@ -116,17 +196,64 @@ class ReadOnlyWebsiteSerializer(serializers.ModelSerializer):
             "id",
             "site",
             "status",
+            "live",
             "has_authentication",
+            "check_interval",
+            "next_check_at",
             "historical_data",
+            "rollups",
+            "sla",
         ]
         read_only_fields = fields
 
+    def get_live_status(self, obj: Websites) -> Optional[dict]:
+        # the entries of the status snapshot, read once per response
+        return self.context.get("live_statuses", {}).get(obj.site)
+
+    def get_status(self, obj: Websites) -> Optional[str]:
+        live = self.get_live_status(obj)
+        return live["status"] if live is not None else obj.status
+
+    def get_live(self, obj: Websites) -> Optional[dict]:
+        live = self.get_live_status(obj)
+        if live is None:
+            return None
+        return {
+            "checked_at": live["checked_at"],
+            "latency_ms": live["latency_ms"],
+            "consecutive_failures": live["consecutive_failures"],
+            "status_changed_at": live["status_changed_at"],
+        }
+
     def get_historical_data(self, obj: Websites) -> dict:
-        historical_data = HistoricalStats.objects.filter(
-            track__site=obj.site
-        ).first()
+        try:
+            historical_data = obj.historicalstats
+        except (HistoricalStats.DoesNotExist):
+            historical_data = None
         return self.OwnHistoricalStatsSerializer(historical_data).data
 
+    def get_rollups(self, obj: Websites) -> dict:
+        # use the rollups prefetched by get_websites_with_stats, if any
+        if hasattr(obj, "last_day_hourly_rollups"):
+            rollups = {
+                "hourly": obj.last_day_hourly_rollups,
+                "daily": obj.last_month_daily_rollups,
+            }
+        else:
+            rollups = get_recent_rollups(obj)
+
+        return {
+            granularity: ProbeRollupSerializer(rollups, many=True).data
+            for granularity, rollups in rollups.items()
+        }
+
+    def get_sla(self, obj: Websites) -> dict:
+        try:
+            windows = obj.sla.windows
+        except (WebsiteSLA.DoesNotExist):
+            windows = None
+        return SLAWindows(windows).summary(timezone.now())
+
 
 class WriteOnlyWebsiteSerializer(serializers.ModelSerializer):
 
@@ -137,7 +264,10 @@ class WriteOnlyWebsiteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Websites
-        fields = ["site", "auth_data", "auth_scheme"]
+        fields = ["site", "auth_data", "auth_scheme", "check_interval"]
+
+    def validate_check_interval(self, value: timedelta) -> timedelta:
+        return validate_check_interval(value)
 
     def get_authentication_schemes(self) -> List:
         return [scheme for scheme in AuthTypes.choices]
@@ -147,13 +277,8 @@ class WriteOnlyWebsiteSerializer(serializers.ModelSerializer):
 
         # get fields from validated data
         website = validated_data["site"]
-        username = validated_data["username"]
-        password = validated_data["password"]
-
-        try:
-            authentication_scheme = validated_data["auth_scheme"]
-        except (KeyError):
-            authentication_scheme = None
+        auth_data = validated_data.get("auth_data") or {}
+        authentication_scheme = validated_data.get("auth_scheme")
 
         has_authentication = (
             True if authentication_scheme is not None else False
@@ -165,27 +290,60 @@ class WriteOnlyWebsiteSerializer(serializers.ModelSerializer):
                 site=website,
             )[0]
 
-            # initialize the authentication service
-            authenticate = Authentication(website, username, password)
-
-            # update authentication schema based on type
-            if validated_data["auth_scheme"] == "session":
-                authentication_scheme.session_auth = authenticate.with_session()
-            elif validated_data["auth_scheme"] == "token":
-                authentication_scheme.token_auth = authenticate.with_token()
-            elif validated_data["auth_scheme"] == "bearer":
-                authentication_scheme.bearer_auth = authenticate.with_jwt()
-
-            # save authentication schema to database
+            # keep the credentials, so the website can be authenticated
+            # with again when its session, token or jwt expires
+            authentication_scheme.auth_type = validated_data["auth_scheme"]
+            authentication_scheme.username = auth_data.get("username")
+            authentication_scheme.password = auth_data.get("password")
             authentication_scheme.save()
 
+            # authenticate in the background once the website is saved,
+            # so adding it doesn't wait on its login endpoint
+            on_commit(
+                partial(authenticate_websites_in_background.delay, [website])
+            )
+
         # return the newly created instance (website)
-        return super().create(
-            {
-                "site": website,
-                "has_authentication": has_authentication,
-            }
-        )
+        website_data = {
+            "site": website,
+            "has_authentication": has_authentication,
+        }
+        if "check_interval" in validated_data:
+            website_data["check_interval"] = validated_data["check_interval"]
+
+        return super().create(website_data)
+
+
+class ImportWebsiteRowSerializer(serializers.Serializer):
+
+    site = serializers.URLField(
+        max_length=Websites._meta.get_field("site").max_length
+    )
+    auth_scheme = serializers.ChoiceField(
+        choices=AuthTypes.choices, required=False, allow_blank=True
+    )
+    username = serializers.CharField(required=False, allow_blank=True)
+    password = serializers.CharField(required=False, allow_blank=True)
+    check_interval = serializers.DurationField(required=False, allow_null=True)
+
+    def validate_check_interval(self, value: timedelta) -> timedelta:
+        if value is None:
+            return value
+        return validate_check_interval(value)
+
+    def validate(self, attrs: OrderedDict) -> OrderedDict:
+        if attrs.get("auth_scheme") and not (
+            attrs.get("username") and attrs.get("password")
+        ):
+            raise exceptions.ValidationError(
+                {
+                    "auth_data": [
+                        "A username and password are required to "
+                        "authenticate with the website."
+                    ]
+                }
+            )
+        return attrs
 
 
 class CreateUserSerializer(serializers.ModelSerializer):
@@ -1,5 +1,58 @@
+# Stdlib Imports
+from datetime import datetime, timedelta
+import random
+import logging
+import asyncio
+from functools import partial
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Iterable, Tuple, Type
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import DateTimeField, ExpressionWrapper, F, Value
+from django.db.models.functions import Coalesce
+
+# Own Imports
+from apps.monitor.models import (
+    Websites,
+    AlertKinds,
+    AuthTypes,
+    AuthenticationScheme,
+    HistoricalStats,
+    StatusTypes,
+    ProbeResult,
+    ProbeRollup,
+    HourlyProbeRollup,
+    DailyProbeRollup,
+    RollupCheckpoint,
+    WebsiteSLA,
+    MonitorCycle,
+)
+from apps.monitor.probes import (
+    SKIPPED_DEADLINE,
+    ProbeOutcome,
+    is_up,
+    is_down,
+)
+from apps.monitor.caching import bump_versions
+from apps.monitor.events import publish_status_changes
+from apps.monitor.snapshot import StatusSnapshot, get_status_snapshot
+from apps.monitor.helpers.histogram import LatencyHistogram
+from apps.monitor.helpers.sla import SLAWindows
+from apps.monitor.helpers.alerts import AlertDebouncer, AlertState
+from apps.monitor.helpers.schedule import AdaptiveInterval
+from apps.monitor.helpers.profiling import CYCLE_PHASES, PhaseTimer
+from apps.monitor.notifications import queue_notifications
+from apps.monitor.utils import chunked, get_token_expiry
+
 # Third Party Imports
 import httpx
+import redis
+
+
+logger = logging.getLogger(__name__)
 
 
 class Authentication:
@@ -9,6 +62,9 @@ class Authentication:
     - session authentication
     - token authentication
     - jwt authentication
+
+    Every login is bounded by the authentication timeout, so a slow login
+    endpoint can't hold the caller for longer than that.
     """
 
     def __init__(self, website: str, username: str, password: str) -> None:
@@ -16,6 +72,10 @@ class Authentication:
         self.username = username
         self.password = password
 
+    @property
+    def auth_data(self) -> dict:
+        return {"username": self.username, "password": self.password}
+
     def with_session(self) -> dict:
         """
         This method takes no arguments and returns a dictionary of cookies.
@@ -23,8 +83,9 @@ class Authentication:
         :return: A dictionary of cookies.
         """
 
-        auth_data = {"username": self.username, "password": self.password}
-        response = httpx.post(self.website, data=auth_data)
+        response = httpx.post(
+            self.website, data=self.auth_data, timeout=get_auth_timeout()
+        )
         return response.cookies
 
     def with_token(self) -> str:
@@ -34,14 +95,10 @@ class Authentication:
         :return: The token is being returned.
         """
 
-        auth_data = {"username": self.username, "password": self.password}
-        response = httpx.post(self.website, data=auth_data, format="json")
-
-        try:
-            token = response.json()["data"]["token"]
-        except (KeyError):
-            token = response.json()["token"]
-        return token
+        response = httpx.post(
+            self.website, data=self.auth_data, timeout=get_auth_timeout()
+        )
+        return self.read_token(response)
 
     def with_jwt(self) -> str:
         """
@@ -51,11 +108,1133 @@ class Authentication:
         :return: A JWT token.
         """
 
-        auth_data = {"username": self.username, "password": self.password}
-        response = httpx.post(self.website, data=auth_data, format="json")
+        response = httpx.post(
+            self.website, data=self.auth_data, timeout=get_auth_timeout()
+        )
+        return self.read_jwt(response)
 
+    @staticmethod
+    def read_token(response: httpx.Response) -> str:
+        try:
+            token = response.json()["data"]["token"]
+        except (KeyError):
+            token = response.json()["token"]
+        return token
+
+    @staticmethod
+    def read_jwt(response: httpx.Response) -> str:
         try:
             jwt_token = response.json()["data"]["access"]
         except (KeyError):
             jwt_token = response.json()["access"]
         return jwt_token
+
+
+class AsyncAuthentication(Authentication):
+    """
+    This class service is the asyncio variant of the authentication
+    service, for authenticating many websites at once.
+
+    Logins go through a shared, pooled asyncio http client, and logins
+    that fail to connect, time out or get a server error are retried
+    with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        website: str,
+        username: str,
+        password: str,
+        client: httpx.AsyncClient,
+    ) -> None:
+        super().__init__(website, username, password)
+        self.client = client
+
+    async def login(self) -> httpx.Response:
+        """
+        This method posts the username and password to the website,
+        retrying on connection errors, timeouts and server errors.
+
+        :return: The response of the last attempt.
+        """
+
+        retries = settings.MONITOR_AUTH_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                response = await self.client.post(
+                    self.website, data=self.auth_data
+                )
+                if response.status_code < 500 or attempt == retries:
+                    return response
+            except (httpx.TransportError):
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(settings.MONITOR_AUTH_BACKOFF * 2**attempt)
+
+    async def with_session(self) -> dict:
+        response = await self.login()
+        return response.cookies
+
+    async def with_token(self) -> str:
+        response = await self.login()
+        return self.read_token(response)
+
+    async def with_jwt(self) -> str:
+        response = await self.login()
+        return self.read_jwt(response)
+
+
+# the authentication method of each authentication scheme
+AUTHENTICATION_METHODS = {
+    AuthTypes.SESSION_AUTH.value: "with_session",
+    AuthTypes.TOKEN_AUTH.value: "with_token",
+    AuthTypes.JWT_AUTH.value: "with_jwt",
+}
+
+
+def get_auth_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.MONITOR_AUTH_TIMEOUT,
+        connect=settings.MONITOR_AUTH_CONNECT_TIMEOUT,
+    )
+
+
+def build_auth_client() -> httpx.AsyncClient:
+    """
+    This function builds the pooled asyncio http client that concurrent
+    logins share, with strict timeouts.
+
+    :return: An asyncio http client.
+    """
+
+    return httpx.AsyncClient(
+        timeout=get_auth_timeout(),
+        limits=httpx.Limits(max_connections=settings.MONITOR_AUTH_CONCURRENCY),
+    )
+
+
+def set_credentials(
+    authentication_scheme: AuthenticationScheme, credential
+) -> AuthenticationScheme:
+    """
+    This function sets the session, token or jwt an authentication scheme
+    logged in with, along with when it expires, without saving them.
+
+    :param authentication_scheme: The authentication scheme of the website
+    :type authentication_scheme: AuthenticationScheme
+    :param credential: The cookies, token or jwt returned by the login
+    :type credential: Union[dict, str]
+
+    :return: The updated authentication scheme.
+    """
+
+    if authentication_scheme.auth_type == AuthTypes.SESSION_AUTH.value:
+        authentication_scheme.session_auth = "; ".join(
+            f"{name}={value}" for name, value in credential.items()
+        )
+        authentication_scheme.expires_at = None
+    elif authentication_scheme.auth_type == AuthTypes.TOKEN_AUTH.value:
+        authentication_scheme.token_auth = credential
+        authentication_scheme.expires_at = get_token_expiry(credential)
+    elif authentication_scheme.auth_type == AuthTypes.JWT_AUTH.value:
+        authentication_scheme.bearer_auth = credential
+        authentication_scheme.expires_at = get_token_expiry(credential)
+
+    return authentication_scheme
+
+
+def fetch_credentials(
+    authentication_scheme: AuthenticationScheme,
+) -> AuthenticationScheme:
+    """
+    This function authenticates with a website using the credentials
+    stored on its authentication scheme, and sets the new session,
+    token or jwt along with when it expires, without saving them.
+
+    :param authentication_scheme: The authentication scheme of the website
+    :type authentication_scheme: AuthenticationScheme
+
+    :return: The updated authentication scheme.
+    """
+
+    method = AUTHENTICATION_METHODS.get(authentication_scheme.auth_type)
+    if method is None:
+        return authentication_scheme
+
+    authenticate = Authentication(
+        authentication_scheme.site,
+        authentication_scheme.username,
+        authentication_scheme.password,
+    )
+    return set_credentials(
+        authentication_scheme, getattr(authenticate, method)()
+    )
+
+
+async def fetch_credentials_async(
+    authentication_scheme: AuthenticationScheme, client: httpx.AsyncClient
+) -> AuthenticationScheme:
+    """
+    This function is the asyncio variant of fetch_credentials, logging in
+    through the given shared client.
+
+    :param authentication_scheme: The authentication scheme of the website
+    :type authentication_scheme: AuthenticationScheme
+    :param client: The asyncio http client to log in with
+    :type client: httpx.AsyncClient
+
+    :return: The updated authentication scheme.
+    """
+
+    method = AUTHENTICATION_METHODS.get(authentication_scheme.auth_type)
+    if method is None:
+        return authentication_scheme
+
+    authenticate = AsyncAuthentication(
+        authentication_scheme.site,
+        authentication_scheme.username,
+        authentication_scheme.password,
+        client,
+    )
+    return set_credentials(
+        authentication_scheme, await getattr(authenticate, method)()
+    )
+
+
+def fetch_credentials_concurrently(
+    authentication_schemes: List[AuthenticationScheme],
+) -> Dict[str, str]:
+    """
+    This function authenticates with many websites at once, over a shared
+    asyncio http client, setting the credentials of each scheme without
+    saving them.
+
+    :param authentication_schemes: The authentication schemes to fill in
+    :type authentication_schemes: List[AuthenticationScheme]
+
+    :return: The error of each website that failed to authenticate, by site.
+    """
+
+    if not authentication_schemes:
+        return {}
+
+    async def fetch_all() -> Dict[str, str]:
+        semaphore = asyncio.Semaphore(settings.MONITOR_AUTH_CONCURRENCY)
+
+        async with build_auth_client() as client:
+
+            async def fetch(scheme: AuthenticationScheme) -> Optional[str]:
+                async with semaphore:
+                    try:
+                        await fetch_credentials_async(scheme, client)
+                    except (httpx.HTTPError, KeyError, ValueError) as error:
+                        return f"Authentication failed: {error!r}"
+
+            errors = await asyncio.gather(
+                *(fetch(scheme) for scheme in authentication_schemes)
+            )
+
+        return {
+            scheme.site: error
+            for scheme, error in zip(authentication_schemes, errors)
+            if error is not None
+        }
+
+    return asyncio.run(fetch_all())
+
+
+def authenticate_websites(sites: List[str]) -> Dict[str, str]:
+    """
+    This function authenticates with the given websites concurrently, and
+    saves the credentials of those that succeed. It is what fills in the
+    credentials of new websites, in the background.
+
+    :param sites: The sites to authenticate with
+    :type sites: List[str]
+
+    :return: The error of each website that failed to authenticate, by site.
+    """
+
+    schemes = list(
+        AuthenticationScheme.objects.filter(
+            site__in=sites, username__isnull=False
+        )
+    )
+    failures = fetch_credentials_concurrently(schemes)
+
+    authenticated = [
+        scheme for scheme in schemes if scheme.site not in failures
+    ]
+    AuthenticationScheme.objects.bulk_update(
+        authenticated,
+        ["session_auth", "token_auth", "bearer_auth", "expires_at"],
+    )
+    return failures
+
+
+def get_next_check_at(checked_at: datetime) -> ExpressionWrapper:
+    """
+    This function builds the expression for when a website is next due,
+    given when it was last checked and its own check interval.
+
+    :param checked_at: The date and time the website was checked
+    :type checked_at: datetime
+
+    :return: An expression to be used in a queryset update
+    """
+
+    return ExpressionWrapper(
+        Value(checked_at, output_field=DateTimeField()) + F("check_interval"),
+        output_field=DateTimeField(),
+    )
+
+
+def claim_due_websites(
+    now: Optional[datetime] = None, limit: Optional[int] = None
+) -> List[int]:
+    """
+    This function claims the websites that are due for a check, and
+    pushes their next check back by their interval so that they are
+    not claimed again while they are being probed.
+
+    :param now: The date and time to check against, defaults to now
+    :type now: datetime
+    :param limit: The maximum number of websites to claim
+    :type limit: int
+
+    :return: The ids of the claimed websites
+    """
+
+    now = now or timezone.now()
+    limit = limit or settings.MONITOR_SCHEDULER_BATCH_SIZE
+
+    with transaction.atomic():
+        website_ids = list(
+            Websites.objects.select_for_update(skip_locked=True)
+            .filter(next_check_at__lte=now)
+            .order_by("next_check_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        Websites.objects.filter(id__in=website_ids).update(
+            next_check_at=get_next_check_at(now)
+        )
+
+    return website_ids
+
+
+def reschedule_websites(
+    website_ids: List[int], checked_at: Optional[datetime] = None
+) -> None:
+    """
+    This function schedules the next check of the given websites,
+    one check interval after they were probed.
+
+    :param website_ids: The ids of the probed websites
+    :type website_ids: List[int]
+    :param checked_at: The date and time they were probed, defaults to now
+    :type checked_at: datetime
+    """
+
+    Websites.objects.filter(id__in=website_ids).update(
+        next_check_at=get_next_check_at(checked_at or timezone.now())
+    )
+
+
+def carry_over_websites(
+    website_ids: List[int], now: Optional[datetime] = None
+) -> None:
+    """
+    This function makes claimed websites that were not probed due again
+    right away, so the next scheduling beat claims them.
+
+    :param website_ids: The ids of the websites to carry over
+    :type website_ids: List[int]
+    :param now: The date and time they are due, defaults to now
+    :type now: datetime
+    """
+
+    Websites.objects.filter(id__in=website_ids).update(
+        next_check_at=now or timezone.now()
+    )
+
+
+def get_adaptive_interval() -> Optional[AdaptiveInterval]:
+    """
+    This function builds the adaptive interval of websites from the
+    monitor settings, if adaptive scheduling is enabled.
+
+    :return: The adaptive interval, or None if it is disabled.
+    """
+
+    if not settings.MONITOR_ADAPTIVE_SCHEDULING:
+        return None
+
+    return AdaptiveInterval(
+        minimum=timedelta(seconds=settings.MONITOR_MIN_CHECK_INTERVAL),
+        maximum=timedelta(seconds=settings.MONITOR_ADAPTIVE_MAX_INTERVAL),
+        down_factor=settings.MONITOR_ADAPTIVE_DOWN_FACTOR,
+        max_factor=settings.MONITOR_ADAPTIVE_MAX_FACTOR,
+        stable_period=timedelta(
+            seconds=settings.MONITOR_ADAPTIVE_STABLE_PERIOD
+        ),
+        flapping_ratio=settings.MONITOR_ADAPTIVE_FLAPPING_RATIO,
+    )
+
+
+# the status people are alerted of by each kind of alert, reminders
+# repeat the last one
+ALERT_STATUSES = {
+    AlertKinds.DOWN.value: StatusTypes.DOWN.value,
+    AlertKinds.UP.value: StatusTypes.UP.value,
+}
+
+
+def record_probe_outcomes(
+    outcomes: Iterable[ProbeOutcome],
+    checked_at: Optional[datetime] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> dict:
+    """
+    This function persists the outcomes of a batch of probes with a
+    constant number of set-based queries per batch, each batch in its
+    own short transaction:
+
+    - uptime and downtime counts are incremented with F() expressions
+    - status is only written for websites whose status changed, and the
+      changes are published to the status events stream
+    - every probe is appended to the probe results table
+    - every probed website is rescheduled for its next check, after an
+      interval adapted to how stable it is, with one query per interval
+    - alerting state is moved on in memory, and only written for websites
+      whose failure streak or alert changed
+
+    When the status snapshot is enabled, every result is written to it
+    instead, along with the time and latency of the check, and status and
+    failure streaks are left for reconcile_status_snapshot to write. While
+    redis is unavailable, they are written to the database as they would be
+    without the snapshot.
+
+    Skipped probes are not recorded. Websites skipped because the cycle ran
+    out of time are carried over, due again right away.
+
+    The alerts raised by the probes are queued in the same transaction as
+    the alerting state that records them, so an alert is never marked as
+    sent without being queued, and are returned under "transitions", as
+    [site, alert kind] pairs.
+
+    :param outcomes: The outcomes of the probes
+    :type outcomes: Iterable[ProbeOutcome]
+    :param checked_at: The date and time the probes ran, defaults to now
+    :type checked_at: datetime
+    :param timer: The timer to count queueing notifications under, if any
+    :type timer: PhaseTimer
+
+    :return: A summary of the recorded outcomes
+    """
+
+    checked_at = checked_at or timezone.now()
+    outcomes = list(outcomes)
+    outcomes, skipped = (
+        [outcome for outcome in outcomes if outcome.skipped is None],
+        [outcome for outcome in outcomes if outcome.skipped is not None],
+    )
+    carried_over_ids = [
+        outcome.website_id
+        for outcome in skipped
+        if outcome.skipped == SKIPPED_DEADLINE
+    ]
+    if carried_over_ids:
+        carry_over_websites(carried_over_ids, checked_at)
+
+    website_ids = [outcome.website_id for outcome in outcomes]
+
+    # prefetch the current status and alerting state of every website,
+    # and create the historical stats of those without one
+    websites = Websites.objects.filter(id__in=website_ids).values_list(
+        "id",
+        "status",
+        "check_interval",
+        Coalesce("status_changed_at", "date_created"),
+        Coalesce("historicalstats__uptime_counts", 0),
+        Coalesce("historicalstats__downtime_counts", 0),
+        "consecutive_failures",
+        "alert_status",
+        "last_alerted_at",
+    )
+    statuses, stabilities, alert_states = {}, {}, {}
+    for (
+        website_id,
+        status,
+        *stability,
+        failures,
+        alerted,
+        alerted_at,
+    ) in websites:
+        statuses[website_id] = status
+        stabilities[website_id] = stability
+        alert_states[website_id] = AlertState(failures, alerted, alerted_at)
+
+    # when the status snapshot is enabled, it is ahead of the database,
+    # which is only reconciled with it periodically
+    snapshot = get_status_snapshot()
+    if snapshot is not None:
+        ids_by_site = {
+            o.site: o.website_id for o in outcomes if o.website_id in statuses
+        }
+        try:
+            entries = snapshot.read(ids_by_site)
+        except redis.RedisError as error:
+            # the database is written instead, as if it was disabled
+            logger.warning("Status snapshot is unavailable: %r", error)
+            snapshot, entries = None, {}
+        for site, entry in entries.items():
+            website_id = ids_by_site[site]
+            statuses[website_id] = entry["status"]
+            if entry["status_changed_at"] is not None:
+                stabilities[website_id][1] = entry["status_changed_at"]
+            alert_states[website_id].consecutive_failures = entry[
+                "consecutive_failures"
+            ]
+
+    tracked_ids = set(
+        HistoricalStats.objects.filter(track_id__in=website_ids).values_list(
+            "track_id", flat=True
+        )
+    )
+    HistoricalStats.objects.bulk_create(
+        [
+            HistoricalStats(track_id=website_id)
+            for website_id in statuses
+            if website_id not in tracked_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+    adaptive_interval = get_adaptive_interval()
+    debouncer = AlertDebouncer(
+        threshold=settings.MONITOR_ALERT_FAILURE_THRESHOLD,
+        reminder_interval=timedelta(
+            seconds=settings.MONITOR_ALERT_REMINDER_INTERVAL
+        ),
+    )
+    summary = {
+        "websites": len(outcomes),
+        "up": 0,
+        "down": 0,
+        "skipped": len(skipped),
+    }
+    transitions = []
+
+    timer = timer or PhaseTimer()
+    for batch in chunked(outcomes, settings.MONITOR_PERSIST_BATCH_SIZE):
+        sites = {o.website_id: o.site for o in batch}
+        status_changes, batch_transitions = [], []
+        up_ids = [o.website_id for o in batch if o.is_up]
+        down_ids = [o.website_id for o in batch if o.is_down]
+
+        recovered_ids, alerted_ids = [], defaultdict(list)
+        for o in batch:
+            state = alert_states.get(o.website_id)
+            if state is None:
+                continue
+            if state.consecutive_failures and not o.is_down:
+                recovered_ids.append(o.website_id)
+
+            kind = debouncer.evaluate(state, o.is_up, o.is_down, checked_at)
+            if kind is not None:
+                alerted_ids[kind].append(o.website_id)
+                batch_transitions.append([o.site, kind])
+
+        with transaction.atomic():
+            HistoricalStats.objects.filter(track_id__in=up_ids).update(
+                uptime_counts=F("uptime_counts") + 1
+            )
+            HistoricalStats.objects.filter(track_id__in=down_ids).update(
+                downtime_counts=F("downtime_counts") + 1
+            )
+
+            for status, ids in (
+                (StatusTypes.UP.value, up_ids),
+                (StatusTypes.DOWN.value, down_ids),
+            ):
+                changed_ids = [i for i in ids if statuses.get(i) != status]
+                if changed_ids and snapshot is None:
+                    Websites.objects.filter(id__in=changed_ids).update(
+                        status=status, status_changed_at=checked_at
+                    )
+                for i in changed_ids:
+                    statuses[i] = status
+                    stabilities[i][1] = checked_at
+                    status_changes.append(
+                        {
+                            "site": sites[i],
+                            "status": status,
+                            "checked_at": checked_at,
+                        }
+                    )
+
+            ProbeResult.objects.bulk_create(
+                [
+                    ProbeResult(
+                        site_id=o.website_id,
+                        checked_at=o.checked_at or checked_at,
+                        status_code=o.status_code,
+                        latency_ms=o.latency_ms,
+                        connect_ms=o.connect_ms,
+                        tls_ms=o.tls_ms,
+                        error=o.error,
+                    )
+                    for o in batch
+                    if o.website_id in statuses
+                ]
+            )
+            if adaptive_interval is None:
+                reschedule_websites([o.website_id for o in batch], checked_at)
+            else:
+                intervals = defaultdict(list)
+                for o in batch:
+                    if o.website_id not in statuses:
+                        continue
+                    check_interval, stable_since, *counts = stabilities[
+                        o.website_id
+                    ]
+                    interval = adaptive_interval.get_interval(
+                        check_interval,
+                        statuses[o.website_id],
+                        alert_states[o.website_id].consecutive_failures,
+                        stable_since,
+                        *counts,
+                        checked_at,
+                    )
+                    intervals[interval].append(o.website_id)
+                for interval, ids in intervals.items():
+                    Websites.objects.filter(id__in=ids).update(
+                        next_check_at=checked_at + interval
+                    )
+
+            if snapshot is None:
+                Websites.objects.filter(id__in=down_ids).update(
+                    consecutive_failures=F("consecutive_failures") + 1
+                )
+                if recovered_ids:
+                    Websites.objects.filter(id__in=recovered_ids).update(
+                        consecutive_failures=0
+                    )
+            for kind, ids in alerted_ids.items():
+                alert_fields = {"last_alerted_at": checked_at}
+                if kind in ALERT_STATUSES:
+                    alert_fields["alert_status"] = ALERT_STATUSES[kind]
+                Websites.objects.filter(id__in=ids).update(**alert_fields)
+            with timer.phase("notify"):
+                queue_notifications(batch_transitions)
+
+            if snapshot is not None:
+                transaction.on_commit(
+                    partial(
+                        write_status_snapshot,
+                        snapshot,
+                        {
+                            o.site: {
+                                "status": statuses[o.website_id],
+                                "checked_at": o.checked_at or checked_at,
+                                "latency_ms": o.latency_ms,
+                                "consecutive_failures": alert_states[
+                                    o.website_id
+                                ].consecutive_failures,
+                                "status_changed_at": stabilities[o.website_id][
+                                    1
+                                ],
+                            }
+                            for o in batch
+                            if o.website_id in statuses
+                        },
+                    )
+                )
+
+            # expire the cached responses of the probed websites, and push
+            # their status changes to the subscribers of the status stream
+            transaction.on_commit(
+                partial(bump_versions, [o.site for o in batch])
+            )
+            transaction.on_commit(
+                partial(publish_status_changes, status_changes)
+            )
+
+        summary["up"] += len(up_ids)
+        summary["down"] += len(down_ids)
+        transitions.extend(batch_transitions)
+
+    summary["transitions"] = transitions
+    return summary
+
+
+def save_live_statuses(entries: Dict[str, dict]) -> Tuple[int, List[str]]:
+    """
+    This function writes the status and failure streak of snapshot entries
+    to the websites table, with two queries, for the websites whose status
+    or failure streak drifted from them.
+
+    :param entries: The snapshot entries, keyed by site
+    :type entries: Dict[str, dict]
+
+    :return: The number of websites written, and the sites of the entries
+        that have no website.
+    """
+
+    drifted, missing = [], set(entries)
+    fields = ["status", "status_changed_at", "consecutive_failures"]
+    websites = Websites.objects.filter(site__in=entries).only(
+        "id", "site", *fields
+    )
+    for website in websites:
+        entry = entries[website.site]
+        missing.discard(website.site)
+        if any(getattr(website, name) != entry[name] for name in fields):
+            for name in fields:
+                setattr(website, name, entry[name])
+            drifted.append(website)
+
+    Websites.objects.bulk_update(drifted, fields)
+    return len(drifted), list(missing)
+
+
+def write_status_snapshot(
+    snapshot: StatusSnapshot, entries: Dict[str, dict]
+) -> None:
+    """
+    This function writes the entries of a batch of websites to the status
+    snapshot, or to the websites table when redis is unavailable, so the
+    live status isn't lost until it is back.
+
+    :param snapshot: The status snapshot
+    :type snapshot: StatusSnapshot
+    :param entries: The snapshot entries, keyed by site
+    :type entries: Dict[str, dict]
+    """
+
+    try:
+        snapshot.write(entries)
+    except redis.RedisError as error:
+        logger.warning("Status snapshot was not written: %r", error)
+        save_live_statuses(entries)
+
+
+def reconcile_status_snapshot(
+    snapshot: Optional[StatusSnapshot] = None,
+) -> int:
+    """
+    This function writes the status snapshot back to the websites table in
+    batches, with two queries per batch, for the websites whose status or
+    failure streak drifted from it. Entries of deleted websites are
+    dropped from the snapshot.
+
+    :param snapshot: The status snapshot, defaults to the configured one
+    :type snapshot: StatusSnapshot
+
+    :return: The number of websites written.
+    """
+
+    snapshot = snapshot or get_status_snapshot()
+    if snapshot is None:
+        return 0
+
+    reconciled = 0
+    for entries in snapshot.scan(settings.MONITOR_SNAPSHOT_RECONCILE_BATCH):
+        written, missing = save_live_statuses(entries)
+        snapshot.delete(missing)
+        reconciled += written
+
+    return reconciled
+
+
+def import_websites(
+    rows: Iterable[Tuple[int, dict]],
+    authenticate: Optional[Callable[[List[str]], object]] = None,
+) -> dict:
+    """
+    This function imports websites in batches, each batch with a constant
+    number of queries:
+
+    - rows are de-duplicated within the batch and against existing sites
+    - websites, their historical stats and authentication schemes are
+      created with bulk inserts, in one transaction per batch, replacing
+      the schemes left over from deleted websites
+    - the websites actually inserted are read back, as sites created by a
+      concurrent import in the meantime are skipped by the inserts
+
+    Websites that need authentication are handed to the authenticate
+    function once their batch is committed, so their logins never hold
+    up the import. New websites are spread over their check interval, so
+    an import doesn't make every one of them due at the same time.
+
+    :param rows: The validated rows, as (row number, data) pairs
+    :type rows: Iterable[Tuple[int, dict]]
+    :param authenticate: The function to authenticate with the created
+        websites that need it, given their sites
+    :type authenticate: Callable[[List[str]], object]
+
+    :return: The number of websites created and skipped, and the errors of
+        every row.
+    """
+
+    summary = {"created": 0, "skipped": 0, "errors": []}
+    now = timezone.now()
+
+    for batch in chunked(rows, settings.MONITOR_IMPORT_BATCH_SIZE):
+        unique = {}
+        for row, data in batch:
+            if data["site"] in unique:
+                summary["errors"].append(
+                    {"row": row, "errors": {"site": ["Duplicate website."]}}
+                )
+            else:
+                unique[data["site"]] = (row, data)
+
+        for site in Websites.objects.filter(site__in=unique).values_list(
+            "site", flat=True
+        ):
+            row, _ = unique.pop(site)
+            summary["errors"].append(
+                {"row": row, "errors": {"site": ["Website already exists."]}}
+            )
+
+        websites = []
+        for site, (_, data) in unique.items():
+            interval = (
+                data.get("check_interval")
+                or Websites._meta.get_field("check_interval").get_default()
+            )
+            websites.append(
+                Websites(
+                    site=site,
+                    has_authentication=bool(data.get("auth_scheme")),
+                    check_interval=interval,
+                    next_check_at=now + interval * random.random(),
+                )
+            )
+
+        with transaction.atomic():
+            inserted_at = timezone.now()
+            Websites.objects.bulk_create(websites, ignore_conflicts=True)
+            created = dict(
+                Websites.objects.filter(
+                    site__in=unique, date_created__gte=inserted_at
+                ).values_list("site", "id")
+            )
+            for site in set(unique) - set(created):
+                row, _ = unique.pop(site)
+                summary["errors"].append(
+                    {
+                        "row": row,
+                        "errors": {"site": ["Website already exists."]},
+                    }
+                )
+
+            HistoricalStats.objects.bulk_create(
+                [
+                    HistoricalStats(track_id=website_id)
+                    for website_id in created.values()
+                ],
+                ignore_conflicts=True,
+            )
+            schemes = [
+                AuthenticationScheme(
+                    site=site,
+                    auth_type=data["auth_scheme"],
+                    username=data["username"],
+                    password=data["password"],
+                )
+                for site, (_, data) in unique.items()
+                if data.get("auth_scheme")
+            ]
+            # schemes outlive their website, so any left over from a
+            # deleted one are replaced rather than logged in with
+            AuthenticationScheme.objects.filter(site__in=list(unique)).delete()
+            AuthenticationScheme.objects.bulk_create(schemes)
+            transaction.on_commit(partial(bump_versions, list(created)))
+            if schemes and authenticate is not None:
+                transaction.on_commit(
+                    partial(authenticate, [scheme.site for scheme in schemes])
+                )
+
+        summary["created"] += len(created)
+        summary["skipped"] += len(batch) - len(created)
+
+    summary["errors"].sort(key=lambda error: error["row"])
+    return summary
+
+
+ROLLUP_GRANULARITIES = (
+    (
+        HourlyProbeRollup,
+        lambda at: at.replace(minute=0, second=0, microsecond=0),
+    ),
+    (
+        DailyProbeRollup,
+        lambda at: at.replace(hour=0, minute=0, second=0, microsecond=0),
+    ),
+)
+
+
+ROLLUP_HISTOGRAMS = {
+    "latency_ms": "latency_histogram",
+    "connect_ms": "connect_histogram",
+    "tls_ms": "tls_histogram",
+}
+
+
+def fold_into_rollups(
+    model: Type[ProbeRollup],
+    truncate: Callable[[datetime], datetime],
+    results: List[Tuple],
+) -> None:
+    """
+    This function folds probe results into the rollups of one granularity,
+    updating the rollups that already exist and creating the missing ones.
+
+    :param model: The rollup model to fold the results into
+    :type model: Type[ProbeRollup]
+    :param truncate: Truncates a datetime to the start of its bucket
+    :type truncate: Callable[[datetime], datetime]
+    :param results: The probe results to fold, as named rows
+    :type results: List[Tuple]
+    """
+
+    keys = {
+        (result.site_id, truncate(result.checked_at)) for result in results
+    }
+    rollups = {
+        (rollup.site_id, rollup.bucket): rollup
+        for rollup in model.objects.filter(
+            site_id__in={site_id for site_id, _ in keys},
+            bucket__in={bucket for _, bucket in keys},
+        )
+    }
+    existing_keys = set(rollups)
+    histograms = {
+        key: {
+            field: LatencyHistogram(getattr(rollup, field))
+            for field in ROLLUP_HISTOGRAMS.values()
+        }
+        for key, rollup in rollups.items()
+    }
+
+    for result in results:
+        key = (result.site_id, truncate(result.checked_at))
+        if key not in rollups:
+            rollups[key] = model(site_id=result.site_id, bucket=key[1])
+            histograms[key] = {
+                field: LatencyHistogram()
+                for field in ROLLUP_HISTOGRAMS.values()
+            }
+        rollup = rollups[key]
+
+        rollup.probe_count += 1
+        rollup.up_count += int(is_up(result.status_code))
+        rollup.down_count += int(is_down(result.status_code, result.error))
+
+        latency_ms = result.latency_ms
+        if latency_ms is not None:
+            if rollup.latency_count == 0:
+                rollup.latency_min_ms = rollup.latency_max_ms = latency_ms
+            rollup.latency_min_ms = min(latency_ms, rollup.latency_min_ms)
+            rollup.latency_max_ms = max(latency_ms, rollup.latency_max_ms)
+            rollup.latency_sum_ms += latency_ms
+            rollup.latency_count += 1
+
+        for timing, field in ROLLUP_HISTOGRAMS.items():
+            if getattr(result, timing) is not None:
+                histograms[key][field].add(getattr(result, timing))
+
+    for key, rollup in rollups.items():
+        for field, histogram in histograms[key].items():
+            setattr(rollup, field, histogram.to_list())
+
+    model.objects.bulk_update(
+        [rollups[key] for key in existing_keys],
+        [
+            "probe_count",
+            "up_count",
+            "down_count",
+            "latency_min_ms",
+            "latency_max_ms",
+            "latency_sum_ms",
+            "latency_count",
+            *ROLLUP_HISTOGRAMS.values(),
+        ],
+        batch_size=settings.MONITOR_PERSIST_BATCH_SIZE,
+    )
+    model.objects.bulk_create(
+        [rollups[key] for key in rollups.keys() - existing_keys],
+        batch_size=settings.MONITOR_PERSIST_BATCH_SIZE,
+    )
+
+
+def fold_into_sla_windows(results: List[Tuple]) -> None:
+    """
+    This function adds probe results to the rolling sla windows of their
+    websites, creating the windows of websites that don't have any yet.
+
+    :param results: The probe results to fold, as named rows
+    :type results: List[Tuple]
+    """
+
+    slas = {
+        sla.site_id: sla
+        for sla in WebsiteSLA.objects.filter(
+            site_id__in={result.site_id for result in results}
+        )
+    }
+    existing_ids = set(slas)
+    windows = {
+        site_id: SLAWindows(sla.windows) for site_id, sla in slas.items()
+    }
+
+    for result in results:
+        if result.site_id not in windows:
+            slas[result.site_id] = WebsiteSLA(site_id=result.site_id)
+            windows[result.site_id] = SLAWindows()
+        windows[result.site_id].record(
+            result.checked_at, is_up(result.status_code), result.latency_ms
+        )
+
+    for site_id, sla in slas.items():
+        sla.windows = windows[site_id].to_state()
+
+    WebsiteSLA.objects.bulk_update(
+        [slas[site_id] for site_id in existing_ids],
+        ["windows", "date_modified"],
+        batch_size=settings.MONITOR_PERSIST_BATCH_SIZE,
+    )
+    WebsiteSLA.objects.bulk_create(
+        [slas[site_id] for site_id in slas.keys() - existing_ids],
+        batch_size=settings.MONITOR_PERSIST_BATCH_SIZE,
+    )
+
+
+def rollup_probe_results(limit: Optional[int] = None) -> int:
+    """
+    This function folds the tail of the probe results table, past the
+    last checkpoint, into the hourly and daily rollups, and into the
+    rolling sla windows of each website.
+
+    Folding and advancing the checkpoint happen in the same transaction,
+    so a run either folds a result exactly once or not at all.
+
+    The checkpoint moves forward by id, and ids are handed out when rows
+    are inserted, not when they are committed, so a batch committed late
+    can hold ids below those of batches committed before it. The run
+    stops at the first result written less than the rollup lag ago, so
+    as long as probe batches commit within the lag, no result is left
+    behind the checkpoint.
+
+    :param limit: The maximum number of probe results to fold
+    :type limit: int
+
+    :return: The number of probe results folded
+    """
+
+    limit = limit or settings.MONITOR_ROLLUP_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(seconds=settings.MONITOR_ROLLUP_LAG)
+
+    with transaction.atomic():
+        checkpoint = (
+            RollupCheckpoint.objects.select_for_update().get_or_create(
+                name="probe_results"
+            )[0]
+        )
+
+        results = []
+        for result in (
+            ProbeResult.objects.filter(id__gt=checkpoint.last_id)
+            .order_by("id")
+            .values_list(
+                "id",
+                "site_id",
+                "checked_at",
+                "status_code",
+                "latency_ms",
+                "connect_ms",
+                "tls_ms",
+                "error",
+                "created_at",
+                named=True,
+            )[:limit]
+        ):
+            if result.created_at > cutoff:
+                break
+            results.append(result)
+
+        if not results:
+            return 0
+
+        for model, truncate in ROLLUP_GRANULARITIES:
+            fold_into_rollups(model, truncate, results)
+        fold_into_sla_windows(results)
+
+        checkpoint.last_id = results[-1].id
+        checkpoint.save(update_fields=["last_id", "date_modified"])
+
+        # expire the cached responses of the rolled up websites
+        sites = Websites.objects.filter(
+            id__in={result.site_id for result in results}
+        ).values_list("site", flat=True)
+        transaction.on_commit(partial(bump_versions, list(sites)))
+
+    return len(results)
+
+
+def record_monitor_cycle(cycle: dict) -> MonitorCycle:
+    """
+    This function records the summary of a monitoring cycle, along with
+    the time spent and queries run in every phase, and prunes the cycles
+    past the retention period.
+
+    The profile of a sampled cycle is only kept when it is among the
+    slowest of the recent cycles, as those are the ones worth looking into.
+
+    :param cycle: The summary of the cycle, as aggregated from its chunks
+    :type cycle: dict
+
+    :return: The monitor cycle recorded.
+    """
+
+    profile = cycle.get("profile")
+    if profile is not None:
+        recent = list(
+            MonitorCycle.objects.order_by("-date_created", "-id").values_list(
+                "duration", flat=True
+            )[: settings.MONITOR_CYCLE_PROFILE_WINDOW]
+        )
+        slower = sum(duration > cycle["duration"] for duration in recent)
+        if slower >= settings.MONITOR_CYCLE_PROFILE_SLOWEST * max(
+            len(recent), 1
+        ):
+            profile = None
+
+    timings, queries = cycle.get("timings", {}), cycle.get("queries", {})
+    monitor_cycle = MonitorCycle.objects.create(
+        started_at=datetime.fromtimestamp(cycle["started_at"], timezone.utc),
+        finished_at=datetime.fromtimestamp(cycle["finished_at"], timezone.utc),
+        duration=cycle["duration"],
+        sites=cycle.get("websites", 0),
+        chunks=cycle.get("chunks", 0),
+        failed_chunks=cycle.get("failed_chunks", 0),
+        up=cycle.get("up", 0),
+        down=cycle.get("down", 0),
+        skipped=cycle.get("skipped", 0),
+        profile=profile,
+        **{
+            f"{phase}_time": round(timings.get(phase, 0), 3)
+            for phase in CYCLE_PHASES
+        },
+        **{
+            f"{phase}_queries": queries.get(phase, 0) for phase in CYCLE_PHASES
+        },
+    )
+
+    MonitorCycle.objects.filter(
+        date_created__lt=timezone.now()
+        - timedelta(days=settings.MONITOR_CYCLE_RETENTION_DAYS)
+    ).delete()
+    return monitor_cycle
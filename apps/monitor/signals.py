@@ -0,0 +1,100 @@
+# Stdlib Imports
+from functools import partial
+from typing import List, Optional, Set
+
+# Django Imports
+from django.db import transaction
+from django.dispatch import receiver
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+
+# Own Imports
+from apps.monitor.models import NotifyGroup, People, Websites
+from apps.monitor.caching import bump_versions
+from apps.monitor.notifications import invalidate_recipients
+
+
+def get_group_sites(groups: QuerySet) -> List[str]:
+    return list(groups.values_list("notify__site", flat=True))
+
+
+def invalidate_recipients_on_commit(sites: List[str]) -> None:
+    # dropped once the change is committed, so that no other process
+    # caches the recipients again from data about to change
+    if sites:
+        transaction.on_commit(partial(invalidate_recipients, sites))
+
+
+@receiver(pre_save, sender=NotifyGroup)
+def invalidate_previous_recipients(instance: NotifyGroup, **kwargs) -> None:
+    """
+    This function drops the cached recipients of the site a notify group
+    watched, before it is saved, in case the group now watches another.
+    """
+
+    if instance.pk is not None:
+        invalidate_recipients_on_commit(
+            get_group_sites(NotifyGroup.objects.filter(pk=instance.pk))
+        )
+
+
+@receiver(post_save, sender=NotifyGroup)
+@receiver(post_delete, sender=NotifyGroup)
+def invalidate_group_recipients(instance: NotifyGroup, **kwargs) -> None:
+    """
+    This function drops the cached recipients of the site a notify group
+    watches whenever the group is saved or deleted.
+    """
+
+    invalidate_recipients_on_commit([instance.notify.site])
+
+
+@receiver(post_save, sender=People)
+@receiver(pre_delete, sender=People)
+def invalidate_people_recipients(instance: People, **kwargs) -> None:
+    """
+    This function drops the cached recipients of every site watched by the
+    groups of a person, whenever the person is saved or about to be
+    deleted, while the groups they are in are still known.
+    """
+
+    invalidate_recipients_on_commit(
+        get_group_sites(NotifyGroup.objects.filter(emails=instance))
+    )
+
+
+@receiver(m2m_changed, sender=NotifyGroup.emails.through)
+def invalidate_member_recipients(
+    instance, action: str, reverse: bool, pk_set: Optional[Set[int]], **kwargs
+) -> None:
+    """
+    This function drops the cached recipients of the sites whose groups
+    people were added to or removed from, from either side of the
+    relation. Groups cleared from a person are only known before the clear.
+    """
+
+    if not reverse and action.startswith("post_"):
+        invalidate_recipients_on_commit([instance.notify.site])
+    elif reverse and action == "pre_clear":
+        invalidate_people_recipients(instance)
+    elif reverse and action in ("post_add", "post_remove"):
+        invalidate_recipients_on_commit(
+            get_group_sites(NotifyGroup.objects.filter(pk__in=pk_set))
+        )
+
+
+@receiver(post_save, sender=Websites)
+@receiver(post_delete, sender=Websites)
+def expire_website_responses(instance: Websites, **kwargs) -> None:
+    """
+    This function expires the cached responses of a website when it is
+    saved or deleted outside of the probe pipeline (e.g. from the admin).
+    """
+
+    transaction.on_commit(lambda: bump_versions([instance.site]))
@@ -0,0 +1,126 @@
+# Stdlib Imports
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Optional
+
+# Django Imports
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+
+# Third Party Imports
+import redis
+
+
+SNAPSHOT_KEY = "monitor:snapshot"
+
+# the fields of a snapshot entry that hold a date and time
+DATETIME_FIELDS = ("checked_at", "status_changed_at")
+
+
+@lru_cache(maxsize=None)
+def get_redis_client(url: str) -> redis.Redis:
+    return redis.Redis.from_url(url)
+
+
+def decode_entry(value: bytes) -> dict:
+    entry = json.loads(value)
+    for name in DATETIME_FIELDS:
+        if entry.get(name) is not None:
+            entry[name] = parse_datetime(entry[name])
+    return entry
+
+
+class StatusSnapshot:
+    """
+    This class keeps the live status of every website in a single redis
+    hash, keyed by site, written by the probe pipeline on every result.
+
+    Each entry holds the status, when the website was last checked and
+    when its status last changed, the latency of the last check, and the
+    number of failed checks in a row. Reads of many websites take a single
+    round trip, and none of them touch the database.
+    """
+
+    def __init__(self, client: redis.Redis) -> None:
+        self.client = client
+
+    def write(self, entries: Dict[str, dict]) -> None:
+        """
+        This method writes the entries of a batch of websites at once.
+
+        :param entries: The snapshot entries, keyed by site
+        :type entries: Dict[str, dict]
+        """
+
+        if entries:
+            self.client.hset(
+                SNAPSHOT_KEY,
+                mapping={
+                    site: json.dumps(entry, cls=DjangoJSONEncoder)
+                    for site, entry in entries.items()
+                },
+            )
+
+    def read(self, sites: Iterable[str]) -> Dict[str, dict]:
+        """
+        This method reads the entries of the given websites.
+
+        :param sites: The sites to read the entries of
+        :type sites: Iterable[str]
+
+        :return: The snapshot entries of the websites that have one, by site.
+        """
+
+        sites = list(sites)
+        if not sites:
+            return {}
+
+        values = self.client.hmget(SNAPSHOT_KEY, sites)
+        return {
+            site: decode_entry(value)
+            for site, value in zip(sites, values)
+            if value is not None
+        }
+
+    def scan(self, batch_size: int) -> Iterator[Dict[str, dict]]:
+        """
+        This method iterates over every entry of the snapshot in batches,
+        without blocking redis on one large read.
+
+        :param batch_size: The number of entries per batch
+        :type batch_size: int
+
+        :return: An iterator of snapshot entries, keyed by site.
+        """
+
+        batch = {}
+        for site, value in self.client.hscan_iter(
+            SNAPSHOT_KEY, count=batch_size
+        ):
+            batch[site.decode()] = decode_entry(value)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+
+    def delete(self, sites: Iterable[str]) -> None:
+        sites = list(sites)
+        if sites:
+            self.client.hdel(SNAPSHOT_KEY, *sites)
+
+
+def get_status_snapshot() -> Optional[StatusSnapshot]:
+    """
+    This function gets the status snapshot, if a redis url is configured
+    for it.
+
+    :return: The status snapshot, or None if it is disabled.
+    """
+
+    if not settings.MONITOR_SNAPSHOT_REDIS_URL:
+        return None
+    return StatusSnapshot(
+        get_redis_client(settings.MONITOR_SNAPSHOT_REDIS_URL)
+    )
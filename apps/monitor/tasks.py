@@ -1,40 +1,94 @@
+# Stdlib Imports
+import os
+import time
+import logging
+import random
+from typing import List, Optional
+
 # Django Imports
 from django.conf import settings
-from django.db import transaction
+from django.db import DatabaseError, InterfaceError, OperationalError
 from django.core.mail import send_mail as send_mail_to_group, get_connection
 
 # Own Imports
-from apps.monitor.models import (
-    NotifyGroup,
-    StatusTypes,
-    Websites,
-    AuthenticationScheme,
+from apps.monitor.models import AlertKinds, Websites
+from apps.monitor.probes import ProbeEngine, close_probe_pool, get_probe_pool
+from apps.monitor.selectors import get_probe_targets
+from apps.monitor.credentials import credential_cache
+from apps.monitor.circuits import circuit_breaker
+from apps.monitor.metrics import (
+    CYCLE_DURATION,
+    DB_WRITE_DURATION,
+    mark_process_dead,
+    observe_probe_outcomes,
+)
+from apps.monitor.notifications import (
+    ALERT_MESSAGES,
+    deliver_pending_notifications,
+    get_notification_recipients,
 )
-from apps.monitor.selectors import get_historical_stats, get_website
+from apps.monitor.services import (
+    authenticate_websites,
+    carry_over_websites,
+    claim_due_websites,
+    record_monitor_cycle,
+    record_probe_outcomes,
+    reconcile_status_snapshot,
+    rollup_probe_results,
+)
+from apps.monitor.helpers.profiling import CYCLE_PHASES, PhaseTimer
+from apps.monitor.utils import chunked
 
 # Celery Imports
-from celery import shared_task
+from celery import chord, shared_task
+from celery.signals import worker_process_init, worker_process_shutdown
+
+
+logger = logging.getLogger(__name__)
+
+
+@worker_process_init.connect
+def open_probe_pool(**kwargs) -> None:
+    """
+    This function opens the probe client pool when a worker process starts,
+    so every probe task of the process reuses its keep-alive connections.
+    """
+
+    get_probe_pool()
+
 
-# Third Import Imports
-import httpx
+@worker_process_shutdown.connect
+def shutdown_probe_pool(**kwargs) -> None:
+    close_probe_pool()
+    circuit_breaker.persist(force=True)
+    mark_process_dead(os.getpid())
 
 
 @shared_task(name="notify_group_of_people_via_email", max_retries=3)
-def notify_group_of_people_via_email(website: str) -> str:
+def notify_group_of_people_via_email(
+    website: str, kind: str = AlertKinds.DOWN.value
+) -> str:
     """
-    This function notifies a group of people via email when a website is down.
+    This function notifies a group of people via email when a website
+    goes down, is still down, or recovers.
 
-    :param website: str = The website that is currently facing a downtime
+    Monitoring cycles queue their alerts for batched delivery instead,
+    this task is kept to send a single alert on demand.
+
+    :param website: str = The website that changed state
     :type website: str
+    :param kind: The kind of alert (down, reminder, up)
+    :type kind: str
 
     :return str: A message
     """
 
-    group_emails = list(
-        NotifyGroup.objects.filter(notify__site=website).values_list(
-            "emails__email_address", flat=True
-        )
-    )
+    subject, message = ALERT_MESSAGES[kind]
+
+    group_emails = [
+        email_address
+        for email_address, _ in get_notification_recipients([website])[website]
+    ]
 
     mail_connection = get_connection(
         username=settings.EMAIL_HOST_USER,
@@ -43,8 +97,8 @@ def notify_group_of_people_via_email(website: str) -> str:
     )
 
     send_mail_to_group(
-        subject="[NOTIFY]: Website downtime",
-        message=f"Hello, {website} is currently facing a downtime.",
+        subject=subject,
+        message="Hello, " + message.format(website=website),
         from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=group_emails,
         connection=mail_connection,
@@ -53,91 +107,322 @@ def notify_group_of_people_via_email(website: str) -> str:
     return "Mail sent successfully!"
 
 
+def probe_websites_chunk(
+    website_ids: List[int],
+    deadline: Optional[float] = None,
+    profile: bool = False,
+) -> dict:
+    """
+    This function checks if a chunk of websites are up or down concurrently,
+    and if one goes down or recovers, it queues an email to a group of people.
+
+    Websites of hosts whose circuit is open are skipped, and so are those
+    not probed by the deadline of the cycle, which are carried over.
+
+    Every phase of the chunk is timed and its queries counted, and when
+    profiling, the chunk runs under cProfile.
+
+    :param website_ids: The ids of the websites in this chunk
+    :type website_ids: List[int]
+    :param deadline: The unix timestamp the cycle must be done by
+    :type deadline: float
+    :param profile: Whether to profile the chunk
+    :type profile: bool
+
+    :return: A summary of the chunk's probe outcomes.
+    """
+
+    timer = PhaseTimer(profile=profile)
+    with timer.phase("fetch"):
+        circuit_breaker.ensure_loaded()
+        targets = get_probe_targets(website_ids)
+
+    engine = ProbeEngine(
+        pool=get_probe_pool(),
+        credentials=credential_cache,
+        breaker=circuit_breaker,
+        deadline=deadline,
+    )
+    with timer.phase("probe"):
+        outcomes = engine.run(targets)
+    observe_probe_outcomes(outcomes)
+
+    # mail to groups of the websites that went down, are still down past
+    # the reminder interval, or recovered is queued along with the outcomes
+    with timer.phase("persist"):
+        with DB_WRITE_DURATION.labels("probe_outcomes").time():
+            summary = record_probe_outcomes(outcomes, timer=timer)
+        circuit_breaker.persist()
+    summary["reused_connections"] = sum(
+        outcome.reused_connection for outcome in outcomes
+    )
+    summary["alerts"] = len(summary.pop("transitions"))
+
+    summary["timings"] = timer.timings
+    summary["queries"] = timer.queries
+    summary["profile"] = timer.format_profile(
+        settings.MONITOR_CYCLE_PROFILE_LINES
+    )
+
+    print(
+        f"Uptime counts for {summary['up']} and downtime counts for "
+        f"{summary['down']} websites have increased with 1."
+    )
+    return summary
+
+
+@shared_task(bind=True, name="monitor_websites_chunk", max_retries=3)
+def monitor_websites_chunk(
+    self,
+    website_ids: List[int],
+    deadline: Optional[float] = None,
+    profile: bool = False,
+) -> dict:
+    """
+    This function probes a chunk of websites of a monitoring cycle.
+
+    A chunk that hits a database error likely to be transient, such as a
+    lost connection, is retried after MONITOR_CHUNK_RETRY_DELAY seconds
+    while the cycle has time left. A chunk that still fails is logged and
+    summarised as failed rather than raising, so the cycle it belongs to
+    is still aggregated and recorded, and its websites are counted as
+    skipped and carried over to the next beat.
+
+    :param website_ids: The ids of the websites in this chunk
+    :type website_ids: List[int]
+    :param deadline: The unix timestamp the cycle must be done by
+    :type deadline: float
+    :param profile: Whether to profile the chunk
+    :type profile: bool
+
+    :return: A summary of the chunk's probe outcomes.
+    """
+
+    try:
+        return probe_websites_chunk(website_ids, deadline, profile)
+    except Exception as error:
+        countdown = settings.MONITOR_CHUNK_RETRY_DELAY
+        if (
+            isinstance(error, (InterfaceError, OperationalError))
+            and not self.request.called_directly
+            and self.request.retries < self.max_retries
+            and (deadline is None or time.time() + countdown < deadline)
+        ):
+            raise self.retry(exc=error, countdown=countdown)
+        logger.exception(
+            "Monitoring chunk of %s websites failed.", len(website_ids)
+        )
+
+    # claiming the websites pushed their next check back, so they are
+    # made due again rather than left unchecked for a whole interval
+    try:
+        carry_over_websites(website_ids)
+    except DatabaseError:
+        logger.exception("Websites of a failed chunk were not carried over.")
+    return {"failed_chunks": 1, "skipped": len(website_ids)}
+
+
+@shared_task(name="aggregate_monitoring_cycle")
+def aggregate_monitoring_cycle(
+    chunk_summaries: List[dict], started_at: float
+) -> dict:
+    """
+    This function aggregates the summaries of every chunk in a
+    monitoring cycle, along with the time spent and queries run in every
+    phase, and records how long the whole cycle took.
+
+    :param chunk_summaries: The summaries returned by each chunk
+    :type chunk_summaries: List[dict]
+    :param started_at: The unix timestamp the cycle was dispatched at
+    :type started_at: float
+
+    :return: The summary of the whole cycle.
+    """
+
+    counters = (
+        "websites",
+        "up",
+        "down",
+        "skipped",
+        "alerts",
+        "reused_connections",
+        "failed_chunks",
+    )
+    cycle = {"chunks": len(chunk_summaries), **dict.fromkeys(counters, 0)}
+    for summary in chunk_summaries:
+        for key in counters:
+            cycle[key] += summary.get(key, 0)
+    for key in ("timings", "queries"):
+        cycle[key] = {
+            phase: sum(
+                summary.get(key, {}).get(phase, 0)
+                for summary in chunk_summaries
+            )
+            for phase in CYCLE_PHASES
+        }
+
+    # keep the profile of the slowest of the chunks that were profiled
+    slowest = max(
+        (summary for summary in chunk_summaries if summary.get("profile")),
+        key=lambda summary: sum(summary["timings"].values()),
+        default=None,
+    )
+    cycle["profile"] = slowest["profile"] if slowest is not None else None
+
+    cycle["started_at"] = started_at
+    cycle["finished_at"] = time.time()
+    cycle["duration"] = round(cycle["finished_at"] - started_at, 3)
+    CYCLE_DURATION.observe(cycle["duration"])
+
+    print(
+        f"Monitoring cycle of {cycle['websites']} websites "
+        f"across {cycle['chunks']} chunks took {cycle['duration']}s, "
+        f"reusing {cycle['reused_connections']} pooled connections "
+        f"and skipping {cycle['skipped']} websites"
+        + (
+            f", with {cycle['failed_chunks']} failed chunks."
+            if cycle["failed_chunks"]
+            else "."
+        )
+    )
+    return cycle
+
+
+@shared_task(name="record_monitor_cycle")
+def record_monitor_cycle_breakdown(cycle: dict) -> str:
+    """
+    This function records the summary of a monitoring cycle, so where the
+    time of slow cycles went can be looked up afterwards.
+
+    :param cycle: The summary of the cycle
+    :type cycle: dict
+
+    :return: A string of message.
+    """
+
+    monitor_cycle = record_monitor_cycle(cycle)
+    return f"Monitor cycle {monitor_cycle.id} recorded!"
+
+
+def dispatch_monitoring_cycle(website_ids: List[int]) -> None:
+    """
+    This function splits the websites into chunks by id range and probes
+    the chunks in parallel across all workers, with a final callback that
+    aggregates the results of the cycle and records it. Every chunk shares
+    the deadline of the cycle, and a sample of cycles is profiled.
+
+    :param website_ids: The ids of the websites to probe
+    :type website_ids: List[int]
+    """
+
+    if not website_ids:
+        return
+
+    started_at = time.time()
+    deadline = started_at + settings.MONITOR_CYCLE_DEADLINE
+    chunks = chunked(sorted(website_ids), settings.MONITOR_CHUNK_SIZE)
+    profile = random.random() < settings.MONITOR_CYCLE_PROFILE_RATE
+    chord(
+        monitor_websites_chunk.s(chunk, deadline, profile) for chunk in chunks
+    )(
+        aggregate_monitoring_cycle.s(started_at=started_at)
+        | record_monitor_cycle_breakdown.s()
+    )
+
+
+@shared_task(name="schedule_due_websites")
+def schedule_due_websites() -> str:
+    """
+    This function dispatches a monitoring cycle for the websites
+    that are due for a check, based on their own check interval.
+
+    :return: A string of message.
+    """
+
+    website_ids = claim_due_websites()
+    dispatch_monitoring_cycle(website_ids)
+
+    return f"Monitoring of {len(website_ids)} due websites dispatched!"
+
+
 @shared_task(name="monitor_websites_up_and_downtimes", max_tries=3)
 def monitor_websites_up_and_downtimes() -> str:
     """
-    This function checks if the website is up or down,
-    and if it's down, it sends an email to a group of people.
+    This function dispatches a monitoring cycle for every website,
+    regardless of whether they are due for a check.
+
+    :return: A string of message.
+    """
+
+    website_ids = list(Websites.objects.values_list("id", flat=True))
+    dispatch_monitoring_cycle(website_ids)
+
+    return f"Monitoring of {len(website_ids)} websites dispatched!"
+
+
+@shared_task(name="rollup_probe_results")
+def rollup_probe_results_into_aggregates() -> str:
+    """
+    This function folds the new probe results into the hourly
+    and daily rollups, until it has caught up with the tail.
+
+    :return: A string of message.
+    """
+
+    with DB_WRITE_DURATION.labels("rollup").time():
+        folded = total = rollup_probe_results()
+        while folded == settings.MONITOR_ROLLUP_BATCH_SIZE:
+            folded = rollup_probe_results()
+            total += folded
+
+    return f"{total} probe results rolled up!"
+
+
+@shared_task(name="deliver_pending_notifications")
+def deliver_pending_notifications_via_email() -> str:
+    """
+    This function emails the notifications queued since the last delivery
+    over a single connection, until the queue is empty.
+
+    :return: A string of message.
+    """
+
+    delivered = total = deliver_pending_notifications()
+    while delivered == settings.MONITOR_NOTIFY_BATCH_SIZE:
+        delivered = deliver_pending_notifications()
+        total += delivered
+
+    return f"{total} notifications delivered!"
+
+
+@shared_task(name="authenticate_websites")
+def authenticate_websites_in_background(sites: List[str]) -> str:
+    """
+    This function fills in the credentials of websites in the background,
+    logging in to them concurrently, so adding a website never waits on
+    its login endpoint.
+
+    :param sites: The sites to authenticate with
+    :type sites: List[str]
+
+    :return: A string of message.
+    """
+
+    failures = authenticate_websites(sites)
+    return (
+        f"{len(sites) - len(failures)} of {len(sites)} websites authenticated!"
+    )
+
+
+@shared_task(name="reconcile_status_snapshot")
+def reconcile_status_snapshot_to_database() -> str:
+    """
+    This function writes the live status snapshot back to the database,
+    for the websites that drifted from it since the last reconcile.
 
     :return: A string of message.
     """
 
-    with transaction.atomic():
-        # wrap query in an atomic transaction
-
-        with httpx.Client() as client:
-            for website in list(
-                Websites.objects.values_list("site", flat=True)
-            ):
-
-                # get the historical stats of the
-                # website and the site object
-                site = get_website(website)
-                historical_stats = get_historical_stats(website)
-
-                # if site does not has authentication,
-                # get the response of the website without
-                # no authentication scheme
-                if not site.has_authentication:
-                    response = client.get(website)
-
-                elif site.has_authentication:
-
-                    # get the authentication scheme of the website
-                    authentication_scheme = AuthenticationScheme.objects.get(
-                        site=website
-                    )
-
-                    # get the response of the website based on the session
-                    if authentication_scheme.session_auth is not None:
-                        response = client.get(
-                            website, cookies=authentication_scheme.session_auth
-                        )
-
-                    # get the response of the website based on the token
-                    elif authentication_scheme.token_auth is not None:
-                        response = client.get(
-                            website,
-                            headers={
-                                "Authorization": f"Token {authentication_scheme.token_auth}"
-                            },
-                        )
-
-                    # get the response of the website based on the bearer
-                    elif authentication_scheme.bearer_auth is not None:
-                        response = client.get(
-                            website,
-                            headers={
-                                "Authorization": f"Bearer {authentication_scheme.bearer_auth}"
-                            },
-                        )
-
-                if response.status_code == 200:
-
-                    # save up time to db
-                    historical_stats.uptime_counts += 1
-                    historical_stats.save(update_fields=["uptime_counts"])
-
-                    # update site uptime
-                    site.status = StatusTypes.UP
-                    site.save(update_fields=["status"])
-
-                    print(f"Uptime counts for {website} has increased with 1.")
-
-                elif response.status_code in [500, 502, 503, 504]:
-
-                    # save down time to db
-                    historical_stats.downtime_counts += 1
-                    historical_stats.save(update_fields=["downtime_counts"])
-
-                    # update site downtime
-                    site.status = StatusTypes.DOWN
-                    site.save(update_fields=["status"])
-
-                    # send mail to group
-                    notify_group_of_people_via_email.delay(website)
-                    print(
-                        f"Downtime counts for {website} has increased with 1."
-                    )
-
-            return "Monitoring done!"
+    with DB_WRITE_DURATION.labels("reconcile").time():
+        reconciled = reconcile_status_snapshot()
+    return f"{reconciled} websites reconciled with the status snapshot!"
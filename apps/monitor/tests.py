@@ -1,12 +1,86 @@
+# Stdlib Imports
+import io
+import json
+import asyncio
+import time
+import smtplib
+from collections import defaultdict
+from datetime import timedelta
+from unittest import mock
+
 # Rest Framework Imports
 from rest_framework.test import APIClient, APITestCase
 
 # Django Imports
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.db import DatabaseError, OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib import admin
 from django.contrib.auth.models import User
 
 # Own Imports
-from apps.monitor.models import Websites, HistoricalStats
+from apps.monitor.models import (
+    Websites,
+    HistoricalStats,
+    StatusTypes,
+    ProbeResult,
+    HourlyProbeRollup,
+    DailyProbeRollup,
+    RollupCheckpoint,
+    WebsiteSLA,
+    AuthenticationScheme,
+    NotifyGroup,
+    People,
+    PendingNotification,
+    HostCircuit,
+)
+from apps.monitor.caching import bump_versions
+from apps.monitor.circuits import CircuitBreaker
+from apps.monitor.credentials import CredentialCache
+from apps.monitor.events import EventBroker, StatusEventsApp
+from apps.monitor.metrics import AUTH_REFRESHES, observe_probe_outcomes
+from apps.monitor.snapshot import StatusSnapshot
+from apps.monitor.helpers.sla import SLAWindows
+from apps.monitor.helpers.profiling import PhaseTimer
+from apps.monitor.notifications import (
+    deliver_pending_notifications,
+    get_notification_recipients,
+    queue_notifications,
+)
+from apps.monitor.probes import (
+    ProbeClientPool,
+    ProbeEngine,
+    ProbeTarget,
+    ProbeOutcome,
+)
+from apps.monitor.services import (
+    authenticate_websites,
+    import_websites,
+    claim_due_websites,
+    reconcile_status_snapshot,
+    record_monitor_cycle,
+    reschedule_websites,
+    record_probe_outcomes,
+    rollup_probe_results,
+)
+from apps.monitor.tasks import (
+    aggregate_monitoring_cycle,
+    monitor_websites_chunk,
+)
+from apps.monitor.utils import chunked, get_token_expiry
+
+# Third Party Imports
+from asgiref.sync import async_to_sync
+import httpx
+import redis
+from prometheus_client import CollectorRegistry
 
 
 # initialize api client
@@ -35,6 +109,7 @@ class GetWebsitesTestCase(APITestCase):
     def setUp(self) -> None:
         """Setup fixtures for get websites test case."""
 
+        cache.clear()
         self.website = Websites.objects.create(site="http://127.0.0.1:8000/")
         self.historical_stats = HistoricalStats.objects.create(
             track=self.website
@@ -50,6 +125,70 @@ class GetWebsitesTestCase(APITestCase):
         self.assertEqual(response.json()["message"], "Website info retrieved!")
         self.assertEqual(response.json()["data"]["site"], self.website.site)
 
+    def test_unchanged_website_poll_is_not_modified(self):
+        """Ensure that polls get a 304 until a probe lands for the site."""
+
+        url = reverse("monitor:get_website", args=["http", "127.0.0.1:8000"])
+        etag = client.get(url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_probe_outcomes(
+                [ProbeOutcome(self.website.id, self.website.site, None, 503)]
+            )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["data"]["status"], "down")
+
+    def test_changes_within_a_second_are_not_missed(self):
+        """Ensure that polls get a 200 for every change, however close."""
+
+        url = reverse("monitor:get_website", args=["http", "127.0.0.1:8000"])
+        first = client.get(url)
+        self.assertNotIn("Last-Modified", first)
+
+        bump_versions([self.website.site])
+        response = client.get(
+            url,
+            HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 1),
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_list_websites_query_count_does_not_grow_with_page(self):
+        """Ensure that listing websites takes a constant number of queries."""
+
+        user = User.objects.create(username="user.test")
+        client.force_authenticate(user)
+        self.addCleanup(client.force_authenticate, None)
+        url = reverse("monitor:list_websites") + "?page_size=50"
+
+        with CaptureQueriesContext(connection) as few:
+            response = client.get(url)
+        self.assertEqual(len(response.json()["data"]), 1)
+
+        for index in range(10):
+            website = Websites.objects.create(site=f"http://{index}.test/")
+            HistoricalStats.objects.create(track=website)
+            DailyProbeRollup.objects.create(
+                site=website, bucket=timezone.now(), probe_count=1
+            )
+
+        with CaptureQueriesContext(connection) as many:
+            response = client.get(url)
+        self.assertEqual(len(response.json()["data"]), 11)
+        self.assertEqual(
+            response.json()["data"][0]["rollups"]["daily"][0]["probe_count"], 1
+        )
+
+        self.assertEqual(len(few), len(many))
+
 
 class AddWebsiteTestCase(APITestCase):
     """Test case for add website api view."""
@@ -124,6 +263,238 @@ class AddWebsiteTestCase(APITestCase):
         ...
 
 
+class AuthenticateWebsitesTestCase(TestCase):
+    """Test case for authenticating with websites in the background."""
+
+    def test_add_website_authenticates_in_background(self):
+        """Ensure that adding a website defers its login to a task."""
+
+        payload = {
+            "site": "http://login.test/",
+            "auth_data": {"username": "user", "password": "secret"},
+            "auth_scheme": "token",
+        }
+
+        with mock.patch(
+            "apps.monitor.serializers.authenticate_websites_in_background"
+        ) as task, self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                reverse("monitor:add_website"), data=payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, 201)
+        task.delay.assert_called_once_with([payload["site"]])
+        scheme = AuthenticationScheme.objects.get(site=payload["site"])
+        self.assertEqual(scheme.username, "user")
+        self.assertIsNone(scheme.token_auth)
+
+    @override_settings(MONITOR_AUTH_BACKOFF=0)
+    def test_failed_logins_are_retried(self):
+        """Ensure that server errors are retried, and failures reported."""
+
+        attempts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request.url.host)
+            if request.url.host == "down.test":
+                return httpx.Response(503)
+            if attempts.count("up.test") == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={"data": {"token": "abc"}})
+
+        for site in ("http://up.test/", "http://down.test/"):
+            AuthenticationScheme.objects.create(
+                site=site, auth_type="token", username="u", password="p"
+            )
+
+        with mock.patch(
+            "apps.monitor.services.build_auth_client",
+            return_value=httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            ),
+        ):
+            failures = authenticate_websites(
+                ["http://up.test/", "http://down.test/"]
+            )
+
+        self.assertEqual(list(failures), ["http://down.test/"])
+        self.assertEqual(attempts.count("down.test"), 3)
+        self.assertEqual(
+            AuthenticationScheme.objects.get(
+                site="http://up.test/"
+            ).token_auth,
+            "abc",
+        )
+
+
+class ImportWebsitesTestCase(APITestCase):
+    """Test case for import websites api view."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for import websites test case."""
+
+        user = User.objects.create(username="user.test")
+        client.force_authenticate(user)
+        self.addCleanup(client.force_authenticate, None)
+        Websites.objects.create(site="http://existing.test/")
+
+    def test_import_websites_from_csv(self):
+        """Ensure that csv rows are imported, reporting invalid rows."""
+
+        upload = (
+            "site,auth_scheme,username,password,check_interval\n"
+            "http://first.test/,,,,\n"
+            "http://second.test/,token,user,secret,00:05:00\n"
+            "http://first.test/,,,,\n"
+            "not-a-url,,,,\n"
+            "http://existing.test/,,,,\n"
+            "http://third.test/,bearer,,,\n"
+        )
+
+        with mock.patch(
+            "apps.monitor.views.authenticate_websites_in_background"
+        ) as authenticate, self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                reverse("monitor:import_websites"),
+                data=upload,
+                content_type="text/csv",
+            )
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()["data"]
+        self.assertEqual((data["created"], data["skipped"]), (2, 2))
+        self.assertEqual(
+            [error["row"] for error in data["errors"]], [3, 4, 5, 6]
+        )
+
+        # logins are left to a task, once the websites are committed
+        authenticate.delay.assert_called_once_with(["http://second.test/"])
+        with mock.patch(
+            "apps.monitor.services.AsyncAuthentication.with_token",
+            return_value="token",
+        ):
+            authenticate_websites(["http://second.test/"])
+
+        website = Websites.objects.get(site="http://second.test/")
+        self.assertTrue(website.has_authentication)
+        self.assertEqual(website.check_interval, timedelta(minutes=5))
+        self.assertTrue(HistoricalStats.objects.filter(track=website).exists())
+        self.assertEqual(
+            AuthenticationScheme.objects.get(site=website.site).token_auth,
+            "token",
+        )
+
+    def test_sites_created_concurrently_are_skipped(self):
+        """Ensure that only the websites actually inserted are created."""
+
+        rows = [(1, {"site": "http://racing.test/"})]
+        bulk_create = Websites.objects.bulk_create
+
+        def create_elsewhere(websites, **kwargs):
+            # another import committed the same site between the
+            # existence check and the insert
+            Websites.objects.create(site="http://racing.test/")
+            Websites.objects.update(
+                date_created=timezone.now() - timedelta(seconds=1)
+            )
+            return bulk_create(websites, **kwargs)
+
+        with mock.patch.object(
+            Websites.objects, "bulk_create", side_effect=create_elsewhere
+        ):
+            summary = import_websites(rows)
+
+        self.assertEqual((summary["created"], summary["skipped"]), (0, 1))
+        self.assertEqual(summary["errors"][0]["row"], 1)
+        self.assertEqual(HistoricalStats.objects.count(), 0)
+
+    def test_stale_authentication_schemes_are_replaced(self):
+        """Ensure that a scheme left by a deleted website is not reused."""
+
+        AuthenticationScheme.objects.create(
+            site="http://stale.test/",
+            auth_type="session",
+            username="old",
+            password="old",
+            session_auth="old-session",
+        )
+        rows = [
+            (
+                1,
+                {
+                    "site": "http://stale.test/",
+                    "auth_scheme": "token",
+                    "username": "new",
+                    "password": "new",
+                },
+            )
+        ]
+
+        authenticate = mock.Mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = import_websites(rows, authenticate=authenticate)
+
+        self.assertEqual(summary["created"], 1)
+        authenticate.assert_called_once_with(["http://stale.test/"])
+        scheme = AuthenticationScheme.objects.get(site="http://stale.test/")
+        self.assertEqual(
+            (scheme.auth_type, scheme.username, scheme.password),
+            ("token", "new", "new"),
+        )
+        self.assertIsNone(scheme.session_auth)
+
+    def test_import_websites_from_ndjson(self):
+        """Ensure that ndjson rows are imported, in few queries."""
+
+        upload = "\n".join(
+            [
+                json.dumps({"site": f"http://{index}.test/"})
+                for index in range(20)
+            ]
+            + ["{not json"]
+        )
+
+        with self.assertNumQueries(7):
+            response = client.post(
+                reverse("monitor:import_websites"),
+                data=upload,
+                content_type="application/x-ndjson",
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["created"], 20)
+        self.assertEqual(response.json()["data"]["errors"][0]["row"], 21)
+        self.assertEqual(Websites.objects.count(), 21)
+        self.assertEqual(HistoricalStats.objects.count(), 20)
+
+    def test_undecodable_rows_are_reported(self):
+        """Ensure that rows with invalid bytes are reported, not raised."""
+
+        uploads = {
+            "text/csv": b"site\nhttp://b\xffd.test/\nhttp://csv.test/\n",
+            "application/x-ndjson": (
+                b'{"site": "http://b\xffd.test/"}\n'
+                b'{"site": "http://ndjson.test/"}\n'
+            ),
+        }
+
+        for content_type, upload in uploads.items():
+            with self.subTest(content_type=content_type):
+                response = client.post(
+                    reverse("monitor:import_websites"),
+                    data=upload,
+                    content_type=content_type,
+                )
+
+                self.assertEqual(response.status_code, 201)
+                data = response.json()["data"]
+                self.assertEqual(data["created"], 1)
+                self.assertEqual(
+                    data["errors"],
+                    [{"row": 1, "errors": ["Row is not valid."]}],
+                )
+
+
 class AddNotifyGroupTestCase(APITestCase):
     """Test case for add notify group api view."""
 
@@ -163,6 +534,7 @@ class GetLogsOfHistoricalStatsTestCase(APITestCase):
     def setUp(self) -> None:
         """Setup fixtutes for get logs of historical stats test case."""
 
+        cache.clear()
         self.user = User.objects.create(
             email="user.test@test.com",
             username="user.test",
@@ -206,6 +578,45 @@ class GetLogsOfHistoricalStatsTestCase(APITestCase):
         )
         self.assertEqual(len(response.json()["data"]), 1)
 
+    def test_historical_stats_are_paginated_by_cursor(self):
+        """Ensure that following the cursor walks every row exactly once."""
+
+        for index in range(4):
+            HistoricalStats.objects.create(
+                track=Websites.objects.create(site=f"http://{index}.test/")
+            )
+
+        client.force_authenticate(self.user)
+        url, ids = reverse("monitor:historical_stats") + "?page_size=2", []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json()["data"]), 2)
+            ids += [stats["id"] for stats in response.json()["data"]]
+            url = response.json()["next"]
+
+        self.assertEqual(
+            ids,
+            list(
+                HistoricalStats.objects.order_by(
+                    "-date_created", "-id"
+                ).values_list("id", flat=True)
+            ),
+        )
+
+    def test_historical_stats_are_streamed_as_ndjson(self):
+        """Ensure that the stream mode writes one json row per line."""
+
+        client.force_authenticate(self.user)
+        response = client.get(
+            reverse("monitor:historical_stats") + "?stream=true"
+        )
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(json.loads(rows[0])["track"], self.website.site)
+
 
 class RegisterUserTestCase(APITestCase):
     """Test case for register user api view."""
@@ -271,3 +682,1462 @@ class LogoutUserTestCase(APITestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["message"], "User logout successful!")
+
+
+class ProbeEngineTestCase(SimpleTestCase):
+    """Test case for the concurrent probe engine."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for probe engine test case."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "down.test":
+                return httpx.Response(503)
+            elif request.url.host == "unreachable.test":
+                raise httpx.ConnectError("unreachable", request=request)
+            return httpx.Response(
+                200, json={"auth": request.headers.get("Authorization")}
+            )
+
+        self.transport = httpx.MockTransport(handler)
+        self.engine = ProbeEngine(
+            concurrency=2, timeout=1.0, transport=self.transport
+        )
+
+    def test_probe_outcomes_are_gathered_in_order(self):
+        """Ensure that every target gets an outcome, in order."""
+
+        targets = [
+            ProbeTarget(1, "http://up.test/"),
+            ProbeTarget(2, "http://down.test/"),
+            ProbeTarget(3, "http://unreachable.test/"),
+            ProbeTarget(4, "http://up.test/", {"Authorization": "Token x"}),
+        ]
+        outcomes = self.engine.run(targets)
+
+        self.assertEqual([o.website_id for o in outcomes], [1, 2, 3, 4])
+        self.assertTrue(outcomes[0].is_up)
+        self.assertTrue(outcomes[1].is_down)
+        self.assertEqual(outcomes[1].status_code, 503)
+        self.assertTrue(outcomes[2].is_down)
+        self.assertEqual(outcomes[2].error, "connect")
+        self.assertTrue(outcomes[3].is_up)
+
+    def test_client_pool_is_reused_across_runs(self):
+        """Ensure that a pooled engine keeps one client open across runs."""
+
+        pool = ProbeClientPool(transport=self.transport)
+        self.addCleanup(pool.close)
+        engine = ProbeEngine(concurrency=2, timeout=1.0, pool=pool)
+        targets = [
+            ProbeTarget(1, "http://up.test/"),
+            ProbeTarget(2, "http://unreachable.test/"),
+        ]
+
+        engine.run(targets)
+        outcomes = engine.run(targets)
+
+        self.assertFalse(pool.client.is_closed)
+        self.assertTrue(outcomes[0].is_up)
+        # no connection was opened for the response, so it was reused
+        self.assertTrue(outcomes[0].reused_connection)
+        self.assertFalse(outcomes[1].reused_connection)
+
+
+class CircuitBreakerTestCase(TestCase):
+    """Test case for the per-host circuit breaker and cycle deadline."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for circuit breaker test case."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "unreachable.test":
+                raise httpx.ConnectError("unreachable", request=request)
+            return httpx.Response(200)
+
+        self.breaker = CircuitBreaker(
+            threshold=2, cooldown=60, persist_interval=0
+        )
+        self.engine = ProbeEngine(
+            concurrency=2,
+            timeout=1.0,
+            transport=httpx.MockTransport(handler),
+            breaker=self.breaker,
+        )
+        self.targets = [
+            ProbeTarget(1, "http://unreachable.test/a"),
+            ProbeTarget(2, "http://unreachable.test/b"),
+            ProbeTarget(3, "http://up.test/"),
+        ]
+
+    def test_circuit_opens_and_lets_a_trial_through(self):
+        """Ensure that failing hosts are skipped, with half-open trials."""
+
+        self.engine.run(self.targets)
+        outcomes = self.engine.run(self.targets)
+        self.assertEqual(
+            [o.skipped for o in outcomes],
+            ["circuit_open", "circuit_open", None],
+        )
+        self.assertTrue(outcomes[2].is_up)
+
+        # once the cooldown is over, a single trial probe is let through
+        self.breaker.states["unreachable.test"].opened_at -= 61
+        outcomes = self.engine.run(self.targets)
+        self.assertEqual(
+            [o.skipped for o in outcomes], [None, "circuit_open", None]
+        )
+        self.assertEqual(self.breaker.get_state("unreachable.test"), "open")
+
+        self.breaker.persist()
+        restored = CircuitBreaker(threshold=2, cooldown=60)
+        restored.load()
+        self.assertFalse(restored.allow("unreachable.test"))
+        self.assertTrue(restored.allow("up.test"))
+
+    def test_persisting_merges_with_circuits_of_other_workers(self):
+        """Ensure that circuits persisted elsewhere are updated in place."""
+
+        HostCircuit.objects.create(host="unreachable.test", failures=1)
+        self.breaker.record("unreachable.test", success=False)
+        self.breaker.record("unreachable.test", success=False)
+        self.assertEqual(self.breaker.persist(), 1)
+
+        circuit = HostCircuit.objects.get(host="unreachable.test")
+        self.assertEqual(circuit.failures, 2)
+        self.assertIsNotNone(circuit.opened_at)
+
+        self.breaker.record("unreachable.test", success=True)
+        self.breaker.persist()
+        self.assertFalse(HostCircuit.objects.exists())
+
+    def test_failed_persists_are_retried(self):
+        """Ensure that a failed write doesn't fail the cycle."""
+
+        self.breaker.record("unreachable.test", success=False)
+        with mock.patch.object(
+            HostCircuit.objects,
+            "update_or_create",
+            side_effect=DatabaseError("database is locked"),
+        ), self.assertLogs("apps.monitor.circuits", "WARNING"):
+            self.assertEqual(self.breaker.persist(), 0)
+
+        self.assertFalse(HostCircuit.objects.exists())
+        self.assertEqual(self.breaker.persist(), 1)
+        self.assertTrue(HostCircuit.objects.exists())
+
+    def test_websites_past_the_deadline_are_carried_over(self):
+        """Ensure that websites not probed by the deadline are skipped."""
+
+        website = Websites.objects.create(
+            site="http://up.test/",
+            next_check_at=timezone.now() + timedelta(minutes=15),
+        )
+        engine = ProbeEngine(
+            concurrency=2,
+            deadline=time.time() - 1,
+            transport=self.engine.transport,
+        )
+        outcomes = engine.run([ProbeTarget(website.id, website.site)])
+        self.assertEqual(outcomes[0].skipped, "deadline")
+
+        summary = record_probe_outcomes(outcomes)
+        self.assertEqual((summary["websites"], summary["skipped"]), (0, 1))
+        website.refresh_from_db()
+        self.assertLessEqual(website.next_check_at, timezone.now())
+        self.assertFalse(ProbeResult.objects.exists())
+
+
+class MonitoringCycleTestCase(SimpleTestCase):
+    """Test case for sharding and aggregating a monitoring cycle."""
+
+    def test_websites_are_chunked_by_id_range(self):
+        """Ensure that websites are split into consecutive chunks."""
+
+        chunks = list(chunked([1, 2, 3, 4, 5], 2))
+        self.assertEqual(chunks, [[1, 2], [3, 4], [5]])
+
+    def test_chunk_summaries_are_aggregated(self):
+        """Ensure that the cycle aggregates the summary of every chunk."""
+
+        cycle = aggregate_monitoring_cycle(
+            [
+                {"websites": 3, "up": 2, "down": 1, "reused_connections": 3},
+                {"websites": 2, "up": 2, "down": 0, "reused_connections": 1},
+            ],
+            started_at=time.time() - 2,
+        )
+
+        self.assertEqual(cycle["chunks"], 2)
+        self.assertEqual(cycle["websites"], 5)
+        self.assertEqual(cycle["up"], 4)
+        self.assertEqual(cycle["down"], 1)
+        self.assertEqual(cycle["reused_connections"], 4)
+        self.assertGreaterEqual(cycle["duration"], 2)
+
+
+class DueWebsitesSchedulerTestCase(TestCase):
+    """Test case for scheduling websites by their own check interval."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for due websites scheduler test case."""
+
+        self.now = timezone.now()
+        self.due_website = Websites.objects.create(
+            site="http://due.test/",
+            check_interval=timedelta(seconds=30),
+            next_check_at=self.now - timedelta(seconds=1),
+        )
+        self.later_website = Websites.objects.create(
+            site="http://later.test/",
+            check_interval=timedelta(hours=1),
+            next_check_at=self.now + timedelta(minutes=10),
+        )
+
+    def test_only_due_websites_are_claimed(self):
+        """Ensure that only websites that are due get claimed, once."""
+
+        self.assertEqual(claim_due_websites(self.now), [self.due_website.id])
+        self.assertEqual(claim_due_websites(self.now), [])
+
+        self.due_website.refresh_from_db()
+        self.assertEqual(
+            self.due_website.next_check_at, self.now + timedelta(seconds=30)
+        )
+
+    def test_probed_websites_are_rescheduled_by_their_interval(self):
+        """Ensure that probed websites are due one interval later."""
+
+        reschedule_websites(
+            [self.due_website.id, self.later_website.id], self.now
+        )
+
+        self.due_website.refresh_from_db()
+        self.later_website.refresh_from_db()
+        self.assertEqual(
+            self.due_website.next_check_at, self.now + timedelta(seconds=30)
+        )
+        self.assertEqual(
+            self.later_website.next_check_at, self.now + timedelta(hours=1)
+        )
+
+
+class RecordProbeOutcomesTestCase(TestCase):
+    """Test case for persisting probe outcomes in bulk."""
+
+    def create_outcomes(self, count: int, prefix: str) -> list:
+        outcomes = []
+        for index in range(count):
+            website = Websites.objects.create(
+                site=f"http://{prefix}-{index}.test/",
+                status=StatusTypes.UP if index % 2 else None,
+            )
+            if index % 3:
+                HistoricalStats.objects.create(track=website)
+
+            outcomes.append(
+                ProbeOutcome(
+                    website_id=website.id,
+                    site=website.site,
+                    status_code=503 if index % 4 == 0 else 200,
+                )
+            )
+        return outcomes
+
+    def test_outcomes_are_recorded(self):
+        """Ensure that counts and statuses are updated for every website."""
+
+        outcomes = self.create_outcomes(4, "site")
+        summary = record_probe_outcomes(outcomes)
+
+        self.assertEqual(
+            summary,
+            {
+                "websites": 4,
+                "up": 3,
+                "down": 1,
+                "skipped": 0,
+                "transitions": [],
+            },
+        )
+        self.assertEqual(HistoricalStats.objects.count(), 4)
+        self.assertEqual(ProbeResult.objects.count(), 4)
+
+        down = HistoricalStats.objects.get(track_id=outcomes[0].website_id)
+        self.assertEqual((down.uptime_counts, down.downtime_counts), (0, 1))
+        self.assertEqual(down.track.status, StatusTypes.DOWN.value)
+
+        up = HistoricalStats.objects.get(track_id=outcomes[2].website_id)
+        self.assertEqual((up.uptime_counts, up.downtime_counts), (1, 0))
+        self.assertEqual(up.track.status, StatusTypes.UP.value)
+
+    def test_query_count_does_not_grow_with_websites(self):
+        """Ensure that the number of queries is constant per batch."""
+
+        few_outcomes = self.create_outcomes(8, "few")
+        many_outcomes = self.create_outcomes(80, "many")
+
+        with CaptureQueriesContext(connection) as few:
+            record_probe_outcomes(few_outcomes)
+        with CaptureQueriesContext(connection) as many:
+            record_probe_outcomes(many_outcomes)
+
+        self.assertEqual(len(few), len(many))
+
+    def test_alerts_fire_on_transitions_only(self):
+        """Ensure that a website alerts once going down and once back up."""
+
+        website = Websites.objects.create(site="http://flaky.test/")
+        now = timezone.now()
+
+        def check(status_code: int, minutes: int) -> list:
+            outcome = ProbeOutcome(website.id, website.site)
+            outcome.status_code = status_code
+            summary = record_probe_outcomes(
+                [outcome], now + timedelta(minutes=minutes)
+            )
+            return summary["transitions"]
+
+        with self.settings(
+            MONITOR_ALERT_FAILURE_THRESHOLD=2,
+            MONITOR_ALERT_REMINDER_INTERVAL=3600,
+        ):
+            self.assertEqual(check(503, 0), [])
+            self.assertEqual(check(200, 1), [])
+            self.assertEqual(check(503, 2), [])
+            self.assertEqual(check(503, 3), [[website.site, "down"]])
+            self.assertEqual(check(503, 4), [])
+            self.assertEqual(check(503, 64), [[website.site, "reminder"]])
+            self.assertEqual(check(200, 65), [[website.site, "up"]])
+            self.assertEqual(check(200, 66), [])
+
+        website.refresh_from_db()
+        self.assertEqual(website.consecutive_failures, 0)
+        self.assertEqual(website.alert_status, StatusTypes.UP.value)
+
+    def test_alerts_are_queued_with_the_alert_state(self):
+        """Ensure that an alert is never marked sent without being queued."""
+
+        website = Websites.objects.create(site="http://gone.test/")
+        outcome = ProbeOutcome(website.id, website.site, status_code=503)
+
+        with self.settings(MONITOR_ALERT_FAILURE_THRESHOLD=1):
+            with mock.patch(
+                "apps.monitor.services.queue_notifications",
+                side_effect=RuntimeError,
+            ), self.assertRaises(RuntimeError):
+                record_probe_outcomes([outcome])
+
+            website.refresh_from_db()
+            self.assertIsNone(website.alert_status)
+            self.assertFalse(PendingNotification.objects.exists())
+
+            record_probe_outcomes([outcome])
+
+        website.refresh_from_db()
+        self.assertEqual(website.alert_status, StatusTypes.DOWN.value)
+        self.assertEqual(
+            list(PendingNotification.objects.values_list("site", "kind")),
+            [(website.site, "down")],
+        )
+
+    def test_websites_are_rescheduled_by_stability(self):
+        """Ensure that stable websites are checked less, unstable ones more."""
+
+        now = timezone.now()
+        interval = timedelta(minutes=10)
+        stable, flapping, failing = [
+            Websites.objects.create(
+                site=f"http://{name}.test/",
+                status=StatusTypes.UP,
+                check_interval=interval,
+                status_changed_at=now - timedelta(days=days),
+            )
+            for name, days in (("stable", 3), ("flapping", 0), ("failing", 3))
+        ]
+        HistoricalStats.objects.create(track=stable, uptime_counts=1000)
+
+        with self.settings(
+            MONITOR_ADAPTIVE_STABLE_PERIOD=86400,
+            MONITOR_ADAPTIVE_MAX_FACTOR=4,
+            MONITOR_ADAPTIVE_MAX_INTERVAL=3600,
+            MONITOR_ADAPTIVE_DOWN_FACTOR=0.25,
+        ):
+            record_probe_outcomes(
+                [
+                    ProbeOutcome(stable.id, stable.site, status_code=200),
+                    ProbeOutcome(flapping.id, flapping.site, status_code=200),
+                    ProbeOutcome(failing.id, failing.site, status_code=503),
+                ],
+                now,
+            )
+
+        next_checks = {
+            website.site: website.next_check_at - now
+            for website in Websites.objects.all()
+        }
+        self.assertEqual(next_checks[stable.site], interval * 4)
+        # a flapping website is watched as closely as a failing one, even
+        # while it is up
+        self.assertLess(next_checks[flapping.site], interval)
+        self.assertEqual(next_checks[flapping.site], interval / 4)
+        self.assertEqual(next_checks[failing.site], interval / 4)
+
+
+class GetProbeResultsTestCase(APITestCase):
+    """Test case for get probe results api view."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for get probe results test case."""
+
+        self.user = User.objects.create(
+            email="user.test@test.com",
+            username="user.test",
+            password="user.test",
+        )
+        self.website = Websites.objects.create(site="http://127.0.0.1:8000/")
+
+        now = timezone.now()
+        ProbeResult.objects.bulk_create(
+            [
+                ProbeResult(
+                    site=self.website,
+                    checked_at=now - timedelta(minutes=minutes),
+                    status_code=200,
+                    latency_ms=120,
+                )
+                for minutes in (5, 30, 90)
+            ]
+        )
+
+    def test_get_probe_results_within_time_range(self):
+        """Ensure that only probe results within the time range are listed."""
+
+        url = reverse("monitor:probe_results", args=["http", "127.0.0.1:8000"])
+
+        client.force_authenticate(self.user)
+        response = client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["message"], "Probe results retrieved!"
+        )
+        self.assertEqual(len(response.json()["data"]), 2)
+
+    def test_get_probe_results_with_invalid_time_range(self):
+        """Ensure that an invalid time range is rejected."""
+
+        url = reverse("monitor:probe_results", args=["http", "127.0.0.1:8000"])
+
+        client.force_authenticate(self.user)
+        response = client.get(url, {"start": "yesterday"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class RollupProbeResultsTestCase(TestCase):
+    """Test case for folding probe results into rollups."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for rollup probe results test case."""
+
+        self.website = Websites.objects.create(site="http://127.0.0.1:8000/")
+        self.hour = timezone.now().replace(
+            minute=0, second=0, microsecond=0
+        ) - timedelta(hours=2)
+
+    def create_results(self, *probes) -> None:
+        ProbeResult.objects.bulk_create(
+            [
+                ProbeResult(
+                    site=self.website,
+                    checked_at=self.hour + timedelta(minutes=minute),
+                    status_code=status_code,
+                    latency_ms=latency_ms,
+                    created_at=self.hour + timedelta(minutes=minute),
+                )
+                for minute, status_code, latency_ms in probes
+            ]
+        )
+
+    def test_probe_results_are_rolled_up(self):
+        """Ensure that probe results are folded into hourly rollups."""
+
+        self.create_results((1, 200, 40), (2, 200, 80), (3, 503, 900))
+
+        self.assertEqual(rollup_probe_results(), 3)
+
+        rollup = HourlyProbeRollup.objects.get(site=self.website)
+        self.assertEqual(rollup.bucket, self.hour)
+        self.assertEqual(
+            (rollup.probe_count, rollup.up_count, rollup.down_count),
+            (3, 2, 1),
+        )
+        self.assertEqual(rollup.uptime_ratio, 0.6667)
+        self.assertEqual(
+            (rollup.latency_min_ms, rollup.latency_max_ms), (40, 900)
+        )
+        self.assertEqual(rollup.latency_avg_ms, 340)
+        self.assertEqual(rollup.latency_p50_ms, 100)
+        self.assertEqual(DailyProbeRollup.objects.get().probe_count, 3)
+
+        sla = SLAWindows(WebsiteSLA.objects.get(site=self.website).windows)
+        self.assertEqual(
+            sla.summary(timezone.now())["24h"]["uptime_percentage"], 66.667
+        )
+
+    def test_rollups_only_fold_the_new_tail(self):
+        """Ensure that rerunning the rollup never folds a result twice."""
+
+        self.create_results((1, 200, 40))
+        rollup_probe_results()
+
+        self.assertEqual(rollup_probe_results(), 0)
+
+        self.create_results((30, 200, 20))
+        self.assertEqual(rollup_probe_results(), 1)
+
+        rollup = HourlyProbeRollup.objects.get(site=self.website)
+        self.assertEqual(rollup.probe_count, 2)
+        self.assertEqual(rollup.latency_min_ms, 20)
+
+    def test_recent_probe_results_are_left_for_the_next_run(self):
+        """Ensure that results younger than the rollup lag are skipped."""
+
+        ProbeResult.objects.create(
+            site=self.website, checked_at=timezone.now(), status_code=200
+        )
+
+        self.assertEqual(rollup_probe_results(), 0)
+
+    def test_results_committed_late_with_lower_ids_are_rolled_up(self):
+        """Ensure that a lower id committed past a higher one isn't lost."""
+
+        # probed long ago, but only just written by a batch still in flight
+        checked_at = self.hour + timedelta(minutes=5)
+        ProbeResult.objects.create(
+            id=10, site=self.website, checked_at=checked_at, status_code=200
+        )
+        self.assertEqual(rollup_probe_results(), 0)
+
+        # a batch that took its ids earlier commits after it
+        ProbeResult.objects.create(
+            id=5, site=self.website, checked_at=checked_at, status_code=200
+        )
+        ProbeResult.objects.update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        self.assertEqual(rollup_probe_results(), 2)
+        self.assertEqual(HourlyProbeRollup.objects.get().probe_count, 2)
+        self.assertEqual(
+            RollupCheckpoint.objects.get(name="probe_results").last_id, 10
+        )
+
+
+class StatusEventsTestCase(TestCase):
+    """Test case for the status events stream."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for status events test case."""
+
+        self.broker = EventBroker(queue_size=10)
+        self.app = StatusEventsApp(self.broker)
+
+    def stream(self, headers: list, changes: list) -> list:
+        received, sent = asyncio.Queue(), []
+
+        async def send(message: dict) -> None:
+            sent.append(message)
+            if message["type"] == "http.response.start":
+                self.broker.publish(changes)
+            elif message.get("more_body"):
+                received.put_nowait({"type": "http.disconnect"})
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/status-events/",
+            "query_string": b"site=http://up.test/",
+            "headers": headers,
+        }
+        async_to_sync(self.app)(scope, received.get, send)
+        return sent
+
+    @override_settings(MONITOR_EVENTS_HEARTBEAT=0.01)
+    def test_status_changes_are_streamed_to_signed_in_users(self):
+        """Ensure that status changes are streamed, filtered by site."""
+
+        changes = [
+            {"site": "http://up.test/", "status": "up"},
+            {"site": "http://other.test/", "status": "down"},
+        ]
+        sent = self.stream([], changes)
+        self.assertEqual(sent[0]["status"], 401)
+
+        client.force_login(User.objects.create(username="user.test"))
+        self.addCleanup(client.logout)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+        headers = [(b"cookie", f"{cookie.key}={cookie.value}".encode())]
+
+        with self.assertNumQueries(2):
+            sent = self.stream(headers, changes)
+
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertEqual(
+            sent[1]["body"],
+            b'event: status\ndata: {"site": "http://up.test/", '
+            b'"status": "up"}\n\n',
+        )
+        self.assertFalse(self.broker.subscribers)
+
+    @override_settings(MONITOR_EVENTS_HEARTBEAT=0.01)
+    def test_stale_sessions_are_not_streamed_to(self):
+        """Ensure that sessions of inactive users or old passwords fail."""
+
+        user = User.objects.create(username="user.test")
+        client.force_login(user)
+        self.addCleanup(client.logout)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+        headers = [(b"cookie", f"{cookie.key}={cookie.value}".encode())]
+
+        user.set_password("changed")
+        user.save()
+        self.assertEqual(self.stream(headers, [])[0]["status"], 401)
+
+        client.force_login(user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+        headers = [(b"cookie", f"{cookie.key}={cookie.value}".encode())]
+        User.objects.filter(id=user.id).update(is_active=False)
+        self.assertEqual(self.stream(headers, [])[0]["status"], 401)
+
+    def test_status_changes_fan_out_without_queries(self):
+        """Ensure that one change reaches every subscriber as is."""
+
+        website = Websites.objects.create(site="http://up.test/")
+
+        with mock.patch(
+            "apps.monitor.services.publish_status_changes"
+        ) as publish, self.captureOnCommitCallbacks(execute=True):
+            record_probe_outcomes(
+                [ProbeOutcome(website.id, website.site, status_code=200)]
+            )
+        (changes,), _ = publish.call_args
+        self.assertEqual(
+            [(c["site"], c["status"]) for c in changes],
+            [(website.site, "up")],
+        )
+
+        async def fan_out() -> list:
+            queues = [self.broker.subscribe() for _ in range(2000)]
+            self.broker.publish(changes)
+            return [queue.get_nowait() for queue in queues]
+
+        with self.assertNumQueries(0):
+            messages = asyncio.run(fan_out())
+        self.assertEqual(len({id(events) for _, events in messages}), 1)
+
+    @override_settings(
+        MONITOR_EVENTS_REDIS_URL="redis://localhost:6379/0",
+        MONITOR_EVENTS_HEARTBEAT=0.01,
+    )
+    def test_malformed_messages_do_not_stop_the_relay(self):
+        """Ensure that the relay skips bad messages and reconnects."""
+
+        async def listen():
+            yield {"data": b"{not json"}
+            yield {"data": b'[{"site": "http://up.test/", "status": "up"}]'}
+            await asyncio.Event().wait()
+
+        lost = mock.Mock(
+            subscribe=mock.AsyncMock(
+                side_effect=redis.ConnectionError("Connection lost.")
+            ),
+            close=mock.AsyncMock(),
+        )
+        pubsub = mock.Mock(
+            subscribe=mock.AsyncMock(), listen=listen, close=mock.AsyncMock()
+        )
+
+        async def relay() -> list:
+            queue = self.broker.subscribe()
+            changes, _ = await asyncio.wait_for(queue.get(), 1)
+            self.broker.relay.cancel()
+            return changes
+
+        with mock.patch("redis.asyncio.from_url") as from_url, self.assertLogs(
+            "apps.monitor.events", "WARNING"
+        ):
+            from_url.return_value.pubsub.side_effect = [lost, pubsub]
+            changes = asyncio.run(relay())
+
+        self.assertEqual(
+            changes, [{"site": "http://up.test/", "status": "up"}]
+        )
+        # every subscription is closed, the lost one before reconnecting
+        lost.close.assert_awaited_once()
+        pubsub.close.assert_awaited_once()
+
+
+class RedisHashStandIn:
+    """An in-memory stand-in for the redis hash commands of the snapshot."""
+
+    def __init__(self) -> None:
+        self.hashes = defaultdict(dict)
+
+    def hset(self, name: str, mapping: dict) -> None:
+        self.hashes[name].update(
+            {key.encode(): value.encode() for key, value in mapping.items()}
+        )
+
+    def hmget(self, name: str, keys: list) -> list:
+        return [self.hashes[name].get(key.encode()) for key in keys]
+
+    def hscan_iter(self, name: str, count: int):
+        return iter(list(self.hashes[name].items()))
+
+    def hdel(self, name: str, *keys) -> None:
+        for key in keys:
+            self.hashes[name].pop(key.encode(), None)
+
+
+class StatusSnapshotTestCase(APITestCase):
+    """Test case for the live status snapshot."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for status snapshot test case."""
+
+        cache.clear()
+        self.snapshot = StatusSnapshot(RedisHashStandIn())
+        for target in ("services", "selectors"):
+            patcher = mock.patch(
+                f"apps.monitor.{target}.get_status_snapshot",
+                return_value=self.snapshot,
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.website = Websites.objects.create(site="http://127.0.0.1:8000/")
+
+    def test_probe_results_are_read_from_the_snapshot(self):
+        """Ensure that results land in the snapshot, and reads use it."""
+
+        for status_code in (503, 503):
+            with self.captureOnCommitCallbacks(execute=True):
+                record_probe_outcomes(
+                    [
+                        ProbeOutcome(
+                            self.website.id,
+                            self.website.site,
+                            status_code=status_code,
+                            latency_ms=42,
+                        )
+                    ]
+                )
+
+        self.website.refresh_from_db()
+        self.assertIsNone(self.website.status)
+        self.assertEqual(self.website.consecutive_failures, 0)
+
+        url = reverse("monitor:get_website", args=["http", "127.0.0.1:8000"])
+        data = client.get(url).json()["data"]
+        self.assertEqual(data["status"], "down")
+        self.assertEqual(data["live"]["latency_ms"], 42)
+        self.assertEqual(data["live"]["consecutive_failures"], 2)
+
+    def test_snapshot_is_reconciled_in_batches(self):
+        """Ensure that drifted websites are written back to the database."""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_probe_outcomes(
+                [ProbeOutcome(self.website.id, self.website.site, None, 503)]
+            )
+        self.snapshot.write({"http://deleted.test/": {"status": "up"}})
+
+        with self.settings(MONITOR_SNAPSHOT_RECONCILE_BATCH=10):
+            self.assertEqual(reconcile_status_snapshot(), 1)
+            self.assertEqual(reconcile_status_snapshot(), 0)
+
+        self.website.refresh_from_db()
+        self.assertEqual(self.website.status, StatusTypes.DOWN.value)
+        self.assertEqual(self.website.consecutive_failures, 1)
+        self.assertEqual(self.snapshot.read(["http://deleted.test/"]), {})
+
+    def test_unavailable_redis_falls_back_to_the_database(self):
+        """Ensure that probes and reads go on without the snapshot."""
+
+        # nothing listens on port 1, so every command fails to connect
+        self.snapshot.client = redis.Redis(port=1, socket_connect_timeout=1)
+        outcome = ProbeOutcome(self.website.id, self.website.site, None, 503)
+
+        with self.assertLogs("apps.monitor", "WARNING"):
+            with self.captureOnCommitCallbacks(execute=True):
+                record_probe_outcomes([outcome])
+
+            url = reverse(
+                "monitor:get_website", args=["http", "127.0.0.1:8000"]
+            )
+            data = client.get(url).json()["data"]
+
+        self.website.refresh_from_db()
+        self.assertEqual(self.website.status, StatusTypes.DOWN.value)
+        self.assertEqual(self.website.consecutive_failures, 1)
+        self.assertEqual(data["status"], "down")
+        self.assertIsNone(data["live"])
+
+    def test_failed_snapshot_writes_are_saved_to_the_database(self):
+        """Ensure that the live status isn't lost when a write fails."""
+
+        outcome = ProbeOutcome(self.website.id, self.website.site, None, 503)
+        with mock.patch.object(
+            self.snapshot.client,
+            "hset",
+            side_effect=redis.ConnectionError("Connection refused."),
+        ), self.assertLogs("apps.monitor.services", "WARNING"):
+            with self.captureOnCommitCallbacks(execute=True):
+                record_probe_outcomes([outcome])
+
+        self.website.refresh_from_db()
+        self.assertEqual(self.website.status, StatusTypes.DOWN.value)
+        self.assertEqual(self.website.consecutive_failures, 1)
+
+
+class SLAWindowsTestCase(SimpleTestCase):
+    """Test case for the rolling sla windows."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for sla windows test case."""
+
+        self.start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.windows = SLAWindows()
+
+        # one probe an hour for two days, down every fourth hour
+        for hour in range(48):
+            self.windows.record(
+                self.start + timedelta(hours=hour), hour % 4 != 0, 100
+            )
+
+    def test_windows_report_uptime_and_latency(self):
+        """Ensure that each window only covers its own time span."""
+
+        summary = self.windows.summary(self.start + timedelta(hours=47))
+
+        self.assertEqual(summary["24h"]["probe_count"], 24)
+        self.assertEqual(summary["24h"]["uptime_percentage"], 75.0)
+        self.assertEqual(summary["24h"]["latency_p95_ms"], 100)
+        self.assertEqual(summary["90d"]["probe_count"], 48)
+
+    def test_expired_buckets_leave_the_windows(self):
+        """Ensure that buckets older than a window no longer count."""
+
+        summary = SLAWindows(self.windows.to_state()).summary(
+            self.start + timedelta(days=10)
+        )
+
+        self.assertEqual(summary["24h"]["probe_count"], 0)
+        self.assertIsNone(summary["24h"]["uptime_percentage"])
+        self.assertEqual(summary["7d"]["probe_count"], 0)
+        self.assertEqual(summary["30d"]["probe_count"], 48)
+
+
+class GetLatencyPercentilesTestCase(APITestCase):
+    """Test case for get latency percentiles api view."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for get latency percentiles test case."""
+
+        self.user = User.objects.create(
+            email="user.test@test.com",
+            username="user.test",
+            password="user.test",
+        )
+        self.website = Websites.objects.create(site="http://127.0.0.1:8000/")
+
+        checked_at = timezone.now() - timedelta(hours=2)
+        ProbeResult.objects.bulk_create(
+            [
+                ProbeResult(
+                    site=self.website,
+                    checked_at=checked_at,
+                    status_code=200,
+                    latency_ms=latency_ms,
+                    connect_ms=20 if index == 0 else None,
+                    tls_ms=40 if index == 0 else None,
+                    created_at=checked_at,
+                )
+                for index, latency_ms in enumerate([30, 60, 90, 120, 2500])
+            ]
+        )
+        rollup_probe_results()
+
+    def test_get_latency_percentiles_from_histograms(self):
+        """Ensure that percentiles are computed per connection phase."""
+
+        url = reverse(
+            "monitor:latency_percentiles", args=["http", "127.0.0.1:8000"]
+        )
+
+        client.force_authenticate(self.user)
+        response = client.get(url, {"window": "24h"})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["total"]["count"], 5)
+        self.assertEqual(data["total"]["p50_ms"], 100)
+        self.assertEqual(data["total"]["p99_ms"], 3000)
+        self.assertEqual(
+            data["connect"],
+            {"count": 1, "p50_ms": 25, "p95_ms": 25, "p99_ms": 25},
+        )
+        self.assertEqual(data["tls"]["p50_ms"], 50)
+
+    def test_get_latency_percentiles_with_unsupported_window(self):
+        """Ensure that an unsupported window is rejected."""
+
+        url = reverse(
+            "monitor:latency_percentiles", args=["http", "127.0.0.1:8000"]
+        )
+
+        client.force_authenticate(self.user)
+        response = client.get(url, {"window": "1y"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class CredentialCacheTestCase(TestCase):
+    """Test case for caching and refreshing website credentials."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for credential cache test case."""
+
+        self.site = "https://private.test/"
+        self.stale = {"Authorization": "Token stale"}
+        AuthenticationScheme.objects.create(
+            site=self.site,
+            auth_type="token",
+            username="username",
+            password="password",
+            token_auth="stale",
+        )
+        self.cache = CredentialCache(ttl=60)
+
+    def login(self, authentication_scheme):
+        authentication_scheme.token_auth = "fresh"
+        return authentication_scheme
+
+    def test_headers_are_served_from_the_cache(self):
+        """Ensure that cached headers don't query the scheme again."""
+
+        with self.assertNumQueries(1):
+            self.cache.get_headers([self.site])
+        with self.assertNumQueries(0):
+            headers = self.cache.get_headers([self.site])
+
+        self.assertEqual(headers, {self.site: self.stale})
+
+    def test_stale_credential_is_refreshed_once(self):
+        """Ensure that concurrent refreshes of a credential log in once."""
+
+        with mock.patch(
+            "apps.monitor.credentials.fetch_credentials",
+            side_effect=self.login,
+        ) as authenticate:
+            first = self.cache.refresh({self.site: self.stale})
+            second = self.cache.refresh({self.site: self.stale})
+
+        authenticate.assert_called_once()
+        self.assertEqual(first, {self.site: {"Authorization": "Token fresh"}})
+        self.assertEqual(second, first)
+
+    def test_credential_replaced_during_login_wins(self):
+        """Ensure that a login only saves over the stale credential."""
+
+        def login_elsewhere(authentication_scheme):
+            AuthenticationScheme.objects.filter(site=self.site).update(
+                token_auth="elsewhere"
+            )
+            return self.login(authentication_scheme)
+
+        with mock.patch(
+            "apps.monitor.credentials.fetch_credentials",
+            side_effect=login_elsewhere,
+        ):
+            refreshed = self.cache.refresh({self.site: self.stale})
+
+        elsewhere = {"Authorization": "Token elsewhere"}
+        self.assertEqual(refreshed, {self.site: elsewhere})
+        self.assertEqual(
+            AuthenticationScheme.objects.get(site=self.site).token_auth,
+            "elsewhere",
+        )
+
+    def test_login_without_a_token_is_a_failed_refresh(self):
+        """Ensure that a refresh only succeeds once a token is obtained."""
+
+        # read from a registry of its own, so the queue depth isn't scraped
+        registry = CollectorRegistry()
+        registry.register(AUTH_REFRESHES)
+        sample = ("monitor_auth_refreshes_total", {"result": "failure"})
+        failed = registry.get_sample_value(*sample) or 0
+        with mock.patch(
+            "apps.monitor.credentials.fetch_credentials",
+            side_effect=lambda authentication_scheme: authentication_scheme,
+        ):
+            AuthenticationScheme.objects.filter(site=self.site).update(
+                token_auth=None
+            )
+            refreshed = self.cache.refresh({self.site: {}})
+
+        self.assertEqual(refreshed, {})
+        self.assertEqual(registry.get_sample_value(*sample), failed + 1)
+
+    def test_rejected_probe_is_retried_with_refreshed_credential(self):
+        """Ensure that a 401 refreshes the credential and probes again."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.headers.get("Authorization") == "Token fresh":
+                return httpx.Response(200)
+            return httpx.Response(401)
+
+        engine = ProbeEngine(
+            timeout=1.0,
+            transport=httpx.MockTransport(handler),
+            credentials=self.cache,
+        )
+        with mock.patch(
+            "apps.monitor.credentials.fetch_credentials",
+            side_effect=self.login,
+        ):
+            outcomes = engine.run([ProbeTarget(1, self.site, self.stale)])
+
+        self.assertEqual(outcomes[0].status_code, 200)
+
+    def test_passwords_are_encrypted_at_rest(self):
+        """Ensure that passwords are stored encrypted, and kept from admins."""
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT password FROM authentication_schemes WHERE site = %s",
+                [self.site],
+            )
+            [stored] = cursor.fetchone()
+        self.assertNotIn("password", stored)
+
+        scheme = AuthenticationScheme.objects.get(site=self.site)
+        self.assertEqual(scheme.password, "password")
+
+        model_admin = admin.site._registry[AuthenticationScheme]
+        form = model_admin.get_form(mock.Mock(), scheme)
+        self.assertNotIn("password", form.base_fields)
+
+    def test_token_expiry_is_read_from_jwt(self):
+        """Ensure that the expiry date of a jwt is read from its claims."""
+
+        token = "eyJhbGciOiJIUzI1NiJ9.eyJleHAiOjE4MDAwMDAwMDB9.signature"
+
+        self.assertEqual(get_token_expiry(token).timestamp(), 1800000000)
+        self.assertIsNone(get_token_expiry("opaque-token"))
+
+
+class NotificationDeliveryTestCase(TestCase):
+    """Test case for batched notification delivery."""
+
+    def setUp(self) -> None:
+        """Setup fixtures for notification delivery test case."""
+
+        cache.clear()
+        self.sites = ["http://first.test/", "http://second.test/"]
+        everyone = People.objects.create(email_address="ops@mail.com")
+        digest = People.objects.create(
+            email_address="lead@mail.com", digest=True
+        )
+
+        for index, site in enumerate(self.sites):
+            group = NotifyGroup.objects.create(
+                name=f"group-{index}",
+                notify=Websites.objects.create(site=site),
+            )
+            group.emails.set([everyone, digest])
+
+    def test_notifications_are_delivered_in_one_batch(self):
+        """Ensure that queued alerts are emailed together, with digests."""
+
+        queue_notifications([[self.sites[0], "down"], [self.sites[1], "up"]])
+
+        with mock.patch(
+            "apps.monitor.notifications.get_connection",
+            wraps=mail.get_connection,
+        ) as get_connection:
+            delivered = deliver_pending_notifications()
+
+        self.assertEqual(delivered, 2)
+        get_connection.assert_called_once()
+        self.assertFalse(PendingNotification.objects.exists())
+
+        self.assertEqual(len(mail.outbox), 3)
+        ops_mails = [m for m in mail.outbox if m.to == ["ops@mail.com"]]
+        self.assertEqual(
+            [m.subject for m in ops_mails],
+            ["[NOTIFY]: Website downtime", "[NOTIFY]: Website recovered"],
+        )
+
+        [lead_mail] = [m for m in mail.outbox if m.to == ["lead@mail.com"]]
+        self.assertEqual(lead_mail.subject, "[NOTIFY]: 2 website alerts")
+        self.assertIn(self.sites[0], lead_mail.body)
+        self.assertIn(self.sites[1], lead_mail.body)
+
+    def test_undelivered_notifications_are_retried(self):
+        """Ensure that alerts are kept until their emails are sent."""
+
+        queue_notifications([[self.sites[0], "down"], [self.sites[1], "up"]])
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=smtplib.SMTPServerDisconnected("Connection lost."),
+        ), self.assertLogs("apps.monitor.notifications", "WARNING"):
+            delivered = deliver_pending_notifications()
+
+        self.assertEqual(delivered, 0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            list(
+                PendingNotification.objects.values_list("attempts", flat=True)
+            ),
+            [1, 1],
+        )
+
+        # claimed alerts wait for their claim to run out
+        self.assertEqual(deliver_pending_notifications(), 0)
+
+        PendingNotification.objects.update(claimed_until=timezone.now())
+        self.assertEqual(deliver_pending_notifications(), 2)
+        self.assertFalse(PendingNotification.objects.exists())
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_retried_notifications_skip_recipients_already_emailed(self):
+        """Ensure that a retry only emails the recipients that were missed."""
+
+        queue_notifications([[self.sites[0], "down"], [self.sites[1], "up"]])
+        send_messages = mail.backends.locmem.EmailBackend.send_messages
+
+        def fail_digests(backend, messages):
+            if messages[0].to == ["lead@mail.com"]:
+                raise smtplib.SMTPRecipientsRefused({})
+            return send_messages(backend, messages)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            autospec=True,
+            side_effect=fail_digests,
+        ), self.assertLogs("apps.monitor.notifications", "WARNING"):
+            delivered = deliver_pending_notifications()
+
+        self.assertEqual(delivered, 0)
+        self.assertEqual(
+            list(
+                PendingNotification.objects.values_list(
+                    "delivered_to", flat=True
+                )
+            ),
+            [["ops@mail.com"], ["ops@mail.com"]],
+        )
+
+        PendingNotification.objects.update(claimed_until=timezone.now())
+        self.assertEqual(deliver_pending_notifications(), 2)
+        self.assertFalse(PendingNotification.objects.exists())
+
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            ["lead@mail.com", "ops@mail.com", "ops@mail.com"],
+        )
+
+    @override_settings(MONITOR_NOTIFY_MAX_ATTEMPTS=1)
+    def test_notifications_are_dropped_after_the_last_attempt(self):
+        """Ensure that alerts that keep failing leave the queue."""
+
+        queue_notifications([[self.sites[0], "down"]])
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=smtplib.SMTPServerDisconnected("Connection lost."),
+        ), self.assertLogs("apps.monitor.notifications", "ERROR"):
+            delivered = deliver_pending_notifications()
+
+        self.assertEqual(delivered, 0)
+        self.assertFalse(PendingNotification.objects.exists())
+
+    def test_recipients_are_cached_until_groups_change(self):
+        """Ensure that recipients are served from the cache."""
+
+        get_notification_recipients(self.sites)
+        with self.assertNumQueries(0):
+            recipients = get_notification_recipients(self.sites)
+        self.assertEqual(
+            recipients[self.sites[0]],
+            [("lead@mail.com", True), ("ops@mail.com", False)],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NotifyGroup.objects.get(name="group-0").emails.add(
+                People.objects.create(email_address="new@mail.com")
+            )
+
+        recipients = get_notification_recipients(self.sites)
+        self.assertIn(("new@mail.com", False), recipients[self.sites[0]])
+        self.assertNotIn(("new@mail.com", False), recipients[self.sites[1]])
+
+    def test_recipients_are_invalidated_per_site(self):
+        """Ensure that a change only drops the recipients of its sites."""
+
+        get_notification_recipients(self.sites)
+        ops = People.objects.get(email_address="ops@mail.com")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ops.people_notify_group.remove(
+                NotifyGroup.objects.get(name="group-1")
+            )
+
+        with self.assertNumQueries(0):
+            recipients = get_notification_recipients(self.sites[:1])
+        self.assertIn(("ops@mail.com", False), recipients[self.sites[0]])
+
+        recipients = get_notification_recipients(self.sites)
+        self.assertEqual(recipients[self.sites[1]], [("lead@mail.com", True)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ops.delete()
+        recipients = get_notification_recipients(self.sites)
+        self.assertEqual(
+            list(recipients.values()), [[("lead@mail.com", True)]] * 2
+        )
+
+
+class MetricsTestCase(TestCase):
+    def test_metrics_cover_probes_and_queue_depth(self):
+        """Ensure that probe outcomes and the queue depth are exported."""
+
+        observe_probe_outcomes(
+            [
+                ProbeOutcome(
+                    1, "https://a.com", status_code=200, latency_ms=80
+                ),
+                ProbeOutcome(2, "https://b.com", error="timeout"),
+                ProbeOutcome(3, "https://c.com", skipped="circuit_open"),
+            ]
+        )
+
+        with mock.patch("saas.task_queue.app.connection_for_read") as broker:
+            channel = (
+                broker.return_value.__enter__.return_value.default_channel
+            )
+            channel.queue_declare.return_value = ("celery", 7, 0)
+            response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('monitor_probe_outcomes_total{outcome="up"}', body)
+        self.assertIn('monitor_probe_outcomes_total{outcome="timeout"}', body)
+        self.assertIn(
+            'monitor_probes_skipped_total{reason="circuit_open"}', body
+        )
+        self.assertIn("monitor_probe_latency_seconds_count", body)
+        self.assertIn('monitor_celery_queue_depth{queue="celery"} 7.0', body)
+
+    @override_settings(
+        MONITOR_METRICS_ALLOWED_IPS=["10.0.0.0/8"],
+        MONITOR_METRICS_TOKEN="scrape-token",
+    )
+    def test_metrics_are_only_served_to_scrapers(self):
+        """Ensure that metrics need an allowed address or the token."""
+
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_AUTHORIZATION="Bearer wrong"
+            ).status_code,
+            403,
+        )
+
+        with mock.patch("saas.task_queue.app.connection_for_read") as broker:
+            channel = (
+                broker.return_value.__enter__.return_value.default_channel
+            )
+            channel.queue_declare.return_value = ("celery", 0, 0)
+            by_address = self.client.get(url, REMOTE_ADDR="10.1.2.3")
+            by_token = self.client.get(
+                url, HTTP_AUTHORIZATION="Bearer scrape-token"
+            )
+        self.assertEqual(by_address.status_code, 200)
+        self.assertEqual(by_token.status_code, 200)
+
+
+class BenchmarkMonitoringTestCase(TestCase):
+    def test_benchmark_reports_on_a_synthetic_fleet(self):
+        """Ensure that the benchmark probes the fleet and cleans up."""
+
+        output = io.StringIO()
+        call_command(
+            "benchmark_monitoring",
+            sites=20,
+            hosts=2,
+            cycles=2,
+            latency="fixed",
+            latency_ms=1,
+            auth_rate=0.5,
+            stdout=output,
+        )
+
+        report = output.getvalue()
+        self.assertIn("Registered 20 sites", report)
+        self.assertIn("Cycle time p99", report)
+        self.assertIn("Queries per site", report)
+        self.assertEqual(ProbeResult.objects.count(), 0)
+        self.assertFalse(Websites.objects.exists())
+        self.assertFalse(AuthenticationScheme.objects.exists())
+
+    def test_benchmark_rejects_empty_runs(self):
+        """Ensure that runs with nothing to measure are refused up front."""
+
+        for option in ("sites", "cycles"):
+            with self.assertRaisesMessage(
+                CommandError, f"--{option} must be at least 1."
+            ):
+                call_command("benchmark_monitoring", **{option: 0})
+
+
+class MonitorCycleRecordTestCase(TestCase):
+    """Test case for recording the breakdown of monitoring cycles."""
+
+    def get_chunk_summary(self, probe_time: float, profile=None) -> dict:
+        return {
+            "websites": 2,
+            "up": 2,
+            "down": 0,
+            "timings": {
+                "fetch": 0.01,
+                "probe": probe_time,
+                "persist": 0.02,
+                "notify": 0.0,
+            },
+            "queries": {"fetch": 2, "probe": 0, "persist": 6, "notify": 1},
+            "profile": profile,
+        }
+
+    def test_phases_are_timed_and_profiled(self):
+        """Ensure that phases are timed, their queries counted, and profiled."""
+
+        timer = PhaseTimer(profile=True)
+        with timer.phase("fetch"):
+            list(Websites.objects.all())
+            list(People.objects.all())
+
+        with timer.phase("persist"):
+            with timer.phase("notify"):
+                list(People.objects.all())
+
+        self.assertEqual(timer.queries["fetch"], 2)
+        self.assertEqual(timer.queries["probe"], 0)
+        self.assertEqual(timer.queries["persist"], 0)
+        self.assertEqual(timer.queries["notify"], 1)
+        self.assertGreater(timer.timings["fetch"], 0)
+        self.assertIn("function calls", timer.format_profile(10))
+        self.assertIsNone(PhaseTimer().format_profile(10))
+
+    def test_cycle_is_recorded_with_slowest_profile(self):
+        """Ensure that a cycle records its phases and slowest chunk profile."""
+
+        cycle = aggregate_monitoring_cycle(
+            [
+                self.get_chunk_summary(0.5, profile="fast chunk"),
+                self.get_chunk_summary(1.5, profile="slow chunk"),
+            ],
+            started_at=time.time() - 2,
+        )
+        monitor_cycle = record_monitor_cycle(cycle)
+
+        self.assertEqual(monitor_cycle.sites, 4)
+        self.assertEqual(monitor_cycle.chunks, 2)
+        self.assertEqual(monitor_cycle.probe_time, 2.0)
+        self.assertEqual(monitor_cycle.persist_queries, 12)
+        self.assertEqual(monitor_cycle.queries, 18)
+        self.assertEqual(monitor_cycle.profile, "slow chunk")
+        self.assertGreaterEqual(monitor_cycle.duration, 2)
+
+        # a profiled cycle faster than the recent ones isn't worth keeping
+        cycle = aggregate_monitoring_cycle(
+            [self.get_chunk_summary(0.1, profile="quick cycle")],
+            started_at=time.time(),
+        )
+        self.assertIsNone(record_monitor_cycle(cycle).profile)
+
+    def test_cycle_with_a_failed_chunk_is_recorded(self):
+        """Ensure that a failed chunk still leaves a record of its cycle."""
+
+        claimed_until = timezone.now() + timedelta(minutes=15)
+        website_ids = [
+            Websites.objects.create(
+                site=f"http://failed-{index}.test/",
+                next_check_at=claimed_until,
+            ).id
+            for index in range(2)
+        ]
+
+        with mock.patch(
+            "apps.monitor.tasks.probe_websites_chunk",
+            side_effect=RuntimeError("Probing went wrong."),
+        ), self.assertLogs("apps.monitor.tasks", "ERROR"):
+            failed = monitor_websites_chunk(website_ids)
+
+        cycle = aggregate_monitoring_cycle(
+            [self.get_chunk_summary(0.5), failed], started_at=time.time()
+        )
+        monitor_cycle = record_monitor_cycle(cycle)
+
+        self.assertEqual(monitor_cycle.chunks, 2)
+        self.assertEqual(monitor_cycle.failed_chunks, 1)
+        self.assertEqual(monitor_cycle.sites, 2)
+        self.assertEqual(monitor_cycle.skipped, 2)
+
+        # the websites of the failed chunk are due again on the next beat
+        self.assertFalse(
+            Websites.objects.filter(
+                id__in=website_ids, next_check_at__gte=claimed_until
+            ).exists()
+        )
+
+    @override_settings(MONITOR_CHUNK_RETRY_DELAY=0)
+    def test_chunks_are_retried_on_transient_database_errors(self):
+        """Ensure that a chunk that lost its database is probed again."""
+
+        summary = self.get_chunk_summary(0.5)
+        with mock.patch(
+            "apps.monitor.tasks.probe_websites_chunk",
+            side_effect=[OperationalError("Connection lost."), summary],
+        ) as probe:
+            result = monitor_websites_chunk.apply(args=([1, 2],))
+
+        self.assertEqual(probe.call_count, 2)
+        self.assertEqual(result.get(), summary)
+
+    def test_recent_cycles_are_listed(self):
+        """Ensure that recent cycles are listed, newest first."""
+
+        for _ in range(2):
+            record_monitor_cycle(
+                aggregate_monitoring_cycle(
+                    [self.get_chunk_summary(0.5)], started_at=time.time()
+                )
+            )
+
+        user = User.objects.create(username="cycles.test")
+        client.force_authenticate(user)
+        self.addCleanup(client.force_authenticate, None)
+        response = client.get(reverse("monitor:monitor_cycles"))
+
+        self.assertEqual(response.status_code, 200)
+        cycles = response.json()["data"]
+        self.assertEqual(len(cycles), 2)
+        self.assertGreater(cycles[0]["id"], cycles[1]["id"])
+        self.assertEqual(cycles[0]["queries"], 9)
+        self.assertNotIn("profile", cycles[0])
@@ -5,9 +5,14 @@ from django.urls import path, include
 from apps.monitor.views import (
     AuthenticationTypesAPIView,
     AddWebsiteAPIView,
+    ImportWebsitesAPIView,
     AddNotifyGroupAPIView,
     GetLogsOfHistoricalStatsAPIView,
+    GetProbeResultsAPIView,
+    GetLatencyPercentilesAPIView,
+    ListMonitorCyclesAPIView,
     GetWebsiteAPIView,
+    ListWebsitesAPIView,
     # auth imports
     RegisterUserAPIView,
     LoginUserAPIView,
@@ -31,17 +36,38 @@ urlpatterns = [
         name="auth_types",
     ),
     path("add-website/", AddWebsiteAPIView.as_view(), name="add_website"),
+    path(
+        "import-websites/",
+        ImportWebsitesAPIView.as_view(),
+        name="import_websites",
+    ),
     path("add-notify-group/", AddNotifyGroupAPIView.as_view(), name="add_notify_group"),
     path(
         "get-website/<str:protocol>/<str:domain_name>/",
         GetWebsiteAPIView.as_view(),
         name="get_website"
     ),
+    path("websites/", ListWebsitesAPIView.as_view(), name="list_websites"),
     path(
         "historical-stats/",
         GetLogsOfHistoricalStatsAPIView.as_view(),
         name="historical_stats",
     ),
+    path(
+        "probe-results/<str:protocol>/<str:domain_name>/",
+        GetProbeResultsAPIView.as_view(),
+        name="probe_results",
+    ),
+    path(
+        "latency/<str:protocol>/<str:domain_name>/",
+        GetLatencyPercentilesAPIView.as_view(),
+        name="latency_percentiles",
+    ),
+    path(
+        "monitor-cycles/",
+        ListMonitorCyclesAPIView.as_view(),
+        name="monitor_cycles",
+    ),
     # auth include
     path("auth/", include(auth_routes)),
 ]
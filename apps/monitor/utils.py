@@ -1,3 +1,15 @@
+# Stdlib Imports
+import json
+import base64
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Django Imports
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
 # Rest Framework Imports
 from rest_framework import exceptions
 
@@ -18,3 +30,129 @@ def validate_protocol(protocol: str) -> str:
             {"message": "Protocol is not supported."}
         )
     return protocol
+
+
+def is_truthy(value: Optional[str]) -> bool:
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """
+    This function splits an iterable into consecutive chunks of the given
+    size, consuming it lazily so it can be a stream of any length.
+
+    :param items: The iterable to split
+    :type items: Iterable
+    :param size: The maximum number of items per chunk
+    :type size: int
+
+    :return: An iterator of chunks.
+    """
+
+    iterator = iter(items)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def validate_time_range(
+    start: str, end: str, default_span: timedelta = timedelta(hours=1)
+) -> Tuple[datetime, datetime]:
+    """
+    This function parses an ISO 8601 time range, defaulting the end to now
+    and the start to the default span before the end, otherwise raise a
+    validation error.
+
+    :param start: The start of the time range
+    :type start: str
+    :param end: The end of the time range
+    :type end: str
+    :param default_span: The span of the range when no start is given
+    :type default_span: timedelta
+
+    :return: The start and end of the time range.
+    """
+
+    try:
+        end = parse_datetime(end) if end else timezone.now()
+        start = parse_datetime(start) if start else end - default_span
+    except (ValueError, TypeError):
+        start = end = None
+
+    if start is not None and end is not None:
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+
+    if start is None or end is None or start > end:
+        raise exceptions.ValidationError(
+            {"message": "Time range is not valid."}
+        )
+    return start, end
+
+
+def validate_window(window: str, windows: Iterable[str]) -> str:
+    """
+    This function checks if the window is one of the supported windows,
+    otherwise raise a validation error.
+
+    :param window: The window to validate
+    :type window: str
+    :param windows: The supported windows
+    :type windows: Iterable[str]
+
+    :return: The window is being returned.
+    """
+
+    if window not in windows:
+        raise exceptions.ValidationError(
+            {"message": "Window is not supported."}
+        )
+    return window
+
+
+def validate_check_interval(value: timedelta) -> timedelta:
+    """
+    This function checks if the check interval is not shorter than the
+    minimum check interval, otherwise raise a validation error.
+
+    :param value: The check interval to validate
+    :type value: timedelta
+
+    :return: The check interval is being returned.
+    """
+
+    minimum = timedelta(seconds=settings.MONITOR_MIN_CHECK_INTERVAL)
+    if value < minimum:
+        raise exceptions.ValidationError(
+            {
+                "message": f"Check interval must be at least "
+                f"{minimum.total_seconds():g} seconds."
+            }
+        )
+    return value
+
+
+def get_token_expiry(token: str) -> Optional[datetime]:
+    """
+    This function reads the expiry date of a jwt from its "exp" claim.
+    The signature is not verified, as the token is only used to know
+    when to authenticate again.
+
+    :param token: The token to read the expiry date of
+    :type token: str
+
+    :return: The expiry date and time, if the token is a jwt with one.
+    """
+
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return datetime.fromtimestamp(int(claims["exp"]), tz=timezone.utc)
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        # not a jwt, or one without an expiry date
+        return None
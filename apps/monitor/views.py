@@ -1,23 +1,58 @@
+# Stdlib Imports
+import json
+from typing import Iterable, Iterator, List, Tuple
+
 # Rest Framework Imports
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework import generics, status, exceptions, permissions
+from rest_framework.utils.encoders import JSONEncoder
 
 # Django Imports
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 from django.contrib.auth import authenticate, login, logout
 
 # Own Imports
-from apps.monitor.models import HistoricalStats, AuthTypes
+from apps.monitor.models import AuthTypes
 from apps.monitor.serializers import (
     HistoricalStatsSerializer,
+    ProbeResultSerializer,
+    MonitorCycleSerializer,
     NotifyPeopleGroupSerializer,
     WriteOnlyWebsiteSerializer,
     ReadOnlyWebsiteSerializer,
+    ImportWebsiteRowSerializer,
     CreateUserSerializer,
     LoginUserSerializer,
 )
-from apps.monitor.selectors import get_website
-from apps.monitor.utils import validate_protocol
+from apps.monitor.selectors import (
+    LATENCY_WINDOWS,
+    get_website,
+    get_website_with_stats,
+    get_websites_with_stats,
+    get_live_statuses,
+    get_probe_results,
+    get_historical_stats_logs,
+    get_latency_histograms,
+    get_monitor_cycles,
+)
+from apps.monitor.parsers import CSVRowsParser, NDJSONRowsParser
+from apps.monitor.services import import_websites
+from apps.monitor.tasks import authenticate_websites_in_background
+from apps.monitor.caching import (
+    FLEET_VERSION_KEY,
+    ConditionalCacheMixin,
+    get_site_version_key,
+)
+from apps.monitor.pagination import KeysetPagination, iterate_keyset
+from apps.monitor.utils import (
+    is_truthy,
+    validate_protocol,
+    validate_time_range,
+    validate_window,
+)
 
 
 class AuthenticationTypesAPIView(generics.ListAPIView):
@@ -27,21 +62,55 @@ class AuthenticationTypesAPIView(generics.ListAPIView):
         return Response(data=data, status=status.HTTP_200_OK)
 
 
-class GetWebsiteAPIView(generics.RetrieveAPIView):
+class GetWebsiteAPIView(ConditionalCacheMixin, generics.RetrieveAPIView):
 
     serializer_class = ReadOnlyWebsiteSerializer
 
     def get(
         self, request: Request, protocol: str, domain_name: str
     ) -> Response:
-        website = get_website(
-            validate_protocol(protocol) + "://" + domain_name + "/"
+        site = validate_protocol(protocol) + "://" + domain_name + "/"
+
+        def build() -> dict:
+            serializer = self.serializer_class(
+                get_website_with_stats(site),
+                context={"live_statuses": get_live_statuses([site])},
+            )
+            return {
+                "message": "Website info retrieved!",
+                "data": serializer.data,
+            }
+
+        return self.get_cached_response(
+            request, get_site_version_key(site), build
+        )
+
+
+class ListWebsitesAPIView(generics.GenericAPIView):
+
+    serializer_class = ReadOnlyWebsiteSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
+
+    def get_queryset(self) -> QuerySet:
+        return get_websites_with_stats()
+
+    def get(self, request: Request) -> Response:
+        websites = self.paginate_queryset(self.get_queryset())
+        serializer = self.serializer_class(
+            websites,
+            many=True,
+            context={
+                "live_statuses": get_live_statuses(
+                    website.site for website in websites
+                )
+            },
         )
-        serializer = self.serializer_class(website)
         return Response(
             {
-                "message": "Website info retrieved!",
+                "message": "Websites retrieved!",
                 "data": serializer.data,
+                "next": self.paginator.get_next_link(),
             },
             status=status.HTTP_200_OK,
         )
@@ -61,6 +130,59 @@ class AddWebsiteAPIView(generics.CreateAPIView):
         )
 
 
+class ImportWebsitesAPIView(generics.CreateAPIView):
+
+    serializer_class = ImportWebsiteRowSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    parser_classes = (CSVRowsParser, NDJSONRowsParser)
+
+    def post(self, request: Request) -> Response:
+        errors = []
+        summary = import_websites(
+            self.validate_rows(request.data, errors),
+            authenticate=authenticate_websites_in_background.delay,
+        )
+        summary["errors"] = sorted(
+            errors + summary["errors"], key=lambda error: error["row"]
+        )
+        return Response(
+            {"message": "Websites imported!", "data": summary},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def validate_rows(
+        self, rows: Iterable, errors: List[dict]
+    ) -> Iterator[Tuple[int, dict]]:
+        """
+        This method validates the uploaded rows one at a time, as they
+        are parsed, collecting the errors of the invalid ones.
+
+        :param rows: The parsed rows
+        :type rows: Iterable
+        :param errors: The list to collect the errors of invalid rows in
+        :type errors: List[dict]
+
+        :return: An iterator of (row number, validated data) pairs.
+        """
+
+        for row, data in enumerate(rows, start=1):
+            if not isinstance(data, dict):
+                errors.append({"row": row, "errors": ["Row is not valid."]})
+                continue
+
+            # empty csv cells are treated as missing columns
+            data = {
+                key: value
+                for key, value in data.items()
+                if key is not None and value not in ("", None)
+            }
+            serializer = self.serializer_class(data=data)
+            if serializer.is_valid():
+                yield row, serializer.validated_data
+            else:
+                errors.append({"row": row, "errors": serializer.errors})
+
+
 class AddNotifyGroupAPIView(generics.CreateAPIView):
 
     serializer_class = NotifyPeopleGroupSerializer
@@ -75,19 +197,126 @@ class AddNotifyGroupAPIView(generics.CreateAPIView):
         )
 
 
-class GetLogsOfHistoricalStatsAPIView(generics.GenericAPIView):
+class GetLogsOfHistoricalStatsAPIView(
+    ConditionalCacheMixin, generics.GenericAPIView
+):
 
     serializer_class = HistoricalStatsSerializer
-    queryset = HistoricalStats.objects.select_related("track")
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
+
+    def get_queryset(self) -> QuerySet:
+        return get_historical_stats_logs()
+
+    def get(self, request: Request) -> Response:
+        if is_truthy(request.query_params.get("stream")):
+            return self.stream(self.get_queryset())
+
+        def build() -> dict:
+            historical_stats = self.paginate_queryset(self.get_queryset())
+            serializer = self.serializer_class(historical_stats, many=True)
+            return {
+                "message": "Log of historical stats retrieved!",
+                "data": serializer.data,
+                "next": self.paginator.get_next_link(),
+            }
+
+        return self.get_cached_response(request, FLEET_VERSION_KEY, build)
+
+    def stream(self, queryset: QuerySet) -> StreamingHttpResponse:
+        """
+        This method streams every historical stats as newline delimited
+        json, one keyset batch at a time, so memory stays constant no
+        matter the size of the fleet.
+        """
+
+        rows = (
+            json.dumps(self.serializer_class(stats).data, cls=JSONEncoder)
+            + "\n"
+            for stats in iterate_keyset(
+                queryset, settings.MONITOR_STREAM_BATCH_SIZE
+            )
+        )
+        return StreamingHttpResponse(rows, content_type="application/x-ndjson")
+
+
+class GetProbeResultsAPIView(generics.GenericAPIView):
+
+    serializer_class = ProbeResultSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(
+        self, request: Request, protocol: str, domain_name: str
+    ) -> Response:
+        website = get_website(
+            validate_protocol(protocol) + "://" + domain_name + "/"
+        )
+        start, end = validate_time_range(
+            request.query_params.get("start"), request.query_params.get("end")
+        )
+        serializer = self.serializer_class(
+            get_probe_results(website, start, end), many=True
+        )
+        return Response(
+            {
+                "message": "Probe results retrieved!",
+                "data": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class GetLatencyPercentilesAPIView(generics.GenericAPIView):
+
     permission_classes = (permissions.IsAuthenticated,)
 
+    def get(
+        self, request: Request, protocol: str, domain_name: str
+    ) -> Response:
+        website = get_website(
+            validate_protocol(protocol) + "://" + domain_name + "/"
+        )
+        window = validate_window(
+            request.query_params.get("window", "24h"), LATENCY_WINDOWS
+        )
+        histograms = get_latency_histograms(website, window)
+        return Response(
+            {
+                "message": "Latency percentiles retrieved!",
+                "data": {
+                    "window": window,
+                    **{
+                        phase: {
+                            "count": histogram.total,
+                            "p50_ms": histogram.percentile(0.50),
+                            "p95_ms": histogram.percentile(0.95),
+                            "p99_ms": histogram.percentile(0.99),
+                        }
+                        for phase, histogram in histograms.items()
+                    },
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class ListMonitorCyclesAPIView(generics.GenericAPIView):
+
+    serializer_class = MonitorCycleSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = KeysetPagination
+
+    def get_queryset(self) -> QuerySet:
+        return get_monitor_cycles()
+
     def get(self, request: Request) -> Response:
-        historical_stats = self.get_queryset()
-        serializer = self.serializer_class(historical_stats, many=True)
+        monitor_cycles = self.paginate_queryset(self.get_queryset())
+        serializer = self.serializer_class(monitor_cycles, many=True)
         return Response(
             {
-                "message": "Log of historical stats retrieved!",
+                "message": "Monitor cycles retrieved!",
                 "data": serializer.data,
+                "next": self.paginator.get_next_link(),
             },
             status=status.HTTP_200_OK,
         )
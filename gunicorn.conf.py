@@ -0,0 +1,21 @@
+# Stdlib Imports
+import os
+
+# Third Party Imports
+import django
+
+
+def child_exit(server, worker) -> None:
+    """
+    This hook runs in the gunicorn master when a worker exits, and drops
+    the live gauges of the worker from the prometheus multiprocess
+    directory, so a restarted worker doesn't leave them behind.
+    """
+
+    # the master doesn't load the app, so django is set up here
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "saas.settings")
+    django.setup()
+
+    from apps.monitor.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
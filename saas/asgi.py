@@ -3,6 +3,10 @@ ASGI config for saas project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The status events stream is served by its own asgi application, as it
+outlives the request/response cycle of django views, every other request
+is served by django.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
@@ -13,4 +17,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'saas.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from apps.monitor.events import StatusEventsApp  # noqa: E402
+
+STATUS_EVENTS_PATH = "/api/status-events/"
+
+status_events_application = StatusEventsApp()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == STATUS_EVENTS_PATH:
+        return await status_events_application(scope, receive, send)
+    return await django_application(scope, receive, send)
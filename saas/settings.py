@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config as environ
+from decouple import Csv, config as environ
 from dj_database_url import config as db_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -96,6 +96,22 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# the local memory default is per process, point every web and worker
+# process to a shared cache (e.g. memcached) so invalidations reach them all
+
+CACHES = {
+    "default": {
+        "BACKEND": environ(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": environ("CACHE_LOCATION", default=""),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -151,8 +167,227 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Celery Definition
 CELERY_BROKER_URL = environ("CELERY_BROKER_REDIS_URL")
-RESULT_BACKEND = environ("CELERY_RESULT_BACKEND")
-ACCEPT_CONTENT = ["application/json"]
-TASK_SERIALIZER = "json"
-RESULT_SERIALIZER = "json"
-TIMEZONE = "Africa/Lagos"
+CELERY_RESULT_BACKEND = environ("CELERY_RESULT_BACKEND")
+CELERY_ACCEPT_CONTENT = ["application/json"]
+CELERY_TASK_SERIALIZER = "json"
+CELERY_RESULT_SERIALIZER = "json"
+CELERY_TIMEZONE = "Africa/Lagos"
+
+# Monitor Configuration
+MONITOR_PROBE_CONCURRENCY = environ(
+    "MONITOR_PROBE_CONCURRENCY", default=100, cast=int
+)
+MONITOR_PROBE_TIMEOUT = environ(
+    "MONITOR_PROBE_TIMEOUT", default=10.0, cast=float
+)
+MONITOR_POOL_MAX_CONNECTIONS = environ(
+    "MONITOR_POOL_MAX_CONNECTIONS", default=200, cast=int
+)
+MONITOR_POOL_MAX_KEEPALIVE = environ(
+    "MONITOR_POOL_MAX_KEEPALIVE", default=200, cast=int
+)
+MONITOR_POOL_KEEPALIVE_EXPIRY = environ(
+    "MONITOR_POOL_KEEPALIVE_EXPIRY", default=120.0, cast=float
+)
+MONITOR_POOL_PER_HOST_LIMIT = environ(
+    "MONITOR_POOL_PER_HOST_LIMIT", default=10, cast=int
+)
+# requires the h2 package (pip install httpx[http2])
+MONITOR_PROBE_HTTP2 = environ(
+    "MONITOR_PROBE_HTTP2", default=False, cast=bool
+)
+MONITOR_CREDENTIAL_CACHE_TTL = environ(
+    "MONITOR_CREDENTIAL_CACHE_TTL", default=300.0, cast=float
+)
+MONITOR_CREDENTIAL_EXPIRY_MARGIN = environ(
+    "MONITOR_CREDENTIAL_EXPIRY_MARGIN", default=60, cast=int
+)
+# fernet keys the passwords of websites are encrypted with, the first
+# encrypting and all of them decrypting, so keys can be rotated; without
+# any, a key is derived from SECRET_KEY
+MONITOR_CREDENTIALS_KEYS = environ(
+    "MONITOR_CREDENTIALS_KEYS", default="", cast=Csv()
+)
+MONITOR_CHUNK_SIZE = environ("MONITOR_CHUNK_SIZE", default=500, cast=int)
+# seconds before a chunk that hit a transient database error is retried
+MONITOR_CHUNK_RETRY_DELAY = environ(
+    "MONITOR_CHUNK_RETRY_DELAY", default=5.0, cast=float
+)
+MONITOR_PERSIST_BATCH_SIZE = environ(
+    "MONITOR_PERSIST_BATCH_SIZE", default=200, cast=int
+)
+MONITOR_ROLLUP_INTERVAL = environ(
+    "MONITOR_ROLLUP_INTERVAL", default=60.0, cast=float
+)
+MONITOR_ROLLUP_BATCH_SIZE = environ(
+    "MONITOR_ROLLUP_BATCH_SIZE", default=50000, cast=int
+)
+MONITOR_ROLLUP_LAG = environ("MONITOR_ROLLUP_LAG", default=60, cast=int)
+MONITOR_MIN_CHECK_INTERVAL = environ(
+    "MONITOR_MIN_CHECK_INTERVAL", default=30, cast=int
+)
+MONITOR_SCHEDULER_TICK = environ(
+    "MONITOR_SCHEDULER_TICK", default=10.0, cast=float
+)
+MONITOR_SCHEDULER_BATCH_SIZE = environ(
+    "MONITOR_SCHEDULER_BATCH_SIZE", default=5000, cast=int
+)
+MONITOR_ALERT_FAILURE_THRESHOLD = environ(
+    "MONITOR_ALERT_FAILURE_THRESHOLD", default=3, cast=int
+)
+# seconds between "still down" reminders, 0 disables them
+MONITOR_ALERT_REMINDER_INTERVAL = environ(
+    "MONITOR_ALERT_REMINDER_INTERVAL", default=3600, cast=int
+)
+MONITOR_NOTIFY_INTERVAL = environ(
+    "MONITOR_NOTIFY_INTERVAL", default=30.0, cast=float
+)
+MONITOR_NOTIFY_BATCH_SIZE = environ(
+    "MONITOR_NOTIFY_BATCH_SIZE", default=1000, cast=int
+)
+# seconds a delivery holds the notifications it claimed, after which
+# those it failed to send are retried, and how many times they are tried
+MONITOR_NOTIFY_CLAIM_TIMEOUT = environ(
+    "MONITOR_NOTIFY_CLAIM_TIMEOUT", default=300, cast=int
+)
+MONITOR_NOTIFY_MAX_ATTEMPTS = environ(
+    "MONITOR_NOTIFY_MAX_ATTEMPTS", default=5, cast=int
+)
+MONITOR_RECIPIENT_INDEX_TTL = environ(
+    "MONITOR_RECIPIENT_INDEX_TTL", default=3600, cast=int
+)
+MONITOR_PAGE_SIZE = environ("MONITOR_PAGE_SIZE", default=100, cast=int)
+MONITOR_MAX_PAGE_SIZE = environ(
+    "MONITOR_MAX_PAGE_SIZE", default=1000, cast=int
+)
+MONITOR_STREAM_BATCH_SIZE = environ(
+    "MONITOR_STREAM_BATCH_SIZE", default=2000, cast=int
+)
+MONITOR_RESPONSE_CACHE_TTL = environ(
+    "MONITOR_RESPONSE_CACHE_TTL", default=300, cast=int
+)
+# seconds the version of a site's data is kept after it last changed
+MONITOR_VERSION_TTL = environ("MONITOR_VERSION_TTL", default=86400, cast=int)
+
+# the number of imported websites validated and inserted at once
+MONITOR_IMPORT_BATCH_SIZE = environ(
+    "MONITOR_IMPORT_BATCH_SIZE", default=1000, cast=int
+)
+
+# logins to websites: how long one may take (and connecting, in seconds),
+# how many times a failed one is retried with exponential backoff from
+# MONITOR_AUTH_BACKOFF seconds, and how many run concurrently
+MONITOR_AUTH_TIMEOUT = environ(
+    "MONITOR_AUTH_TIMEOUT", default=10.0, cast=float
+)
+MONITOR_AUTH_CONNECT_TIMEOUT = environ(
+    "MONITOR_AUTH_CONNECT_TIMEOUT", default=5.0, cast=float
+)
+MONITOR_AUTH_RETRIES = environ("MONITOR_AUTH_RETRIES", default=2, cast=int)
+MONITOR_AUTH_BACKOFF = environ(
+    "MONITOR_AUTH_BACKOFF", default=0.5, cast=float
+)
+MONITOR_AUTH_CONCURRENCY = environ(
+    "MONITOR_AUTH_CONCURRENCY", default=20, cast=int
+)
+
+# a host's circuit opens after this many failed probes in a row, and lets
+# a trial probe through after the cooldown (in seconds); circuits are
+# persisted at most once per persist interval (in seconds)
+MONITOR_CIRCUIT_FAILURE_THRESHOLD = environ(
+    "MONITOR_CIRCUIT_FAILURE_THRESHOLD", default=5, cast=int
+)
+MONITOR_CIRCUIT_COOLDOWN = environ(
+    "MONITOR_CIRCUIT_COOLDOWN", default=300.0, cast=float
+)
+MONITOR_CIRCUIT_PERSIST_INTERVAL = environ(
+    "MONITOR_CIRCUIT_PERSIST_INTERVAL", default=60.0, cast=float
+)
+
+# how long a monitoring cycle may take (in seconds), websites not probed
+# by then are carried over to the next one
+MONITOR_CYCLE_DEADLINE = environ(
+    "MONITOR_CYCLE_DEADLINE", default=240.0, cast=float
+)
+
+# adaptive scheduling: websites that are down or flapping are checked this
+# factor of their check interval, and websites stable for longer than the
+# stable period (in seconds) get their interval stretched by one check
+# interval per stable period, up to the max factor and the max interval (in
+# seconds); websites down for this ratio of their checks are flapping
+MONITOR_ADAPTIVE_SCHEDULING = environ(
+    "MONITOR_ADAPTIVE_SCHEDULING", default=True, cast=bool
+)
+MONITOR_ADAPTIVE_DOWN_FACTOR = environ(
+    "MONITOR_ADAPTIVE_DOWN_FACTOR", default=0.25, cast=float
+)
+MONITOR_ADAPTIVE_MAX_FACTOR = environ(
+    "MONITOR_ADAPTIVE_MAX_FACTOR", default=4.0, cast=float
+)
+MONITOR_ADAPTIVE_MAX_INTERVAL = environ(
+    "MONITOR_ADAPTIVE_MAX_INTERVAL", default=3600, cast=int
+)
+MONITOR_ADAPTIVE_STABLE_PERIOD = environ(
+    "MONITOR_ADAPTIVE_STABLE_PERIOD", default=86400, cast=int
+)
+MONITOR_ADAPTIVE_FLAPPING_RATIO = environ(
+    "MONITOR_ADAPTIVE_FLAPPING_RATIO", default=0.05, cast=float
+)
+
+# status events stream: the redis url status changes are relayed through,
+# needed when probes and the stream run in different processes (the usual
+# celery deployment); how many changes a subscriber may fall behind by
+# before it is dropped, and the seconds between keep-alive comments
+MONITOR_EVENTS_REDIS_URL = environ("MONITOR_EVENTS_REDIS_URL", default="")
+MONITOR_EVENTS_QUEUE_SIZE = environ(
+    "MONITOR_EVENTS_QUEUE_SIZE", default=100, cast=int
+)
+MONITOR_EVENTS_HEARTBEAT = environ(
+    "MONITOR_EVENTS_HEARTBEAT", default=15.0, cast=float
+)
+
+# live status snapshot: the redis url of the hash every probe result is
+# written to (empty disables it, and status is written to the database
+# as probes land), the seconds between reconciles of the database with
+# it, and how many websites are reconciled per batch
+MONITOR_SNAPSHOT_REDIS_URL = environ("MONITOR_SNAPSHOT_REDIS_URL", default="")
+MONITOR_SNAPSHOT_RECONCILE_INTERVAL = environ(
+    "MONITOR_SNAPSHOT_RECONCILE_INTERVAL", default=60.0, cast=float
+)
+MONITOR_SNAPSHOT_RECONCILE_BATCH = environ(
+    "MONITOR_SNAPSHOT_RECONCILE_BATCH", default=1000, cast=int
+)
+
+# prometheus metrics: the celery queues whose depth is reported (see the
+# readme for running several processes with PROMETHEUS_MULTIPROC_DIR)
+MONITOR_METRICS_QUEUES = environ(
+    "MONITOR_METRICS_QUEUES", default="celery", cast=Csv()
+)
+# /metrics is only served to the addresses or networks allowed here, as
+# seen by django (so behind a proxy, the proxy's), or to scrapers sending
+# "Authorization: Bearer <MONITOR_METRICS_TOKEN>" when a token is set
+MONITOR_METRICS_ALLOWED_IPS = environ(
+    "MONITOR_METRICS_ALLOWED_IPS", default="127.0.0.1,::1", cast=Csv()
+)
+MONITOR_METRICS_TOKEN = environ("MONITOR_METRICS_TOKEN", default="")
+
+# monitor cycles: the share of cycles profiled with cProfile (0 disables
+# it), the share of the recent cycles a profiled cycle must be among the
+# slowest of for its stats to be kept, how many recent cycles that is
+# judged against, how many functions the stats list, and the days cycles
+# are kept for
+MONITOR_CYCLE_PROFILE_RATE = environ(
+    "MONITOR_CYCLE_PROFILE_RATE", default=0.0, cast=float
+)
+MONITOR_CYCLE_PROFILE_SLOWEST = environ(
+    "MONITOR_CYCLE_PROFILE_SLOWEST", default=0.1, cast=float
+)
+MONITOR_CYCLE_PROFILE_WINDOW = environ(
+    "MONITOR_CYCLE_PROFILE_WINDOW", default=100, cast=int
+)
+MONITOR_CYCLE_PROFILE_LINES = environ(
+    "MONITOR_CYCLE_PROFILE_LINES", default=40, cast=int
+)
+MONITOR_CYCLE_RETENTION_DAYS = environ(
+    "MONITOR_CYCLE_RETENTION_DAYS", default=7, cast=int
+)
@@ -2,9 +2,11 @@
 from __future__ import absolute_import, unicode_literals
 import os
 
+# Django Imports
+from django.conf import settings
+
 # Celery Imports
 from celery import Celery
-from celery.schedules import crontab
 
 
 # set the default Django settings module for the 'celery' program.
@@ -24,9 +26,21 @@ app.autodiscover_tasks()
 
 # Beat schedules
 app.conf.beat_schedule = {
-    "monitor_websites": {
-        "task": "monitor_websites_up_and_downtimes",
-        "schedule": crontab(minute="*/15"),
+    "schedule_due_websites": {
+        "task": "schedule_due_websites",
+        "schedule": settings.MONITOR_SCHEDULER_TICK,
+    },
+    "rollup_probe_results": {
+        "task": "rollup_probe_results",
+        "schedule": settings.MONITOR_ROLLUP_INTERVAL,
+    },
+    "deliver_pending_notifications": {
+        "task": "deliver_pending_notifications",
+        "schedule": settings.MONITOR_NOTIFY_INTERVAL,
+    },
+    "reconcile_status_snapshot": {
+        "task": "reconcile_status_snapshot",
+        "schedule": settings.MONITOR_SNAPSHOT_RECONCILE_INTERVAL,
     },
 }
 
@@ -9,6 +9,9 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 
+# Own Imports
+from apps.monitor.metrics import export_metrics
+
 # Third Party Imports
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
@@ -40,6 +43,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     # generic routes
     path("", root_view, name="root"),
+    path("metrics", export_metrics, name="metrics"),
     path(":abc/backoffice/", admin.site.urls),
     # api routes
     path("api/", include("apps.monitor.urls")),